@@ -1,44 +1,86 @@
 # main.py
 import logging
+from src.client_manager.assignment import AssignmentPlanner
 from src.client_manager.client_manager import ClientManager
+from src.client_manager.sharding import ShardSupervisor
+from src.data.database import ConfigManager
 from src.monitor.monitor import Monitor
-from src.handlers.command_handler import CommandHandler
-from src.handlers.message_handler import MessageHandler
-from src.utils.logger import log_info, log_error
-from src.bot import Bot
 from src.utils.config import API_ID, API_HASH, BOT_TOKEN, CHANNEL_ID, ADMIN_ID
 
 # تنظیمات لاگینگ برای نمایش پیام‌ها
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def build_services(config, api_id, api_hash, keywords):
+    """
+    Build the account manager, the monitor and the optional shard supervisor.
+
+    Args:
+        config: Bot configuration loaded from clients.json
+        api_id: Telegram API ID
+        api_hash: Telegram API hash
+        keywords: Keywords to monitor
+
+    Returns:
+        (client_manager, monitor, supervisor); supervisor is None unless SHARDING.enabled
+    """
+    # One plan for both: ClientManager recomputes it, Monitor filters updates with it
+    assignment = AssignmentPlanner()
 
-def main():
     # راه‌اندازی مدیر کلاینت‌ها
-    client_manager = ClientManager()
-    log_info("Client Manager initialized")
+    client_manager = ClientManager(config, {}, api_id, api_hash, assignment=assignment)
+    logger.info("Client Manager initialized")
 
     # راه‌اندازی مانیتور برای کلمات کلیدی
+    monitor = Monitor(keywords, assignment=assignment)
+    client_manager.on_reconnect = monitor.backfill
+    client_manager.on_disconnect = monitor.mark_offline
+    logger.info("Monitor initialized with keywords: {}".format(keywords))
+
+    # SHARDING.enabled runs the saved accounts in worker processes; this process delivers their hits
+    supervisor = ShardSupervisor.from_config(config, api_id, api_hash, monitor)
+    return client_manager, monitor, supervisor
+
+def main():
+    # Imported here: the handlers pull in the whole bot UI, which build_services does not need
+    from src.bot import Bot
+    from src.handlers.command_handler import CommandHandler
+    from src.handlers.message_handler import MessageHandler
+
+    config_manager = ConfigManager("clients.json")
     keywords = ["urgent", "help"]
-    monitor = Monitor(keywords)
-    log_info("Monitor initialized with keywords: {}".format(keywords))
+    client_manager, monitor, supervisor = build_services(config_manager.config, API_ID, API_HASH, keywords)
 
     # راه‌اندازی هندلر دستورات
     command_handler = CommandHandler()
-    log_info("Command Handler initialized")
+    logger.info("Command Handler initialized")
 
     # راه‌اندازی هندلر پیام‌ها
     message_handler = MessageHandler()
-    log_info("Message Handler initialized")
+    logger.info("Message Handler initialized")
 
     # راه‌اندازی ربات تلگرام
     bot = Bot(client_manager, monitor, command_handler, message_handler, API_ID, API_HASH, BOT_TOKEN)
-    log_info("Bot initialized")
+    # The handlers read and save the same config and account list the client manager uses
+    bot.config_manager = config_manager
+    bot.config = client_manager.config
+    bot.active_clients = client_manager.active_clients
+    logger.info("Bot initialized")
+
+    if supervisor is not None:
+        supervisor.start()
+        bot.client.loop.create_task(supervisor.run())
+        logger.info(f"Shard supervisor started {supervisor.worker_count} workers")
 
     # اجرای ربات
     try:
         bot.run()
     except Exception as e:
-        log_error(f"An error occurred: {e}")
+        logger.error(f"An error occurred: {e}")
         raise e
+    finally:
+        if supervisor is not None:
+            bot.client.loop.run_until_complete(supervisor.stop())
 
 if __name__ == "__main__":
     main()
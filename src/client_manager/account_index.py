@@ -0,0 +1,62 @@
+# src/client_manager/account_index.py
+
+from typing import Any, Container, List, NamedTuple, Tuple
+
+from src.client_manager.assignment import client_groups
+
+ALL = "all"
+ACTIVE = "active"
+INACTIVE = "inactive"
+FILTERS = (ALL, ACTIVE, INACTIVE)
+
+
+class AccountEntry(NamedTuple):
+    session: str
+    phone: str
+    groups: int
+
+
+class AccountIndex:
+    def __init__(self, clients: Any = None):
+        """
+        Saved accounts with their group counts, ready for paging.
+
+        Built once from the clients config entry; pages are cut from the
+        sorted list and only the active/inactive status is looked up when a
+        page is rendered, so paging touches neither disk nor network.
+
+        :param clients: clients config entry
+        """
+        self.accounts: List[AccountEntry] = []
+        self.rebuild(clients)
+
+    def rebuild(self, clients: Any) -> None:
+        """Recount groups after accounts or their groups changed."""
+        self.accounts = sorted(
+            AccountEntry(session, session.replace('.session', ''), len(groups))
+            for session, groups in client_groups(clients)
+        )
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def page(self, active: Container[str], status: str, page: int,
+             size: int) -> Tuple[List[AccountEntry], int, int, int]:
+        """
+        Return one page of accounts matching a status filter.
+
+        :param active: Sessions that are currently running
+        :param status: One of all, active or inactive
+        :param page: Zero-based page number, clamped to the available pages
+        :param size: Accounts per page
+        :return: (entries, page, page count, matching account count)
+        """
+        if status == ACTIVE:
+            matching = [entry for entry in self.accounts if entry.session in active]
+        elif status == INACTIVE:
+            matching = [entry for entry in self.accounts if entry.session not in active]
+        else:
+            matching = self.accounts
+        pages = max(1, -(-len(matching) // size))
+        page = min(max(page, 0), pages - 1)
+        return matching[page * size:(page + 1) * size], page, pages, len(matching)
@@ -0,0 +1,136 @@
+# src/client_manager/assignment.py
+
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.monitor.profiles import chat_key
+
+logger = logging.getLogger(__name__)
+
+
+def client_groups(clients: Any) -> Iterator[Tuple[str, List[Any]]]:
+    """
+    Yield (session, group IDs) for every client whose groups are known.
+
+    update_groups stores clients as a mapping of session to group IDs; client
+    entries that are dicts may carry them under "groups".
+    """
+    if isinstance(clients, dict):
+        for session, entry in clients.items():
+            if isinstance(entry, list):
+                yield session, entry
+            elif isinstance(entry, dict):
+                yield session, entry.get("groups") or []
+    elif isinstance(clients, list):
+        for entry in clients:
+            if isinstance(entry, dict) and entry.get("session"):
+                yield entry["session"], entry.get("groups") or []
+
+
+class AssignmentPlanner:
+    def __init__(self):
+        """
+        Picks one primary and one standby account for every group.
+
+        Only the primary processes a group's messages; the standby takes over
+        through fail_over() or the next recompute. Groups without a plan, such
+        as ones joined since the last update_groups, are processed by every
+        account.
+        """
+        self.primary: Dict[int, str] = {}
+        self.standby: Dict[int, str] = {}
+        self.version = 0
+
+    def recompute(self, clients: Any, active: Optional[Iterable[str]] = None) -> None:
+        """
+        Rebuild the plan, spreading primaries evenly over the accounts.
+
+        Groups with the fewest candidate accounts are placed first, so an
+        account that is the only member of some groups is not also handed
+        groups others could take.
+
+        :param clients: clients config entry
+        :param active: Sessions that may be assigned, defaults to all of them
+        """
+        active = None if active is None else set(active)
+        candidates: Dict[int, List[str]] = {}
+        for session, groups in client_groups(clients):
+            if active is not None and session not in active:
+                continue
+            for group_id in groups:
+                try:
+                    candidates.setdefault(chat_key(group_id), []).append(session)
+                except (TypeError, ValueError):
+                    logger.warning(f"Skipping invalid group ID {group_id} of {session}")
+
+        load: Counter = Counter()
+        primary, standby = {}, {}
+        for key, sessions in sorted(candidates.items(), key=lambda item: (len(item[1]), item[0])):
+            ranked = sorted(set(sessions), key=lambda session: (load[session], session))
+            primary[key] = ranked[0]
+            load[ranked[0]] += 1
+            if len(ranked) > 1:
+                standby[key] = ranked[1]
+
+        self.primary, self.standby = primary, standby
+        self.version += 1
+        logger.info(
+            f"Assigned {len(primary)} groups to {len(load)} accounts "
+            f"({len(standby)} with a standby)"
+        )
+
+    def accepts(self, session: Optional[str], chat_id: Any) -> bool:
+        """
+        Return True if this account should process the chat's messages.
+
+        :param session: Session name of the receiving account
+        :param chat_id: Chat ID from the event
+        """
+        if chat_id is None:
+            return True
+        owner = self.primary.get(chat_key(chat_id))
+        return owner is None or owner == session
+
+    def fail_over(self, session: str) -> int:
+        """
+        Hand an account's groups to their standbys without a full recompute.
+
+        :param session: Session that stopped working
+        :return: Number of groups moved
+        """
+        moved = 0
+        for key, owner in list(self.primary.items()):
+            if owner != session:
+                continue
+            standby = self.standby.pop(key, None)
+            if standby is None:
+                del self.primary[key]
+            else:
+                self.primary[key] = standby
+            moved += 1
+        for key, owner in list(self.standby.items()):
+            if owner == session:
+                del self.standby[key]
+        if moved:
+            self.version += 1
+            logger.info(f"Moved {moved} groups of {session} to their standby accounts")
+        return moved
+
+    def plan(self) -> Tuple[Dict[int, str], Dict[int, str]]:
+        """Return copies of the primary and standby maps, e.g. to send to worker processes."""
+        return dict(self.primary), dict(self.standby)
+
+    def load(self, plan: Tuple[Dict[int, str], Dict[int, str]]) -> None:
+        """Replace the plan with one computed elsewhere, as returned by plan()."""
+        primary, standby = plan
+        self.primary, self.standby = dict(primary), dict(standby)
+        self.version += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return group counts and the number of primary groups per account."""
+        return {
+            "groups": len(self.primary),
+            "standby": len(self.standby),
+            "load": dict(Counter(self.primary.values())),
+        }
@@ -1,18 +1,38 @@
 import os
+import time
+import random
 import asyncio
 import logging
 from telethon import TelegramClient
-from src.utils.config import ConfigManager
+from src.client_manager.assignment import AssignmentPlanner
+from src.client_manager.health import BACKOFF, CONNECTING, LIVE, UNAUTHORIZED, HealthSupervisor
+from src.data.database import ConfigManager
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_STARTUP_CONCURRENCY = 5
+DEFAULT_STARTUP_JITTER = 1.0
+
 class ClientManager:
-    def __init__(self, config, active_clients, api_id, api_hash):
+    def __init__(self, config, active_clients, api_id, api_hash, assignment=None):
         self.config = config
         self.active_clients = active_clients
         self.api_id = api_id
         self.api_hash = api_hash
         self.config_manager = ConfigManager("clients.json", self.config)
+        self.startup_time = None
+        self.startup_timings = {}
+        # Pass the same planner to Monitor so non-primary accounts skip a group's updates
+        self.assignment = assignment if assignment is not None else AssignmentPlanner()
+        self.health = HealthSupervisor.from_config(config, on_state=self._on_health_change)
+        # Coroutine function called with (client, session_name) after a reconnect, e.g. Monitor.backfill
+        self.on_reconnect = None
+        # Function called with session_name when an account stops receiving updates, e.g. Monitor.mark_offline
+        self.on_disconnect = None
+        # Set in worker processes: called with the healthy sessions instead of recomputing
+        # locally, since only the supervisor sees the accounts of every worker
+        self.assignment_sink = None
+        self._tasks = set()
 
     async def detect_sessions(self):
         """Detects new session files and adds them to the config if not already present."""
@@ -28,30 +48,120 @@ class ClientManager:
         else:
             logger.info("No new sessions detected.")
 
-    async def start_saved_clients(self):
-        """Starts all clients listed in the configuration file."""
+    async def start_saved_clients(self, on_ready=None):
+        """
+        Starts all clients listed in the configuration file concurrently.
+
+        At most STARTUP.concurrency sessions connect at once, each after a random
+        delay of up to STARTUP.jitter seconds.
+
+        Args:
+            on_ready: Optional coroutine function called with (client, session_name)
+                as soon as that client is authorized, e.g. Monitor.process_messages_for_client
+        """
         await self.detect_sessions()
+        await self.start_clients(list(self.config.get('clients', [])), on_ready)
+
+    async def start_clients(self, sessions, on_ready=None):
+        """
+        Starts the given sessions concurrently and records the total startup time.
+
+        Args:
+            sessions: Session names to start
+            on_ready: Optional coroutine function called with (client, session_name)
+        """
+        settings = self.config.get('STARTUP') or {}
+        semaphore = asyncio.Semaphore(max(1, int(settings.get('concurrency', DEFAULT_STARTUP_CONCURRENCY))))
+        jitter = float(settings.get('jitter', DEFAULT_STARTUP_JITTER))
+
+        started = time.monotonic()
+        await asyncio.gather(*(
+            self._start_client(session_name, semaphore, jitter, on_ready) for session_name in sessions
+        ))
+        self.startup_time = time.monotonic() - started
+        logger.info(
+            f"Started {len(self.active_clients)}/{len(sessions)} clients in {self.startup_time:.1f}s"
+        )
+        self.refresh_assignment()
+        self.health.start()
+
+    def healthy_sessions(self):
+        """Return the active sessions that are neither connecting, backing off nor unauthorized."""
+        unhealthy = (CONNECTING, BACKOFF, UNAUTHORIZED)
+        return [session for session in self.active_clients if self.health.state(session) not in unhealthy]
 
-        for session_name in self.config.get('clients', []):
+    def refresh_assignment(self):
+        """Recompute which healthy active account monitors each group."""
+        healthy = self.healthy_sessions()
+        if self.assignment_sink is not None:
+            self.assignment_sink(healthy)
+            return
+        self.assignment.recompute(self.config.get('clients'), healthy)
+
+    def _on_health_change(self, session_name, old, new):
+        """Move a failing account's groups to standbys and rebalance once it recovers."""
+        if new in (BACKOFF, UNAUTHORIZED) and old not in (BACKOFF, UNAUTHORIZED, CONNECTING):
+            self.assignment.fail_over(session_name)
+            if self.on_disconnect is not None:
+                self.on_disconnect(session_name)
+            if self.assignment_sink is not None:
+                # Standbys in other workers only take over once the supervisor replans
+                self.assignment_sink(self.healthy_sessions())
+        elif new == LIVE and old == CONNECTING:
+            self.refresh_assignment()
+            client = self.active_clients.get(session_name)
+            if self.on_reconnect is not None and client is not None:
+                task = asyncio.create_task(self.on_reconnect(client, session_name))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _start_client(self, session_name, semaphore, jitter, on_ready):
+        """Connect and authorize one saved session, then hand it to on_ready."""
+        async with semaphore:
+            if jitter > 0:
+                await asyncio.sleep(random.uniform(0, jitter))
+            began = time.monotonic()
             try:
+                # connect() instead of start(): start() would prompt for a phone number on stdin
                 client = TelegramClient(session_name, self.api_id, self.api_hash)
-                await client.start()
-                
-                if await client.is_user_authorized():
-                    self.active_clients[session_name] = client
-                    logger.info(f"Started client: {session_name}")
-                else:
+                await client.connect()
+                connected = time.monotonic()
+                authorized = await client.is_user_authorized()
+                finished = time.monotonic()
+                self.startup_timings[session_name] = {
+                    "connect": connected - began,
+                    "authorize": finished - connected,
+                }
+                logger.info(
+                    f"Session {session_name}: connected in {connected - began:.2f}s, "
+                    f"authorization checked in {finished - connected:.2f}s"
+                )
+
+                if not authorized:
                     logger.warning(f"Client {session_name} is not authorized. Disconnecting.")
                     await client.disconnect()
-                
-                await asyncio.sleep(1)  # Introduce a delay for natural behavior
+                    return
+
+                self.active_clients[session_name] = client
+                self.health.watch(session_name, client)
+                logger.info(f"Started client: {session_name}")
 
             except Exception as e:
                 logger.error(f"Failed to start client {session_name}: {e}")
+                return
+
+        if on_ready is not None:
+            try:
+                await on_ready(client, session_name)
+            except Exception as e:
+                logger.error(f"Failed to start monitoring for {session_name}: {e}")
 
     async def disconnect_all_clients(self):
         """Disconnects all active clients and clears them from the active clients list."""
+        # Stop probing first, so the check loop does not reconnect clients being shut down
+        await self.health.stop()
         for session_name, client in self.active_clients.items():
+            self.health.forget(session_name)
             try:
                 await client.disconnect()
                 logger.info(f"Disconnected client: {session_name}")
@@ -76,6 +186,7 @@ class ClientManager:
             if session in self.active_clients:
                 # Disable the client
                 client = self.active_clients.pop(session)
+                self.health.forget(session)
                 await client.disconnect()
                 await event.respond(f"Account {session} disabled")
                 logger.info(f"Disabled client: {session}")
@@ -87,6 +198,7 @@ class ClientManager:
 
                 if await client.is_user_authorized():
                     self.active_clients[session] = client
+                    self.health.watch(session, client)
                     await event.respond(f"Account {session} enabled")
                     logger.info(f"Enabled client: {session}")
                 else:
@@ -94,6 +206,8 @@ class ClientManager:
                     await event.respond(f"Account {session} could not be authorized")
                     logger.warning(f"Authorization failed for client: {session}")
 
+            self.refresh_assignment()
+
             # Save updated configuration
             self.config_manager.save_config()
 
@@ -113,13 +227,18 @@ class ClientManager:
             # Disconnect and remove active client if exists
             if session in self.active_clients:
                 client = self.active_clients.pop(session)
+                self.health.forget(session)
                 await client.disconnect()
                 logger.info(f"Disconnected client for deletion: {session}")
 
             # Remove from configuration and clean up session file
             if session in self.config.get('clients', []):
-                self.config['clients'].remove(session)
+                if isinstance(self.config['clients'], dict):
+                    del self.config['clients'][session]
+                else:
+                    self.config['clients'].remove(session)
                 self.config_manager.save_config()
+                self.refresh_assignment()
 
                 # Delete the session file from disk
                 session_file = f"{session}"
@@ -0,0 +1,234 @@
+# src/client_manager/health.py
+
+import time
+import random
+import asyncio
+import logging
+from collections import Counter
+from telethon import events
+
+logger = logging.getLogger(__name__)
+
+CONNECTING = "connecting"
+LIVE = "live"
+DEGRADED = "degraded"
+BACKOFF = "backoff"
+UNAUTHORIZED = "unauthorized"
+STATES = (CONNECTING, LIVE, DEGRADED, BACKOFF, UNAUTHORIZED)
+
+
+class SessionHealth:
+    def __init__(self, client, now):
+        """
+        Health record of one session.
+
+        Args:
+            client: TelegramClient of the session
+            now: Current monotonic time
+        """
+        self.client = client
+        self.state = LIVE
+        self.since = now
+        self.last_update = now
+        self.failures = 0
+        self.next_attempt = 0.0
+        self.last_error = None
+        self.handler = None
+
+
+class HealthSupervisor:
+    def __init__(self, check_interval=30, stall_after=300, probe_timeout=20, base_delay=2,
+                 max_delay=600, catch_up_concurrency=3, on_state=None,
+                 clock=time.monotonic, sleep=asyncio.sleep):
+        """
+        Tracks each session through connecting, live, degraded, backoff and unauthorized.
+
+        Every check pass looks at each session:
+        - a disconnected client goes to backoff;
+        - a client with no update for stall_after seconds gets a get_me() heartbeat;
+          if it answers, the session is degraded and runs catch_up(), otherwise it
+          goes to backoff;
+        - a session in backoff whose delay has passed reconnects. Unauthorized
+          sessions are not retried.
+        Backoff delays double with every failure up to max_delay, and half of
+        each delay is random jitter. A semaphore bounds how many catch_up()
+        calls run at once, so a reconnect storm does not catch up every
+        account at the same time.
+
+        Args:
+            check_interval: Seconds between check passes
+            stall_after: Seconds without updates before a heartbeat is sent
+            probe_timeout: Seconds to wait for the heartbeat
+            base_delay: First backoff delay in seconds
+            max_delay: Largest backoff delay in seconds
+            catch_up_concurrency: Catch-ups allowed to run at once
+            on_state: Optional callable(session_name, old_state, new_state)
+            clock: Monotonic clock, for tests
+            sleep: Sleep coroutine function, for tests
+        """
+        self.check_interval = check_interval
+        self.stall_after = stall_after
+        self.probe_timeout = probe_timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_state = on_state
+        self.clock = clock
+        self.sleep = sleep
+        self.catch_up_limit = asyncio.Semaphore(catch_up_concurrency)
+        self.sessions = {}
+        self.reconnects = 0
+        self.catch_ups = 0
+        self._task = None
+
+    @classmethod
+    def from_config(cls, config, on_state=None):
+        """Build a supervisor from the HEALTH config key."""
+        settings = (config or {}).get('HEALTH') or {}
+        keys = ('check_interval', 'stall_after', 'probe_timeout', 'base_delay', 'max_delay', 'catch_up_concurrency')
+        return cls(on_state=on_state, **{key: settings[key] for key in keys if key in settings})
+
+    def watch(self, session_name, client):
+        """
+        Start tracking a connected, authorized client.
+
+        Args:
+            session_name: Session name
+            client: TelegramClient to watch
+        """
+        self.forget(session_name)
+        health = SessionHealth(client, self.clock())
+        self.sessions[session_name] = health
+
+        async def touch(update):
+            self.touch(session_name)
+
+        # Raw handlers see every update, so last_update only ages when nothing arrives
+        health.handler = touch
+        client.add_event_handler(touch, events.Raw)
+
+    def forget(self, session_name):
+        """Stop tracking a session that was disabled or deleted."""
+        health = self.sessions.pop(session_name, None)
+        if health is not None and health.handler is not None:
+            health.client.remove_event_handler(health.handler, events.Raw)
+
+    def touch(self, session_name):
+        """Record that an update arrived for a session."""
+        health = self.sessions.get(session_name)
+        if health is None:
+            return
+        health.last_update = self.clock()
+        if health.state == DEGRADED:
+            self._set_state(session_name, health, LIVE)
+
+    def state(self, session_name):
+        """Return the state of a session, or None if it is not tracked."""
+        health = self.sessions.get(session_name)
+        return health.state if health is not None else None
+
+    def _set_state(self, session_name, health, state):
+        old = health.state
+        if old == state:
+            return
+        health.state = state
+        health.since = self.clock()
+        logger.info(f"Session {session_name}: {old} -> {state}")
+        if self.on_state is not None:
+            try:
+                self.on_state(session_name, old, state)
+            except Exception as e:
+                logger.error(f"Error handling state change of {session_name}: {e}")
+
+    def _schedule_retry(self, session_name, health, error):
+        health.failures += 1
+        health.last_error = str(error)
+        delay = min(self.max_delay, self.base_delay * 2 ** (health.failures - 1))
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        health.next_attempt = self.clock() + delay
+        logger.warning(f"Session {session_name} unhealthy ({error}); retrying in {delay:.1f}s")
+        self._set_state(session_name, health, BACKOFF)
+
+    def start(self):
+        """Start the check loop; must be called from a running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the check loop."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.sleep(self.check_interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Error checking client health: {e}", exc_info=True)
+
+    async def check(self):
+        """Run one check pass over all sessions."""
+        await asyncio.gather(*(
+            self._check_session(session_name, health) for session_name, health in list(self.sessions.items())
+        ))
+
+    async def _check_session(self, session_name, health):
+        if health.state == UNAUTHORIZED:
+            return
+        if health.state == BACKOFF:
+            if self.clock() >= health.next_attempt:
+                await self._reconnect(session_name, health)
+            return
+        if not health.client.is_connected():
+            self._schedule_retry(session_name, health, "disconnected")
+            return
+        if self.clock() - health.last_update < self.stall_after:
+            return
+
+        try:
+            await asyncio.wait_for(health.client.get_me(), self.probe_timeout)
+        except Exception as e:
+            self._schedule_retry(session_name, health, f"heartbeat failed: {e!r}")
+            return
+        # Connected but quiet: ask the server for anything we missed
+        self._set_state(session_name, health, DEGRADED)
+        health.last_update = self.clock()
+        await self._catch_up(session_name, health)
+
+    async def _reconnect(self, session_name, health):
+        self._set_state(session_name, health, CONNECTING)
+        self.reconnects += 1
+        try:
+            await health.client.disconnect()
+            await health.client.connect()
+            if not await health.client.is_user_authorized():
+                logger.error(f"Session {session_name} lost its authorization")
+                self._set_state(session_name, health, UNAUTHORIZED)
+                return
+        except Exception as e:
+            self._schedule_retry(session_name, health, e)
+            return
+        health.failures = 0
+        health.last_update = self.clock()
+        await self._catch_up(session_name, health)
+        if health.state == CONNECTING:
+            self._set_state(session_name, health, LIVE)
+
+    async def _catch_up(self, session_name, health):
+        async with self.catch_up_limit:
+            try:
+                await health.client.catch_up()
+                self.catch_ups += 1
+            except Exception as e:
+                logger.warning(f"Catch-up failed for {session_name}: {e}")
+
+    def stats(self):
+        """Return the number of sessions in each state and the reconnect count."""
+        counts = Counter(health.state for health in self.sessions.values())
+        return {
+            "states": {state: counts[state] for state in STATES if counts[state]},
+            "reconnects": self.reconnects,
+            "catch_ups": self.catch_ups,
+        }
@@ -0,0 +1,295 @@
+# src/client_manager/sharding.py
+
+import os
+import time
+import queue
+import asyncio
+import logging
+import multiprocessing
+from types import SimpleNamespace
+from src.client_manager.assignment import AssignmentPlanner
+from src.client_manager.client_manager import ClientManager
+from src.monitor.monitor import Monitor
+
+logger = logging.getLogger(__name__)
+
+WATCH_INTERVAL = 1.0
+RESTART_DELAY = 5.0
+
+
+def assign_sessions(sessions, workers):
+    """
+    Split sessions round-robin over a number of workers.
+
+    Args:
+        sessions: Session names
+        workers: Number of worker processes
+
+    Returns:
+        List of session lists, one per worker
+    """
+    shards = [[] for _ in range(workers)]
+    for index, session_name in enumerate(sorted(sessions)):
+        shards[index % workers].append(session_name)
+    return shards
+
+
+def run_worker(index, sessions, config, api_id, api_hash, hits, control, status):
+    """Entry point of a worker process."""
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [worker {index}] %(name)s: %(message)s")
+    asyncio.run(_run_worker(index, sessions, config, api_id, api_hash, hits, control, status))
+
+
+async def _run_worker(index, sessions, config, api_id, api_hash, hits, control, status):
+    # Delivery, its outbox and its spill file belong to the supervisor process
+    pipeline = dict(config.get('PIPELINE') or {}, deliver={'policy': 'block'})
+    metrics = config.get('METRICS')
+    if metrics is not False:
+        # Seen/matched counts of this worker's accounts roll up to a file of its own
+        metrics = dict(metrics or {}, path=f"metrics_worker{index}.json")
+    config = dict(config, OUTBOX=False, PIPELINE=pipeline, METRICS=metrics)
+    monitor = Monitor(config.get('KEYWORDS', []), bot=SimpleNamespace(config=config))
+
+    async def forward_hit(record):
+        hits.put(record)
+
+    monitor.hit_sink = forward_hit
+    # Empty until the supervisor sends its plan, so every account processes every group meanwhile
+    monitor.assignment = AssignmentPlanner()
+    manager = ClientManager(config, {}, api_id, api_hash, assignment=monitor.assignment)
+    manager.on_reconnect = monitor.backfill
+    manager.on_disconnect = monitor.mark_offline
+    pid = os.getpid()
+    manager.assignment_sink = lambda healthy: status.put((index, pid, list(healthy)))
+    loop = asyncio.get_running_loop()
+    try:
+        await manager.start_clients(sessions, on_ready=monitor.process_messages_for_client)
+        logger.info(f"Worker {index} running {len(manager.active_clients)} clients")
+        while True:
+            command, payload = await loop.run_in_executor(None, control.get)
+            if command == 'add':
+                logger.info(f"Worker {index} taking over sessions: {payload}")
+                await manager.start_clients(payload, on_ready=monitor.process_messages_for_client)
+            elif command == 'plan':
+                monitor.assignment.load(payload)
+            elif command == 'stop':
+                break
+    finally:
+        await manager.health.stop()
+        await manager.disconnect_all_clients()
+        await monitor.stop()
+
+
+class WorkerHandle:
+    def __init__(self, index, process, control, sessions):
+        """
+        Supervisor-side state of one worker process.
+
+        Args:
+            index: Worker slot number
+            process: multiprocessing Process
+            control: Queue of (command, payload) messages to the worker
+            sessions: Sessions the worker is running
+        """
+        self.index = index
+        self.process = process
+        self.control = control
+        self.sessions = list(sessions)
+        self.restarts = 0
+
+
+class ShardSupervisor:
+    def __init__(self, config, api_id, api_hash, monitor, workers=None):
+        """
+        Runs saved sessions in worker processes and delivers their hits.
+
+        Each worker runs its own clients and matcher and sends compact hit
+        records to this process, where the given Monitor deduplicates and
+        delivers them. When a worker dies, its sessions are handed to the
+        other live workers and an empty replacement is started, which takes
+        the next reassigned sessions.
+
+        Workers report which of their sessions are authorized and healthy;
+        the supervisor plans primaries over the healthy sessions of all
+        workers and sends every worker the same plan, so a group whose
+        primary fails is picked up by a standby in any process.
+
+        Args:
+            config: Bot configuration; SHARDING.workers sets the process count
+            api_id: Telegram API ID
+            api_hash: Telegram API hash
+            monitor: Monitor of the delivery process
+            workers: Number of worker processes, defaults to the CPU count
+        """
+        settings = config.get('SHARDING') or {}
+        self.config = config
+        self.api_id = api_id
+        self.api_hash = api_hash
+        self.monitor = monitor
+        self.worker_count = max(1, int(workers or settings.get('workers') or os.cpu_count() or 1))
+        self.context = multiprocessing.get_context('spawn')
+        self.hits = self.context.Queue()
+        self.status = self.context.Queue()
+        self.assignment = AssignmentPlanner()
+        # Worker index -> healthy sessions as last reported by that worker
+        self.healthy = {}
+        self.workers = {}
+        self.hits_received = 0
+        self._running = False
+
+    @classmethod
+    def from_config(cls, config, api_id, api_hash, monitor):
+        """
+        Build a supervisor if the SHARDING config key enables it.
+
+        Args:
+            config: Bot configuration; sharding is on when SHARDING.enabled is true
+            api_id: Telegram API ID
+            api_hash: Telegram API hash
+            monitor: Monitor of the delivery process
+
+        Returns:
+            ShardSupervisor, or None to run every session in this process
+        """
+        settings = config.get('SHARDING') or {}
+        if not isinstance(settings, dict) or not settings.get('enabled'):
+            return None
+        return cls(config, api_id, api_hash, monitor)
+
+    def _spawn(self, index, sessions):
+        control = self.context.Queue()
+        process = self.context.Process(
+            target=run_worker,
+            args=(index, sessions, self.config, self.api_id, self.api_hash, self.hits, control, self.status),
+            name=f"monitor-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        logger.info(f"Started worker {index} (pid {process.pid}) with {len(sessions)} sessions")
+        return WorkerHandle(index, process, control, sessions)
+
+    def start(self):
+        """Split the saved sessions and start one process per shard."""
+        sessions = list(self.config.get('clients', []))
+        for index, shard in enumerate(assign_sessions(sessions, self.worker_count)):
+            self.workers[index] = self._spawn(index, shard)
+        self._running = True
+
+    async def run(self):
+        """Deliver hits and watch the workers until stop() is called."""
+        await self.monitor.start()
+        await asyncio.gather(self._pump_hits(), self._pump_status(), self._watch())
+
+    @staticmethod
+    def _get(source):
+        try:
+            return source.get(timeout=WATCH_INTERVAL)
+        except queue.Empty:
+            return None
+
+    async def _pump_hits(self):
+        loop = asyncio.get_running_loop()
+        while self._running:
+            record = await loop.run_in_executor(None, self._get, self.hits)
+            if record is None:
+                continue
+            self.hits_received += 1
+            try:
+                await self.monitor.accept_hit(record)
+            except Exception as e:
+                logger.error(f"Error queuing hit from worker: {e}")
+
+    async def _pump_status(self):
+        loop = asyncio.get_running_loop()
+        while self._running:
+            report = await loop.run_in_executor(None, self._get, self.status)
+            if report is not None:
+                self._update_health(*report)
+
+    def _update_health(self, index, pid, sessions):
+        """Record the healthy sessions a worker reported and replan."""
+        handle = self.workers.get(index)
+        # Reports of a worker that has since crashed and been replaced are stale
+        if handle is None or handle.process.pid != pid:
+            return
+        self.healthy[index] = set(sessions)
+        self._replan()
+
+    def _replan(self):
+        """Plan primaries over the healthy sessions of every worker and send the plan to all of them."""
+        before = self.assignment.plan()
+        healthy = set().union(*self.healthy.values())
+        self.assignment.recompute(self.config.get('clients'), healthy)
+        plan = self.assignment.plan()
+        if plan == before:
+            return
+        for handle in self.workers.values():
+            if handle.process.is_alive():
+                handle.control.put(('plan', plan))
+
+    async def _watch(self):
+        while self._running:
+            await asyncio.sleep(WATCH_INTERVAL)
+            for handle in list(self.workers.values()):
+                # Workers exiting after stop() are not crashes
+                if self._running and not handle.process.is_alive():
+                    self._handle_crash(handle)
+                    if handle.restarts:
+                        # The slot crashed before; slow down a crash loop
+                        await asyncio.sleep(RESTART_DELAY)
+
+    def _handle_crash(self, handle):
+        """Move a dead worker's sessions to live workers and start a replacement."""
+        logger.error(
+            f"Worker {handle.index} exited with code {handle.process.exitcode}; "
+            f"reassigning {len(handle.sessions)} sessions"
+        )
+        # Its sessions are down until another worker reports them healthy
+        self.healthy.pop(handle.index, None)
+        self._replan()
+        live = [other for other in self.workers.values() if other is not handle and other.process.is_alive()]
+        orphans = handle.sessions
+        if live:
+            moved = {other.index: [] for other in live}
+            for session_name in orphans:
+                target = min(live, key=lambda other: len(other.sessions))
+                target.sessions.append(session_name)
+                moved[target.index].append(session_name)
+            for other in live:
+                if moved[other.index]:
+                    other.control.put(('add', moved[other.index]))
+            orphans = []
+
+        replacement = self._spawn(handle.index, orphans)
+        replacement.restarts = handle.restarts + 1
+        self.workers[handle.index] = replacement
+
+    async def stop(self):
+        """Ask every worker to disconnect its clients and wait for them to exit."""
+        self._running = False
+        for handle in self.workers.values():
+            handle.control.put(('stop', None))
+        deadline = time.monotonic() + 10
+        for handle in self.workers.values():
+            await asyncio.get_running_loop().run_in_executor(
+                None, handle.process.join, max(0, deadline - time.monotonic())
+            )
+            if handle.process.is_alive():
+                handle.process.terminate()
+        await self.monitor.stop()
+
+    def stats(self):
+        """Return per-worker process state, the assignment and the number of hits received."""
+        return {
+            "hits": self.hits_received,
+            "assignment": self.assignment.stats(),
+            "workers": {
+                index: {
+                    "pid": handle.process.pid,
+                    "alive": handle.process.is_alive(),
+                    "sessions": len(handle.sessions),
+                    "restarts": handle.restarts,
+                }
+                for index, handle in self.workers.items()
+            },
+        }
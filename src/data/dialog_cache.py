@@ -0,0 +1,94 @@
+import os
+import json
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DialogCache:
+    def __init__(self, directory: str = "dialogs", full_sync_interval: float = 86400):
+        """
+        Per-account record of known groups and where the last dialog sync stopped.
+
+        Each account has a <session>.json file holding:
+        - groups: group IDs found by earlier syncs
+        - synced: time of the last finished sync; dialogs without activity
+          since then are not fetched again
+        - full_synced: time of the last full scan, which is the only way to
+          notice groups that were left quietly
+        - scan: state of an unfinished scan (mode, start time, dialog offsets
+          and groups seen so far), so the next sync resumes instead of
+          starting over
+
+        :param directory: Directory holding the per-account files
+        :param full_sync_interval: Seconds after which a sync scans every dialog again
+        """
+        self.directory = directory
+        self.full_sync_interval = full_sync_interval
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "DialogCache":
+        """
+        Build a cache from the DIALOG_CACHE config key.
+
+        :param config: Bot configuration dictionary, may be None
+        :return: DialogCache
+        """
+        settings = (config or {}).get("DIALOG_CACHE") or {}
+        if not isinstance(settings, dict):
+            settings = {}
+        return cls(settings.get("directory", "dialogs"), settings.get("full_sync_interval", 86400))
+
+    def _path(self, session_name: str) -> str:
+        return os.path.join(self.directory, f"{os.path.basename(session_name)}.json")
+
+    def get(self, session_name: str) -> Dict[str, Any]:
+        """
+        Return the cached state of an account, loading it on first use.
+
+        :param session_name: Session name
+        :return: Mutable entry; pass it to save() after changing it
+        """
+        entry = self._entries.get(session_name)
+        if entry is None:
+            entry = {"groups": [], "synced": None, "full_synced": None, "scan": None}
+            try:
+                with open(self._path(session_name), "r", encoding="utf-8") as f:
+                    entry.update(json.load(f))
+            except FileNotFoundError:
+                pass
+            except (ValueError, TypeError) as e:
+                logger.error(f"Ignoring unreadable dialog cache of {session_name}: {e}")
+            self._entries[session_name] = entry
+        return entry
+
+    def needs_full_sync(self, session_name: str, now: float) -> bool:
+        """
+        Return True if the next sync of an account has to scan every dialog.
+
+        :param session_name: Session name
+        :param now: Current wall-clock time
+        """
+        entry = self.get(session_name)
+        return entry["synced"] is None or entry["full_synced"] is None or \
+            now - entry["full_synced"] >= self.full_sync_interval
+
+    def save(self, session_name: str) -> bool:
+        """
+        Write the entry of an account.
+
+        :param session_name: Session name
+        :return: True if the file was written
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(session_name)
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self.get(session_name), f)
+            os.replace(path + ".tmp", path)
+            return True
+        except (OSError, TypeError) as e:
+            logger.error(f"Error saving dialog cache of {session_name}: {e}")
+            return False
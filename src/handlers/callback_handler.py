@@ -1,6 +1,6 @@
 from telethon import events
 from handlers.account_handler import AccountHandler
-from handlers.keyword_handler import KeywordHandler
+from src.handlers.vars_handler import VarsHandler
 from handlers.stats_handler import StatsHandler
 import logging
 
@@ -41,6 +41,8 @@ class CallbackHandler:
                 await self.handle_toggle_client(data, event)
             elif data.startswith('delete_'):
                 await self.handle_delete_client(data, event)
+            elif data.startswith('accounts_'):
+                await self.handle_accounts_page(data, event)
             else:
                 logger.warning(f"Unhandled callback data: {data}")
                 await event.respond("Unhandled action.")
@@ -64,7 +66,7 @@ class CallbackHandler:
     async def handle_show_accounts(self, event):
         """Show list of accounts."""
         logger.info("Showing accounts list")
-        await AccountHandler(self.bot).show_accounts(event)
+        await StatsHandler(self.bot).show_accounts(event)
 
     async def handle_update_groups(self, event):
         """Update groups list."""
@@ -74,22 +76,22 @@ class CallbackHandler:
     async def handle_add_keyword(self, event):
         """Add a new keyword."""
         logger.info("Adding keyword")
-        await KeywordHandler(self.bot).add_keyword_handler(event)
+        await VarsHandler(self.bot).add_keyword_handler(event)
 
     async def handle_remove_keyword(self, event):
         """Remove a keyword."""
         logger.info("Removing keyword")
-        await KeywordHandler(self.bot).remove_keyword_handler(event)
+        await VarsHandler(self.bot).remove_keyword_handler(event)
 
     async def handle_ignore_user(self, event):
         """Ignore a specific user."""
         logger.info("Ignoring user")
-        await KeywordHandler(self.bot).ignore_user_handler(event)
+        await VarsHandler(self.bot).ignore_user_handler(event)
 
     async def handle_remove_ignore_user(self, event):
         """Remove ignored user."""
         logger.info("Removing ignored user")
-        await KeywordHandler(self.bot).delete_ignore_user_handler(event)
+        await VarsHandler(self.bot).delete_ignore_user_handler(event)
 
     async def handle_show_stats(self, event):
         """Show statistics."""
@@ -102,7 +104,7 @@ class CallbackHandler:
         """Ignore a specific user based on callback data."""
         logger.info("Ignoring specific user in callback")
         user_id = int(data.split('_')[1])
-        await KeywordHandler(self.bot).ignore_user(user_id, event)
+        await VarsHandler(self.bot).ignore_user(user_id, event)
 
     async def handle_toggle_client(self, data, event):
         """Toggle client activation status based on session ID."""
@@ -115,3 +117,8 @@ class CallbackHandler:
         logger.info("Deleting client")
         session = data.replace('delete_', '')
         await AccountHandler(self.bot).delete_client(session, event)
+
+    async def handle_accounts_page(self, data, event):
+        """Show another page or filter of the account list."""
+        logger.info("Paging accounts list")
+        await StatsHandler(self.bot).show_accounts_page(data, event)
@@ -1,13 +1,39 @@
 import logging
-import os
-import json
+import time
 import asyncio
+import datetime
 from telethon import events, Button
-from telethon.errors import FloodWaitError
-from telethon.tl.types import Chat, Channel
+from telethon.errors import FloodWaitError, MessageNotModifiedError
+from telethon.tl.types import Chat, Channel, ChatForbidden, ChannelForbidden
+from src.client_manager.account_index import ALL, FILTERS as ACCOUNT_FILTERS, AccountIndex
+from src.client_manager.assignment import client_groups
+from src.data.dialog_cache import DialogCache
+from src.monitor.heavy_hitters import GROUPS, KEYWORDS, SENDERS
+from src.monitor.metrics import ACCOUNT, FORWARDED, GROUP, KEYWORD, LAG, MATCH, MATCHED, SEEN, SEND
+from src.monitor.rate_limiter import AdaptiveDelay
 
 logger = logging.getLogger(__name__)
 
+DIALOG_PAGE_SIZE = 100
+PROGRESS_INTERVAL = 3
+MAX_FLOOD_WAIT = 900
+ACCOUNTS_PAGE_SIZE = 10
+ACCOUNTS_JUMP_BUTTONS = 5
+
+MEMBER = "member"
+LEFT = "left"
+
+
+def group_status(entity):
+    """Return MEMBER or LEFT for group dialogs and None for anything else."""
+    if isinstance(entity, (Channel, ChannelForbidden)) and entity.broadcast:
+        return None
+    if isinstance(entity, (ChatForbidden, ChannelForbidden)):
+        return LEFT
+    if isinstance(entity, (Chat, Channel)):
+        return LEFT if entity.left or getattr(entity, 'deactivated', False) else MEMBER
+    return None
+
 class StatsHandler:
     def __init__(self, bot):
         """
@@ -16,6 +42,7 @@ class StatsHandler:
         :param bot: Instance of bot to access configuration and active clients.
         """
         self.bot = bot
+        self.dialog_cache = DialogCache.from_config(getattr(bot, 'config', None))
 
     async def show_stats(self, event):
         """
@@ -33,6 +60,38 @@ class StatsHandler:
                 "Ignored Users": len(self.bot.config['IGNORE_USERS'])
             }
 
+            client_manager = getattr(self.bot, 'client_manager', None)
+            if client_manager is not None and client_manager.startup_time is not None:
+                stats["Startup Time"] = f"{client_manager.startup_time:.1f}s"
+            if client_manager is not None:
+                health = client_manager.health.stats()
+                states = ", ".join(f"{count} {state}" for state, count in health['states'].items())
+                stats["Sessions"] = f"{states or 'none'} ({health['reconnects']} reconnects)"
+
+            monitor = getattr(self.bot, 'monitor', None)
+            if monitor is not None:
+                cache = monitor.entity_cache.stats()
+                stats["Entity Cache"] = f"{cache['hits']} hits / {cache['misses']} misses ({cache['size']} cached)"
+                for name, stage in monitor.pipeline.stats().items():
+                    stats[f"Queue {name}"] = (
+                        f"{stage['depth'] + stage['spilled']} queued, "
+                        f"wait {stage['wait_ms']} ms, handle {stage['service_ms']} ms, "
+                        f"{stage['dropped']} dropped"
+                    )
+                delivery = monitor.rate_limiter.stats()
+                stats["Alerts Sent"] = (
+                    f"{delivery['sent']} ({delivery['per_minute']}/min), "
+                    f"avg wait {delivery['avg_wait_ms']} ms, {delivery['flood_waits']} flood waits"
+                )
+
+            metrics = getattr(monitor, 'metrics', None)
+            if metrics is not None:
+                stats.update(self._format_traffic(metrics))
+
+            heavy_hitters = getattr(monitor, 'heavy_hitters', None)
+            if heavy_hitters is not None:
+                stats.update(self._format_heavy_hitters(heavy_hitters))
+
             text = "Bot Statistics\n\n" + "\n".join(f"• {key}: {value}" for key, value in stats.items())
             await event.respond(text)
 
@@ -40,26 +99,83 @@ class StatsHandler:
             logger.error(f"Error displaying stats: {e}")
             await event.respond("Error showing statistics. Please try again.")
 
+    def _format_traffic(self, metrics):
+        """Format message counts, rates, latencies and the busiest accounts, groups and keywords."""
+        traffic = metrics.stats()
+
+        def counts(values):
+            return ", ".join(f"{values[event]} {event}" for event in (SEEN, MATCHED, FORWARDED))
+
+        def latency(name):
+            entry = traffic['latency'][name]
+            if not entry['count']:
+                return f"{name} -"
+            return f"{name} {entry['p50']}/{entry['p95']} ms"
+
+        def top(dimension, event):
+            return ", ".join(f"{key} ({count})" for key, count in metrics.top(dimension, event, 3)) or "-"
+
+        return {
+            "Messages": counts(traffic['totals']),
+            "Last Minute": counts(traffic['per_minute']),
+            "Last Hour": counts(traffic['per_hour']),
+            "Latency p50/p95": ", ".join(latency(name) for name in (LAG, MATCH, SEND)),
+            "Busiest Accounts": top(ACCOUNT, SEEN),
+            "Top Groups": top(GROUP, MATCHED),
+            "Top Keywords": top(KEYWORD, MATCHED),
+        }
+
+    def _format_heavy_hitters(self, heavy_hitters):
+        """Format the current top groups, senders and keywords with their decayed counts."""
+        labels = {GROUPS: "Hot Groups", SENDERS: "Active Senders", KEYWORDS: "Hot Keywords"}
+        return {
+            label: ", ".join(
+                f"{key} (~{count:.0f})" for key, count, _ in heavy_hitters.query(kind, 3) if count >= 0.5
+            ) or "-"
+            for kind, label in labels.items()
+        }
+
     async def update_groups(self, event):
         """
-        Update group information for all clients and save them to clients.json.
+        Sync group information of all clients and apply the changes to the group index.
+
+        Clients are synced in parallel, each paced by its own adaptive delay,
+        and the status message shows live progress. A client that hits a
+        FloodWait waits it out on its own while the others keep scanning.
+        Only dialogs with activity since a client's last sync are fetched;
+        see DialogCache for when a full scan is done instead.
         
         :param event: Event that triggered the update process.
         """
         logger.info("Updating group information for all clients in StatsHandler")
         try:
             status_message = await event.respond("Please wait, identifying groups for each client...")
-            groups_per_client = {}
-            json_data = self._initialize_json_data()
-            
-            for session_name, client in self.bot.active_clients.items():
-                group_ids = await self._process_client_groups(client, session_name, status_message)
-                if group_ids is not None:
-                    groups_per_client[session_name] = group_ids
-
-            # Update JSON data with new groups and save it
-            self._save_updated_groups(groups_per_client, json_data)
-            await status_message.edit(f"Groups identified and saved successfully for all clients!")
+            clients = dict(self.bot.active_clients)
+            progress = {
+                session_name: {"dialogs": 0, "groups": 0, "state": "waiting"} for session_name in clients
+            }
+
+            reporter = asyncio.create_task(self._report_progress(status_message, progress))
+            try:
+                results = await asyncio.gather(*(
+                    self._process_client_groups(client, session_name, progress[session_name])
+                    for session_name, client in clients.items()
+                ))
+            finally:
+                reporter.cancel()
+                await asyncio.gather(reporter, return_exceptions=True)
+
+            changes = {
+                session_name: result
+                for session_name, result in zip(clients, results)
+                if result is not None
+            }
+
+            changed = self._apply_group_changes(changes)
+            await status_message.edit(
+                f"Groups synced for {len(changes)}/{len(clients)} clients, {changed} changed\n\n"
+                + self._format_progress(progress)
+            )
             
         except Exception as e:
             logger.error(f"Error updating groups: {e}")
@@ -67,104 +183,267 @@ class StatsHandler:
 
     async def show_accounts(self, event):
         """
-        Display all registered accounts with status and control options.
+        Display registered accounts as one paginated message.
         
         :param event: Event that triggered account display.
         """
         logger.info("Displaying registered accounts in StatsHandler")
         try:
-            clients_data = self.bot.config.get('clients', {})
-            if not isinstance(clients_data, dict) or not clients_data:
+            index = self._account_index(rebuild=True)
+            if not len(index):
                 await event.respond("No accounts added yet.")
                 return
 
-            messages = [
-                self._format_account_message(session, groups)
-                for session, groups in clients_data.items()
-            ]
-
-            for message_text, message_buttons in messages:
-                await event.respond(message_text, buttons=message_buttons)
+            text, buttons = self._format_accounts_page(index, ALL, 0)
+            await event.respond(text, buttons=buttons)
 
         except Exception as e:
             logger.error(f"Error displaying accounts: {e}")
             await event.respond("Error showing accounts. Please try again.")
 
-    def _initialize_json_data(self):
-        """Initialize JSON data structure for clients.json."""
-        json_data = {
-            "TARGET_GROUPS": [],
-            "KEYWORDS": [],
-            "IGNORE_USERS": [],
-            "clients": {}
-        }
+    async def show_accounts_page(self, data, event):
+        """
+        Edit the account list message to show another page or filter.
 
-        if os.path.exists("clients.json"):
+        :param data: Callback data of the form accounts_<filter>_<page>
+        :param event: Callback query of the pressed button.
+        """
+        try:
+            _, status, page = data.split('_', 2)
+            if status not in ACCOUNT_FILTERS:
+                status = ALL
+            text, buttons = self._format_accounts_page(self._account_index(), status, int(page))
             try:
-                with open("clients.json", "r", encoding='utf-8') as json_file:
-                    loaded_data = json.load(json_file)
-                    json_data.update(loaded_data)
-                    if isinstance(json_data["clients"], list):
-                        json_data["clients"] = {session: [] for session in json_data["clients"]}
-            except json.JSONDecodeError as e:
-                logger.error(f"Error decoding JSON: {e}")
-
-        return json_data
-
-    async def _process_client_groups(self, client, session_name, status_message):
-        """Process each client's groups and return a list of group IDs."""
-        logger.info(f"Processing groups for client: {session_name}")
-        group_ids = set()
+                await event.edit(text, buttons=buttons)
+            except MessageNotModifiedError:
+                await event.answer()
 
-        try:
-            async for dialog in client.iter_dialogs(limit=None):
-                if isinstance(dialog.entity, (Chat, Channel)) and not (isinstance(dialog.entity, Channel) and dialog.entity.broadcast):
-                    group_ids.add(dialog.entity.id)
+        except Exception as e:
+            logger.error(f"Error paging accounts: {e}")
+            await event.answer("Error showing accounts. Please try again.")
+
+    def _account_index(self, rebuild=False):
+        """Return the account index kept on the bot, building it when needed."""
+        index = getattr(self.bot, 'account_index', None)
+        if index is None:
+            index = self.bot.account_index = AccountIndex(self.bot.config.get('clients'))
+        elif rebuild:
+            index.rebuild(self.bot.config.get('clients'))
+        return index
 
-                if len(group_ids) % 50 == 0:
-                    await asyncio.sleep(2)  # Rate limiting protection
+    def _format_progress(self, progress):
+        """Format per-client scan progress for the status message."""
+        return "\n".join(
+            f"• {session_name}: {entry['dialogs']} dialogs, {entry['groups']} groups ({entry['state']})"
+            for session_name, entry in progress.items()
+        )
 
-            await status_message.edit(f"Found {len(group_ids)} groups for {session_name}")
-            return list(group_ids)
+    async def _report_progress(self, status_message, progress):
+        """Edit the status message with scan progress until cancelled."""
+        last_text = None
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            text = "Identifying groups...\n\n" + self._format_progress(progress)
+            if text != last_text:
+                try:
+                    await status_message.edit(text)
+                    last_text = text
+                except Exception as e:
+                    logger.warning(f"Could not update progress message: {e}")
 
-        except FloodWaitError as e:
-            logger.info(f"FloodWaitError: Sleeping for {e.seconds} seconds")
-            await asyncio.sleep(e.seconds)
-            return None
+    def _indexed_groups(self, session_name):
+        """Return the group IDs the group index holds for a session."""
+        for session, groups in client_groups(self.bot.config.get('clients')):
+            if session == session_name:
+                return list(groups)
+        return []
 
+    async def _resume_offsets(self, client, session_name, scan):
+        """Rebuild iter_dialogs offsets of an unfinished scan, or None if that is not possible."""
+        offset = scan["offset"]
+        if offset is None:
+            return {}
+        try:
+            return {
+                "offset_date": datetime.datetime.fromtimestamp(offset["date"], datetime.timezone.utc),
+                "offset_id": offset["id"],
+                "offset_peer": await client.get_input_entity(offset["peer"]),
+            }
         except Exception as e:
-            logger.error(f"Error in group processing for {session_name}: {e}")
+            logger.warning(f"Restarting dialog scan of {session_name}: {e}")
             return None
 
-    def _save_updated_groups(self, groups_per_client, json_data):
-        """Save updated group data to clients.json."""
-        for session_name, group_ids in groups_per_client.items():
-            existing_groups = json_data["clients"].get(session_name, [])
-            json_data["clients"][session_name] = list(set(existing_groups + group_ids))
-
-        with open("clients.json", "w", encoding='utf-8') as json_file:
-            json.dump(json_data, json_file, indent=4, ensure_ascii=False)
-            logger.info(f"Saved updated data for {len(groups_per_client)} clients")
-
-    def _format_account_message(self, session, groups):
-        """Format account message with buttons for display."""
-        phone = session.replace('.session', '') if session else 'Unknown'
-        groups_count = len(groups)
-        status = "🟢 Active" if session in self.bot.active_clients else "🔴 Inactive"
-        
-        text = (
-            f"• Phone: {phone}\n"
-            f"• Groups: {groups_count}\n"
-            f"• Status: {status}\n"
-        )
+    async def _process_client_groups(self, client, session_name, progress):
+        """
+        Sync a client's groups against its dialog cache.
+
+        :return: (joined, left) lists of group IDs, or None if the sync did not finish
+        """
+        logger.info(f"Processing groups for client: {session_name}")
+        entry = self.dialog_cache.get(session_name)
+        if entry["synced"] is None and not entry["groups"]:
+            entry["groups"] = self._indexed_groups(session_name)
+        if entry["scan"] is None:
+            now = time.time()
+            entry["scan"] = {
+                "full": self.dialog_cache.needs_full_sync(session_name, now),
+                "started": now, "offset": None, "seen": [], "left": [],
+            }
+        scan = entry["scan"]
+
+        offsets = await self._resume_offsets(client, session_name, scan)
+        if offsets is None:
+            offsets = {}
+            scan.update(offset=None, seen=[], left=[])
+        seen, left = set(scan["seen"]), set(scan["left"])
+        pacing = AdaptiveDelay()
+        progress["state"] = "full scan" if scan["full"] else "scanning changes"
 
-        buttons = [
-            [
+        def checkpoint(offset=None):
+            if offset is not None:
+                scan["offset"] = offset
+            scan.update(seen=sorted(seen), left=sorted(left))
+            self.dialog_cache.save(session_name)
+
+        while True:
+            try:
+                # Restarted from the last dialog seen after a flood wait
+                async for dialog in client.iter_dialogs(limit=None, **offsets):
+                    date = dialog.date.timestamp() if dialog.date else 0
+                    # Dialogs are ordered by last activity, so the rest has not changed
+                    if not scan["full"] and not dialog.pinned and date <= entry["synced"]:
+                        break
+
+                    progress["dialogs"] += 1
+                    status = group_status(dialog.entity)
+                    if status == MEMBER:
+                        seen.add(dialog.entity.id)
+                        left.discard(dialog.entity.id)
+                    elif status == LEFT:
+                        left.add(dialog.entity.id)
+                        seen.discard(dialog.entity.id)
+                    progress["groups"] = len(seen)
+
+                    offsets = {
+                        "offset_date": dialog.date,
+                        "offset_id": dialog.message.id if dialog.message else 0,
+                        "offset_peer": dialog.input_entity,
+                    }
+                    # Telethon fetches dialogs in pages; pace before the next request
+                    if progress["dialogs"] % DIALOG_PAGE_SIZE == 0:
+                        checkpoint({"date": date, "id": offsets["offset_id"], "peer": dialog.id})
+                        await pacing.wait()
+                        pacing.success()
+                break
+
+            except FloodWaitError as e:
+                if e.seconds > MAX_FLOOD_WAIT:
+                    logger.warning(f"Giving up on {session_name}: flood wait of {e.seconds}s")
+                    progress["state"] = f"skipped, flood wait {e.seconds}s"
+                    checkpoint()
+                    return None
+                logger.info(f"FloodWaitError for {session_name}: sleeping for {e.seconds} seconds")
+                progress["state"] = f"flood wait {e.seconds}s"
+                pacing.flood()
+                await asyncio.sleep(e.seconds)
+                progress["state"] = "full scan" if scan["full"] else "scanning changes"
+
+            except Exception as e:
+                logger.error(f"Error in group processing for {session_name}: {e}")
+                progress["state"] = "failed"
+                checkpoint()
+                return None
+
+        known = set(entry["groups"])
+        # Quietly left groups only drop out of a full scan
+        current = seen if scan["full"] else (known | seen) - left
+        joined, gone = sorted(current - known), sorted(known - current)
+        entry.update(groups=sorted(current), synced=scan["started"], scan=None)
+        if scan["full"]:
+            entry["full_synced"] = scan["started"]
+        self.dialog_cache.save(session_name)
+        progress["groups"] = len(current)
+        progress["state"] = f"+{len(joined)} joined, -{len(gone)} left"
+        return joined, gone
+
+    def _apply_group_changes(self, changes):
+        """
+        Apply joined/left group IDs to the group index and save it if anything changed.
+
+        :param changes: Mapping of session name to (joined, left)
+        :return: Number of accounts whose groups changed
+        """
+        clients = self.bot.config.get('clients')
+        if not isinstance(clients, dict):
+            clients = {session: [] for session in clients or []}
+            self.bot.config['clients'] = clients
+
+        changed = 0
+        for session_name, (joined, left) in changes.items():
+            entry = clients.get(session_name)
+            if not joined and not left and entry is not None:
+                continue
+            groups = (entry.get("groups") or []) if isinstance(entry, dict) else (entry or [])
+            gone = set(left)
+            groups = [group_id for group_id in groups if group_id not in gone]
+            groups += [group_id for group_id in joined if group_id not in groups]
+            if isinstance(entry, dict):
+                entry["groups"] = groups
+            else:
+                clients[session_name] = groups
+            changed += 1
+
+        if changed:
+            self.bot.config_manager.save_config()
+            index = getattr(self.bot, 'account_index', None)
+            if index is not None:
+                index.rebuild(clients)
+            client_manager = getattr(self.bot, 'client_manager', None)
+            if client_manager is not None:
+                client_manager.refresh_assignment()
+            logger.info(f"Saved group changes for {changed} clients")
+        return changed
+
+    def _format_accounts_page(self, index, status, page):
+        """Format one page of the account list with its buttons."""
+        entries, page, pages, total = index.page(self.bot.active_clients, status, page, ACCOUNTS_PAGE_SIZE)
+
+        lines = [f"Accounts ({status}): {total}, page {page + 1}/{pages}", ""]
+        buttons = []
+        for number, entry in enumerate(entries, page * ACCOUNTS_PAGE_SIZE + 1):
+            active = entry.session in self.bot.active_clients
+            lines.append(
+                f"{number}. {entry.phone} • {entry.groups} groups • "
+                + ("🟢 Active" if active else "🔴 Inactive")
+            )
+            buttons.append([
                 Button.inline(
-                    "❌ Disable" if status == "🟢 Active" else "✅ Enable", 
-                    data=f"toggle_{session}"
+                    f"❌ Disable {entry.phone}" if active else f"✅ Enable {entry.phone}",
+                    data=f"toggle_{entry.session}"
                 ),
-                Button.inline("🗑 Delete", data=f"delete_{session}")
-            ]
-        ]
-        return text, buttons
+                Button.inline("🗑 Delete", data=f"delete_{entry.session}")
+            ])
+        if not entries:
+            lines.append("No matching accounts.")
+
+        def page_button(label, target):
+            return Button.inline(label, data=f"accounts_{status}_{target}")
+
+        if pages > 1:
+            buttons.append([
+                page_button("⏮", 0),
+                page_button("◀️", max(page - 1, 0)),
+                page_button(f"{page + 1}/{pages}", page),
+                page_button("▶️", min(page + 1, pages - 1)),
+                page_button("⏭", pages - 1),
+            ])
+            first = min(max(page - ACCOUNTS_JUMP_BUTTONS // 2, 0), max(pages - ACCOUNTS_JUMP_BUTTONS, 0))
+            buttons.append([
+                page_button(f"·{target + 1}·" if target == page else str(target + 1), target)
+                for target in range(first, min(first + ACCOUNTS_JUMP_BUTTONS, pages))
+            ])
+        buttons.append([
+            Button.inline(("✔️ " if name == status else "") + name.capitalize(), data=f"accounts_{name}_0")
+            for name in ACCOUNT_FILTERS
+        ])
+        return "\n".join(lines), buttons
@@ -1,5 +1,6 @@
 from telethon import events
 import logging
+from src.monitor.keywords import keyword_label, parse_keyword_input
 
 logger = logging.getLogger(__name__)
 
@@ -12,29 +13,50 @@ class VarsHandler:
         """
         self.bot = bot
 
+    def _refresh_keywords(self):
+        """Ask the monitor to rebuild its matcher from the saved keywords."""
+        monitor = getattr(self.bot, 'monitor', None)
+        if monitor is not None:
+            monitor.update_keywords(self.bot.config['KEYWORDS'])
+
+    def _update_ignore_filter(self, user_id, ignored):
+        """Apply a single IGNORE_USERS change to the monitor's filter."""
+        monitor = getattr(self.bot, 'monitor', None)
+        if monitor is None:
+            return
+        if ignored:
+            monitor.ignore_filter.add(user_id)
+        else:
+            monitor.ignore_filter.discard(user_id)
+
     async def add_keyword_handler(self, event):
         """Add a keyword to monitor."""
         logger.info("Executing add_keyword_handler in VarsHandler")
         try:
             # Check if user has triggered this function via a callback
             if isinstance(event, events.CallbackQuery.Event):
-                await event.respond("Please enter the keyword you want to add.")
+                await event.respond("Please enter the keyword you want to add (prefix with re: for a regex or fuzzy: for a fuzzy word, e.g. fuzzy:bitcoin~2).")
                 self.bot._conversations[event.chat_id] = 'add_keyword_handler'
                 return
 
-            # Get and add keyword
-            keyword = event.message.text.strip()
+            # Get and add keyword, rejecting invalid regex rules before they reach the matcher
+            monitor = getattr(self.bot, 'monitor', None)
+            keyword = parse_keyword_input(event.message.text, getattr(monitor, 'normalizer', None))
+            label = keyword_label(keyword)
             if keyword not in self.bot.config['KEYWORDS']:
                 self.bot.config['KEYWORDS'].append(keyword)
                 self.bot.config_manager.save_config(self.bot.config)
-                await event.respond(f"Keyword '{keyword}' added successfully")
+                self._refresh_keywords()
+                await event.respond(f"Keyword '{label}' added successfully")
             else:
-                await event.respond(f"Keyword '{keyword}' already exists")
+                await event.respond(f"Keyword '{label}' already exists")
 
             # Respond with the list of current keywords
-            keywords = ', '.join(self.bot.config['KEYWORDS'])
+            keywords = ', '.join(map(keyword_label, self.bot.config['KEYWORDS']))
             await event.respond(f"📝 Current keywords: {keywords}")
 
+        except ValueError as e:
+            await event.respond(f"Keyword rejected: {e}")
         except Exception as e:
             logger.error(f"Error adding keyword: {e}")
             await event.respond("Error adding keyword. Please try again.")
@@ -48,15 +70,17 @@ class VarsHandler:
                 self.bot._conversations[event.chat_id] = 'remove_keyword_handler'
                 return
 
-            keyword = event.message.text.strip()
-            if keyword in self.bot.config['KEYWORDS']:
-                self.bot.config['KEYWORDS'].remove(keyword)
+            label = event.message.text.strip()
+            matches = [k for k in self.bot.config['KEYWORDS'] if keyword_label(k) == label]
+            if matches:
+                self.bot.config['KEYWORDS'].remove(matches[0])
                 self.bot.config_manager.save_config(self.bot.config)
-                await event.respond(f"Keyword '{keyword}' removed successfully")
+                self._refresh_keywords()
+                await event.respond(f"Keyword '{label}' removed successfully")
             else:
-                await event.respond(f"Keyword '{keyword}' not found")
+                await event.respond(f"Keyword '{label}' not found")
 
-            keywords = ', '.join(self.bot.config['KEYWORDS'])
+            keywords = ', '.join(map(keyword_label, self.bot.config['KEYWORDS']))
             await event.respond(f"📝 Current keywords: {keywords}")
 
         except Exception as e:
@@ -76,6 +100,7 @@ class VarsHandler:
             if user_id not in self.bot.config['IGNORE_USERS']:
                 self.bot.config['IGNORE_USERS'].append(user_id)
                 self.bot.config_manager.save_config(self.bot.config)
+                self._update_ignore_filter(user_id, True)
                 await event.respond(f"User ID {user_id} is now ignored")
             else:
                 await event.respond(f"User ID {user_id} is already ignored")
@@ -102,6 +127,7 @@ class VarsHandler:
             if user_id in self.bot.config['IGNORE_USERS']:
                 self.bot.config['IGNORE_USERS'].remove(user_id)
                 self.bot.config_manager.save_config(self.bot.config)
+                self._update_ignore_filter(user_id, False)
                 await event.respond(f"User ID {user_id} is no longer ignored")
             else:
                 await event.respond(f"User ID {user_id} not found in ignored list")
@@ -122,6 +148,7 @@ class VarsHandler:
             if user_id not in self.bot.config['IGNORE_USERS']:
                 self.bot.config['IGNORE_USERS'].append(user_id)
                 self.bot.config_manager.save_config(self.bot.config)
+                self._update_ignore_filter(user_id, True)
                 await event.respond(f"User ID {user_id} is now ignored")
             else:
                 await event.respond(f"User ID {user_id} is already ignored")
@@ -0,0 +1,296 @@
+# src/monitor/catch_up.py
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from telethon import events
+from telethon.errors import FloodWaitError
+from telethon.utils import get_peer_id
+
+logger = logging.getLogger(__name__)
+
+MAX_FLOOD_RETRIES = 3
+# Messages requested per iter_messages call while paging through a gap
+PAGE_SIZE = 100
+
+
+def message_event(client: Any, message: Any) -> Any:
+    """
+    Wrap a fetched Message in a NewMessage event, as if it had just arrived.
+
+    :param client: TelegramClient the message was fetched with
+    :param message: Message from iter_messages
+    :return: NewMessage.Event
+    """
+    event = events.NewMessage.Event(message)
+    event._entities = {
+        get_peer_id(entity): entity for entity in (message.sender, message.chat) if entity is not None
+    }
+    event._set_client(client)
+    return event
+
+
+class CheckpointStore:
+    def __init__(self, directory: str = "checkpoints", flush_interval: float = 5):
+        """
+        Processed message IDs per chat, one JSON file per account.
+
+        Every chat has two IDs:
+        - cursor: every message up to here was processed; catch-up reads
+          from it, so it only moves past contiguous runs of messages
+        - latest: highest message ID processed live
+
+        Live traffic moves the cursor only in chats marked synced, whose gap
+        a catch-up has closed since the account last went offline. Until
+        then the cursor stays at the start of the gap, so a flood wait or a
+        crash in the middle of a catch-up resumes where it stopped.
+
+        Records only touch memory; changed accounts are written every
+        flush_interval seconds. Files are per session so worker processes
+        never write the same file.
+
+        :param directory: Directory holding <session>.json files
+        :param flush_interval: Seconds between writes
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._checkpoints: Dict[str, Dict[int, List[int]]] = {}
+        self._synced: Dict[str, Set[int]] = {}
+        self._dirty = set()
+        self._task = None
+
+    def _path(self, session_name: str) -> str:
+        return os.path.join(self.directory, f"{os.path.basename(session_name)}.json")
+
+    def get(self, session_name: str) -> Dict[int, List[int]]:
+        """
+        Return the checkpoints of an account, loading them on first use.
+
+        :param session_name: Session name
+        :return: Mapping of marked chat ID to [cursor, latest]
+        """
+        checkpoints = self._checkpoints.get(session_name)
+        if checkpoints is None:
+            checkpoints = {}
+            try:
+                with open(self._path(session_name), "r", encoding="utf-8") as f:
+                    for chat_id, value in json.load(f).items():
+                        # Files written before the cursor was split off hold one ID
+                        cursor, latest = (value, value) if isinstance(value, int) else value
+                        checkpoints[int(chat_id)] = [int(cursor), int(latest)]
+            except FileNotFoundError:
+                pass
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.error(f"Ignoring unreadable checkpoints of {session_name}: {e}")
+            self._checkpoints[session_name] = checkpoints
+        return checkpoints
+
+    def cursor(self, session_name: str, chat_id: int) -> int:
+        """Return the ID up to which every message of a chat was processed."""
+        checkpoint = self.get(session_name).get(chat_id)
+        return checkpoint[0] if checkpoint is not None else 0
+
+    def record(self, session_name: str, chat_id: int, message_id: int) -> None:
+        """
+        Record a processed live message; older IDs are ignored.
+
+        The cursor follows only in synced chats and in chats seen for the
+        first time, which have no earlier gap to fill.
+        """
+        checkpoints = self.get(session_name)
+        checkpoint = checkpoints.get(chat_id)
+        if checkpoint is None:
+            checkpoints[chat_id] = [message_id, message_id]
+            self._synced.setdefault(session_name, set()).add(chat_id)
+        elif message_id > checkpoint[1]:
+            checkpoint[1] = message_id
+            if chat_id in self._synced.get(session_name, ()):
+                checkpoint[0] = message_id
+        else:
+            return
+        self._dirty.add(session_name)
+
+    def advance(self, session_name: str, chat_id: int, message_id: int) -> None:
+        """Move a chat's cursor to a message fetched by catch-up, oldest first."""
+        checkpoint = self.get(session_name).setdefault(chat_id, [0, 0])
+        if message_id > checkpoint[0]:
+            checkpoint[0] = message_id
+            checkpoint[1] = max(checkpoint[1], message_id)
+            self._dirty.add(session_name)
+
+    def synced(self, session_name: str, chat_id: int) -> None:
+        """Mark a chat's gap as closed; the cursor joins up with live traffic."""
+        checkpoint = self.get(session_name).get(chat_id)
+        if checkpoint is not None and checkpoint[0] < checkpoint[1]:
+            checkpoint[0] = checkpoint[1]
+            self._dirty.add(session_name)
+        self._synced.setdefault(session_name, set()).add(chat_id)
+
+    def offline(self, session_name: str) -> None:
+        """Stop live traffic from moving an account's cursors until its next catch-up."""
+        self._synced.pop(session_name, None)
+
+    def flush(self) -> None:
+        """Write the checkpoints of every changed account."""
+        if not self._dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        dirty, self._dirty = self._dirty, set()
+        for session_name in dirty:
+            path = self._path(session_name)
+            try:
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump({str(k): v for k, v in self._checkpoints[session_name].items()}, f)
+                os.replace(path + ".tmp", path)
+            except OSError as e:
+                logger.error(f"Error saving checkpoints of {session_name}: {e}")
+                self._dirty.add(session_name)
+
+    def start(self) -> None:
+        """Start periodic flushing; must be called from a running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop periodic flushing and write outstanding changes."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+
+class CatchUp:
+    def __init__(self, store: CheckpointStore, submit: Callable[[Any, str], Awaitable[None]],
+                 concurrency: int = 4, limit: Optional[int] = None):
+        """
+        Replays messages an account missed while it was offline.
+
+        Every chat with a checkpoint is read from its cursor with
+        iter_messages(min_id=...), oldest first, a page at a time until a
+        page comes back short, and each message is handed to submit(). The
+        cursor moves with every queued message, so a retry after a flood
+        wait, or the next catch-up after a crash, continues from there. One
+        semaphore shared by all accounts bounds how many chats are read at
+        once.
+
+        :param store: Checkpoints of the processed messages
+        :param submit: Coroutine function called with (event, session_name)
+        :param concurrency: Chats caught up at the same time across all accounts
+        :param limit: Most messages fetched per chat and run, None to read until the gap is closed;
+            a chat cut off by it is logged and stays behind for the next catch-up
+        """
+        self.store = store
+        self.submit = submit
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.running = set()
+        self.chats = 0
+        self.messages = 0
+        self.truncated = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[dict],
+                    submit: Callable[[Any, str], Awaitable[None]]) -> Optional["CatchUp"]:
+        """
+        Build a catch-up runner from the CATCH_UP config key.
+
+        :param config: Bot configuration dictionary, may be None
+        :param submit: Coroutine function called with (event, session_name)
+        :return: CatchUp, or None when CATCH_UP is set to false
+        """
+        settings = (config or {}).get("CATCH_UP", {})
+        if settings is False:
+            return None
+        if not isinstance(settings, dict):
+            settings = {}
+        store = CheckpointStore(settings.get("directory", "checkpoints"))
+        return cls(store, submit, settings.get("concurrency", 4), settings.get("limit"))
+
+    async def run(self, client: Any, session_name: str,
+                  accepts: Optional[Callable[[str, int], bool]] = None) -> int:
+        """
+        Catch up every known chat of an account.
+
+        :param client: Connected TelegramClient of the account
+        :param session_name: Session name
+        :param accepts: Called with (session_name, chat_id); chats it refuses are
+            owned by another account, so their gap is skipped instead of replayed
+        :return: Number of messages replayed
+        """
+        if session_name in self.running:
+            return 0
+        self.running.add(session_name)
+        try:
+            checkpoints = dict(self.store.get(session_name))
+            owned = []
+            for chat_id in checkpoints:
+                if accepts is None or accepts(session_name, chat_id):
+                    owned.append(chat_id)
+                else:
+                    self.store.synced(session_name, chat_id)
+            counts = await asyncio.gather(*(
+                self._catch_up_chat(client, session_name, chat_id) for chat_id in owned
+            ))
+        finally:
+            self.running.discard(session_name)
+        total = sum(counts)
+        if total:
+            logger.info(f"Replayed {total} missed messages for {session_name}")
+        return total
+
+    async def _catch_up_chat(self, client: Any, session_name: str, chat_id: int) -> int:
+        count = 0
+        async with self.semaphore:
+            failures = 0
+            while True:
+                page = PAGE_SIZE if self.limit is None else min(PAGE_SIZE, self.limit - count)
+                if page <= 0:
+                    self.truncated += 1
+                    logger.warning(
+                        f"Stopped catching up {chat_id} for {session_name} after {count} messages; "
+                        f"the rest follows from message {self.store.cursor(session_name, chat_id)} "
+                        f"on the next catch-up"
+                    )
+                    break
+                min_id = self.store.cursor(session_name, chat_id)
+                fetched = 0
+                try:
+                    async for message in client.iter_messages(chat_id, min_id=min_id, reverse=True, limit=page):
+                        await self.submit(message_event(client, message), session_name)
+                        self.store.advance(session_name, chat_id, message.id)
+                        count += 1
+                        fetched += 1
+                except FloodWaitError as e:
+                    failures += 1
+                    if failures > MAX_FLOOD_RETRIES:
+                        logger.error(f"Giving up catching up {chat_id} for {session_name} after {failures - 1} "
+                                     f"flood waits; resuming from message {min_id} on the next catch-up")
+                        break
+                    logger.warning(f"Flood wait of {e.seconds}s catching up {chat_id} for {session_name}")
+                    await asyncio.sleep(e.seconds)
+                    continue
+                except Exception as e:
+                    logger.error(f"Error catching up {chat_id} for {session_name}: {e}")
+                    break
+                if fetched < page:
+                    # Reached the newest message: the gap is closed
+                    self.store.synced(session_name, chat_id)
+                    break
+                failures = 0
+        self.chats += 1
+        self.messages += count
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        """Return caught-up chat and message counts and how many chats hit the limit."""
+        return {"chats": self.chats, "messages": self.messages, "truncated": self.truncated,
+                "running": len(self.running)}
@@ -0,0 +1,83 @@
+# src/monitor/dedup.py
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+from telethon.utils import get_peer_id
+
+from src.monitor.profiles import chat_key
+
+logger = logging.getLogger(__name__)
+
+
+def message_keys(event: Any, scope: Hashable = None) -> List[tuple]:
+    """
+    Build the deduplication keys of a message.
+
+    Every message is keyed on its chat and ID. Forwarded messages also get a
+    key for their origin, so the same post forwarded into several chats is
+    only processed once.
+
+    :param event: NewMessage event
+    :param scope: Extra key part, e.g. the keyword profile in use
+    :return: List of hashable keys
+    """
+    keys = [(scope, chat_key(event.chat_id), event.id)]
+    fwd = getattr(event.message, 'fwd_from', None)
+    if fwd is not None and fwd.from_id is not None:
+        origin = get_peer_id(fwd.from_id)
+        if fwd.channel_post:
+            keys.append((scope, 'fwd', origin, fwd.channel_post))
+        elif fwd.date is not None:
+            keys.append((scope, 'fwd', origin, int(fwd.date.timestamp())))
+    return keys
+
+
+class DuplicateFilter:
+    def __init__(self, window: float = 300, maxsize: int = 100000):
+        """
+        Time-windowed set of recently seen message keys shared by all clients.
+
+        Entries are kept in insertion order, which is also expiry order, so
+        expired keys are dropped from the front in amortized O(1).
+
+        :param window: Seconds a key is remembered
+        :param maxsize: Hard cap on remembered keys
+        """
+        self.window = window
+        self.maxsize = maxsize
+        self._seen: "OrderedDict[Hashable, float]" = OrderedDict()
+        self.duplicates = 0
+
+    def __len__(self):
+        return len(self._seen)
+
+    def _expire(self, now: float) -> None:
+        seen = self._seen
+        while seen:
+            key, expires = next(iter(seen.items()))
+            if expires > now and len(seen) <= self.maxsize:
+                break
+            seen.popitem(last=False)
+
+    def check(self, keys: List[Hashable], now: Optional[float] = None) -> bool:
+        """
+        Record keys and report whether any of them was already seen.
+
+        :param keys: Keys from message_keys()
+        :param now: Current monotonic time, for tests
+        :return: True if the message is a duplicate
+        """
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        seen = self._seen
+        duplicate = any(key in seen for key in keys)
+        expires = now + self.window
+        for key in keys:
+            if key not in seen:
+                seen[key] = expires
+        if duplicate:
+            self.duplicates += 1
+        return duplicate
@@ -0,0 +1,171 @@
+# src/monitor/digest.py
+
+import logging
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from telethon import Button
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_LIMIT = 4096
+MAX_DIGEST_BUTTONS = 10
+
+
+def pack_entries(entries: List[str], header: str = "", limit: int = MESSAGE_LIMIT) -> List[Tuple[str, int]]:
+    """
+    Pack formatted entries into as few messages as possible.
+
+    Entries are never split unless a single one is longer than the limit.
+
+    :param entries: Formatted hits
+    :param header: Text placed at the top of the first message
+    :param limit: Maximum characters per message
+    :return: (message text, number of leading entries complete once it is sent) pairs
+    """
+    chunks = []
+    current = header
+    complete = 0
+    for index, entry in enumerate(entries):
+        separator = "\n\n" if current else ""
+        if len(current) + len(separator) + len(entry) <= limit:
+            current += separator + entry
+            complete = index + 1
+            continue
+        if current:
+            chunks.append((current, complete))
+        while len(entry) > limit:
+            chunks.append((entry[:limit], index))
+            entry = entry[limit:]
+        current = entry
+        complete = index + 1
+    if current:
+        chunks.append((current, complete))
+    return chunks
+
+
+def split_entries(entries: List[str], header: str = "", limit: int = MESSAGE_LIMIT) -> List[str]:
+    """Return the message texts of pack_entries()."""
+    return [text for text, _ in pack_entries(entries, header, limit)]
+
+
+def split_digest(alerts: list, limit: int = MESSAGE_LIMIT) -> List[Tuple[str, int]]:
+    """
+    Format a batch of alerts as one digest, split at the message limit.
+
+    Alerts whose message was reposted while they waited in the batch say so,
+    as the reposts were collapsed into them.
+
+    :param alerts: Alerts from the delivery stage
+    :param limit: Maximum characters per message
+    :return: (message text, number of leading alerts complete once it is sent) pairs
+    """
+    entries = []
+    for alert in alerts:
+        cluster = alert.cluster
+        reposts = f"{cluster.summary()}\n" if cluster is not None and cluster.count > 1 else ""
+        entries.append(f"{alert.text}{reposts}[View Message]({alert.link})")
+    return pack_entries(entries, f"📋 Digest: {len(alerts)} alerts", limit)
+
+
+def format_digest(alerts: list, limit: int = MESSAGE_LIMIT) -> List[str]:
+    """Return the message texts of split_digest()."""
+    return [text for text, _ in split_digest(alerts, limit)]
+
+
+def digest_buttons(alerts: list) -> list:
+    """Build one Ignore button per distinct sender, capped at MAX_DIGEST_BUTTONS."""
+    senders = list(dict.fromkeys(alert.sender_id for alert in alerts))
+    return [
+        [Button.inline(f"🚫Ignore {sender_id}🚫", data=f"ignore_{sender_id}")]
+        for sender_id in senders[:MAX_DIGEST_BUTTONS]
+    ]
+
+
+class DigestBatcher:
+    def __init__(self, window: float = 60, max_hits: int = 20, urgent: Iterable[str] = ()):
+        """
+        Collects non-urgent alerts into batches sent as one digest.
+
+        A batch is due when it is `window` seconds old or holds max_hits alerts,
+        whichever comes first.
+
+        :param window: Seconds a batch stays open after its first alert
+        :param max_hits: Alerts per batch
+        :param urgent: Keyword labels whose alerts skip batching
+        """
+        if window <= 0 or max_hits < 1:
+            raise ValueError("window and max_hits must be positive")
+        self.window = window
+        self.max_hits = max_hits
+        self.urgent = {label.lower() for label in urgent}
+        self._pending: list = []
+        self._opened_at = 0.0
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> Optional["DigestBatcher"]:
+        """
+        Build a batcher from the DIGEST config key.
+
+        :param config: Bot configuration dictionary, may be None
+        :return: DigestBatcher, or None when digest mode is off
+        """
+        settings = (config or {}).get("DIGEST")
+        if not settings:
+            return None
+        if not isinstance(settings, dict):
+            settings = {}
+        try:
+            return cls(
+                window=settings.get("window", 60),
+                max_hits=settings.get("max_hits", 20),
+                urgent=settings.get("urgent", ())
+            )
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Invalid DIGEST settings, using defaults: {e}")
+            return cls()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def is_urgent(self, keywords: Iterable[str]) -> bool:
+        """Return True if any matched keyword label is marked urgent."""
+        return any(keyword.lower() in self.urgent for keyword in keywords)
+
+    def add(self, alert, now: Optional[float] = None) -> Optional[list]:
+        """
+        Add an alert to the open batch.
+
+        :param alert: Alert from the delivery stage
+        :param now: Current monotonic time, for tests
+        :return: The full batch when max_hits was reached, else None
+        """
+        if not self._pending:
+            self._opened_at = time.monotonic() if now is None else now
+        self._pending.append(alert)
+        if len(self._pending) >= self.max_hits:
+            return self.take()
+        return None
+
+    def requeue(self, alerts: list, now: Optional[float] = None) -> None:
+        """
+        Put alerts that failed to send back at the front of the open batch.
+
+        :param alerts: Undelivered alerts of an earlier batch
+        :param now: Current monotonic time, for tests
+        """
+        if not alerts:
+            return
+        if not self._pending:
+            self._opened_at = time.monotonic() if now is None else now
+        self._pending[:0] = alerts
+
+    def due_in(self, now: Optional[float] = None) -> float:
+        """Return seconds until the open batch is due, 0 if it is due now."""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._opened_at + self.window - now)
+
+    def take(self) -> list:
+        """Close the open batch and return its alerts."""
+        batch, self._pending = self._pending, []
+        return batch
@@ -0,0 +1,177 @@
+# src/monitor/fuzzy.py
+
+import logging
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.monitor.matcher import KeywordMatch
+
+logger = logging.getLogger(__name__)
+
+MAX_DISTANCE = 3
+TOKEN_PATTERN = re.compile(r"\w+")
+TOKEN_CACHE_SIZE = 50000
+# Longest token looked up; delete variants grow as len ** distance
+MAX_TOKEN_LENGTH = 40
+
+
+def validate_fuzzy(word: str, max_distance: int) -> None:
+    """
+    Check that a fuzzy keyword is usable.
+
+    :param word: Single-token keyword
+    :param max_distance: Maximum allowed edit distance
+    :raises ValueError: If the keyword or distance is not usable
+    """
+    if not 1 <= max_distance <= MAX_DISTANCE:
+        raise ValueError(f"Fuzzy distance must be between 1 and {MAX_DISTANCE}")
+    if TOKEN_PATTERN.fullmatch(word) is None:
+        raise ValueError(f"Fuzzy keyword '{word}' must be a single word")
+    if len(word) <= 2 * max_distance:
+        raise ValueError(f"Fuzzy keyword '{word}' is too short for distance {max_distance}")
+
+
+def deletes(word: str, distance: int) -> Set[str]:
+    """
+    Return every string obtained by deleting up to `distance` characters.
+
+    :param word: Source word
+    :param distance: Maximum number of deletions
+    :return: Set of variants, including the word itself
+    """
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {v[:i] + v[i + 1:] for v in frontier for i in range(len(v))}
+        variants |= frontier
+    return variants
+
+
+def bounded_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance between a and b, giving up once it exceeds limit.
+
+    :return: The distance, or limit + 1 if it is larger than limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # A shared prefix or suffix never changes the distance; candidates mostly differ in one spot
+    start, end_a, end_b = 0, len(a), len(b)
+    while start < end_a and start < end_b and a[start] == b[start]:
+        start += 1
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return min(max(len(a), len(b)), limit + 1)
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            cost = previous[j - 1] if char_a == char_b else previous[j - 1] + 1
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current.append(cost)
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+class FuzzyIndex:
+    def __init__(self, keywords: Iterable[Tuple[str, int]], normalize: Callable[[str], str] = str.lower,
+                 labels: Optional[Iterable[str]] = None):
+        """
+        Symmetric-delete index for matching misspelled keywords.
+
+        Every keyword is stored under all its variants with up to its
+        max_distance characters deleted. A message token is looked up by its
+        own delete variants, so only keywords sharing a variant are verified
+        with a bounded Levenshtein check, never the whole keyword list.
+        Tokens whose length is more than max_distance away from every keyword
+        length cannot match and are skipped before any variant is built.
+
+        :param keywords: (word, max_distance) pairs
+        :param normalize: Normalizer applied to keywords at build time
+        :param labels: Name each keyword's hits are reported under, defaults to
+            the word; needed when a word is indexed with several distances
+        """
+        self.keywords: List[str] = []
+        self._patterns: List[str] = []
+        self._distances: List[int] = []
+        self._index: Dict[str, List[int]] = {}
+        self._token_cache: Dict[str, Tuple[int, ...]] = {}
+        self._lengths: Set[int] = set()
+        self.max_distance = 0
+
+        labels = iter(labels) if labels is not None else None
+        for word, max_distance in keywords:
+            label = next(labels) if labels is not None else word.strip()
+            pattern = normalize(word.strip())
+            if not pattern:
+                continue
+            index = len(self._patterns)
+            self.keywords.append(label)
+            self._patterns.append(pattern)
+            self._distances.append(max_distance)
+            self.max_distance = max(self.max_distance, max_distance)
+            self._lengths.update(range(len(pattern) - max_distance, len(pattern) + max_distance + 1))
+            for variant in deletes(pattern, max_distance):
+                self._index.setdefault(variant, []).append(index)
+
+        if self._patterns:
+            logger.info(f"Built fuzzy index with {len(self._patterns)} keywords and {len(self._index)} variants")
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def _lookup(self, token: str) -> Tuple[int, ...]:
+        """Return indices of keywords within their distance of token."""
+        if len(token) not in self._lengths or len(token) > MAX_TOKEN_LENGTH:
+            return ()
+        index = self._index
+        shared = index.keys() & deletes(token, self.max_distance)
+        if not shared:
+            return ()
+        candidates = set()
+        for variant in shared:
+            candidates.update(index[variant])
+
+        patterns, distances = self._patterns, self._distances
+        return tuple(sorted(
+            i for i in candidates
+            if bounded_distance(token, patterns[i], distances[i]) <= distances[i]
+        ))
+
+    def search_normalized(self, text: str) -> List[KeywordMatch]:
+        """
+        Find fuzzy keyword hits among the tokens of normalized text.
+
+        Token results are memoized because the same words recur across messages.
+
+        :param text: Normalized message text
+        :return: KeywordMatch per matching token
+        """
+        if not self._patterns:
+            return []
+        cache = self._token_cache
+        keywords = self.keywords
+        matches = []
+        for match in TOKEN_PATTERN.finditer(text):
+            token = match.group()
+            hits = cache.get(token)
+            if hits is None:
+                hits = self._lookup(token)
+                if len(cache) >= TOKEN_CACHE_SIZE:
+                    cache.clear()
+                cache[token] = hits
+            for index in hits:
+                matches.append(KeywordMatch(keywords[index], match.start(), match.end()))
+        return matches
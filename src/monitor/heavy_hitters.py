@@ -0,0 +1,240 @@
+# src/monitor/heavy_hitters.py
+
+import heapq
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GROUPS = "groups"
+SENDERS = "senders"
+KEYWORDS = "keywords"
+KINDS = (GROUPS, SENDERS, KEYWORDS)
+
+# Weights are rescaled once they have grown by 2**RESCALE_AFTER
+RESCALE_AFTER = 64
+
+SKETCH_SALT = 0x5BD1E995
+
+
+class CountMinSketch:
+    def __init__(self, width: int = 2048, depth: int = 4):
+        """
+        Approximate counts of any number of keys in width * depth counters.
+
+        Estimates never undercount; they overcount by at most
+        e / width of the total with probability 1 - exp(-depth).
+
+        :param width: Counters per row
+        :param depth: Number of rows, each with its own hash
+        """
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be positive")
+        self.width = width
+        self.depth = depth
+        self.rows = [[0.0] * width for _ in range(depth)]
+
+    def _indexes(self, key: Hashable) -> List[int]:
+        # One hash split in two, combined per row (Kirsch-Mitzenmacher)
+        h = hash((SKETCH_SALT, key))
+        h1, h2 = h & 0xFFFFFFFF, ((h >> 32) & 0xFFFFFFFF) | 1
+        return [(h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key: Hashable, count: float = 1) -> float:
+        """Add to a key and return its new estimate."""
+        estimate = math.inf
+        for row, index in zip(self.rows, self._indexes(key)):
+            row[index] += count
+            estimate = min(estimate, row[index])
+        return estimate
+
+    def estimate(self, key: Hashable) -> float:
+        """Return the estimated count of a key."""
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    def scale(self, factor: float) -> None:
+        """Multiply every counter by factor."""
+        self.rows = [[value * factor for value in row] for row in self.rows]
+
+
+class HeavyHitters:
+    def __init__(self, k: int = 20, width: int = 2048, depth: int = 4,
+                 half_life: Optional[float] = 3600, clock: Callable[[], float] = time.time):
+        """
+        Top-k keys of a stream with exponentially decaying counts.
+
+        A Space-Saving summary monitors k keys: a new key replaces the one
+        with the smallest count and inherits that count as its error. The
+        Count-Min Sketch bounds the inherited count, so a key that is new to
+        the summary but not to the stream keeps its real history.
+
+        Decay uses forward weights: an update at time t adds 2**(t / half_life)
+        and queries divide by the weight of now, so nothing is rescanned per
+        update. Counts are rescaled only after weights grew by 2**64.
+
+        :param k: Number of keys monitored
+        :param width: Count-Min Sketch counters per row
+        :param depth: Count-Min Sketch rows
+        :param half_life: Seconds after which a count has halved, None for no decay
+        :param clock: Wall clock, for tests
+        """
+        if k < 1:
+            raise ValueError("k must be positive")
+        self.k = k
+        self.half_life = half_life or None
+        self.clock = clock
+        self.sketch = CountMinSketch(width, depth)
+        self.counts: Dict[Hashable, List[float]] = {}
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._sequence = 0
+        self._base = clock()
+        self.total = 0.0
+
+    def _weight(self, now: float) -> float:
+        if self.half_life is None:
+            return 1.0
+        exponent = (now - self._base) / self.half_life
+        if exponent > RESCALE_AFTER:
+            self._rescale(now)
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def _rescale(self, now: float) -> None:
+        factor = 2.0 ** (-(now - self._base) / self.half_life)
+        self.sketch.scale(factor)
+        for entry in self.counts.values():
+            entry[0] *= factor
+            entry[1] *= factor
+        self.total *= factor
+        self._base = now
+        self._rebuild_heap()
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(entry[0], index, key) for index, (key, entry) in enumerate(self.counts.items())]
+        heapq.heapify(self._heap)
+        self._sequence = len(self._heap)
+
+    def _push(self, key: Hashable, count: float) -> None:
+        self._sequence += 1
+        heapq.heappush(self._heap, (count, self._sequence, key))
+        # Entries go stale as counts grow; drop them before the heap outgrows k
+        if len(self._heap) > 4 * self.k:
+            self._rebuild_heap()
+
+    def _pop_min(self) -> Tuple[Hashable, float]:
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            entry = self.counts.get(key)
+            if entry is not None and entry[0] == count:
+                return key, count
+
+    def add(self, key: Hashable, count: float = 1) -> None:
+        """
+        Count one occurrence of a key.
+
+        :param key: Group ID, sender ID or keyword
+        :param count: Number of occurrences
+        """
+        increment = count * self._weight(self.clock())
+        self.total += increment
+        estimate = self.sketch.add(key, increment)
+
+        entry = self.counts.get(key)
+        if entry is not None:
+            entry[0] += increment
+        elif len(self.counts) < self.k:
+            entry = self.counts[key] = [increment, 0.0]
+        else:
+            evicted, floor = self._pop_min()
+            del self.counts[evicted]
+            # Both the inherited floor and the sketch overestimate; keep the tighter one
+            inherited = min(floor, estimate - increment)
+            entry = self.counts[key] = [inherited + increment, inherited]
+        self._push(key, entry[0])
+
+    def estimate(self, key: Hashable) -> float:
+        """Return the decayed estimated count of any key."""
+        entry = self.counts.get(key)
+        count = self.sketch.estimate(key) if entry is None else min(entry[0], self.sketch.estimate(key))
+        return count / self._weight(self.clock())
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[Hashable, float, float]]:
+        """
+        Return the heaviest keys, highest first.
+
+        :param n: Number of keys, defaults to k
+        :return: List of (key, decayed count, maximum overcount)
+        """
+        weight = self._weight(self.clock())
+        entries = heapq.nlargest(n or self.k, self.counts.items(), key=lambda item: item[1][0])
+        return [(key, count / weight, error / weight) for key, (count, error) in entries]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the decayed total and the number of monitored keys."""
+        return {"total": self.total / self._weight(self.clock()), "monitored": len(self.counts)}
+
+
+class HeavyHitterTracker:
+    def __init__(self, **options):
+        """
+        Heavy hitters for the noisiest groups, most active senders and most
+        matched keywords.
+
+        :param options: HeavyHitters arguments shared by all three trackers
+        """
+        self.trackers = {kind: HeavyHitters(**options) for kind in KINDS}
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> Optional["HeavyHitterTracker"]:
+        """
+        Build trackers from the HEAVY_HITTERS config key.
+
+        Invalid settings are logged and replaced by the defaults.
+
+        :param config: Bot configuration dictionary, may be None
+        :return: HeavyHitterTracker, or None when HEAVY_HITTERS is set to false
+        """
+        settings = (config or {}).get("HEAVY_HITTERS", {})
+        if settings is False:
+            return None
+        if not isinstance(settings, dict):
+            settings = {}
+        options = {key: settings[key] for key in ("k", "width", "depth", "half_life") if key in settings}
+        try:
+            return cls(**options)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Invalid HEAVY_HITTERS settings, using defaults: {e}")
+            return cls()
+
+    def message(self, chat_id: Optional[int], sender_id: Optional[int]) -> None:
+        """Count a message of a group and its sender."""
+        if chat_id is not None:
+            self.trackers[GROUPS].add(chat_id)
+        if sender_id is not None:
+            self.trackers[SENDERS].add(sender_id)
+
+    def matched(self, keywords: List[str]) -> None:
+        """Count the keywords a message matched."""
+        tracker = self.trackers[KEYWORDS]
+        for keyword in keywords:
+            tracker.add(keyword)
+
+    def query(self, kind: str, n: int = 10) -> List[Tuple[Hashable, float, float]]:
+        """
+        Return the current top entries of one kind.
+
+        :param kind: One of groups, senders or keywords
+        :param n: Number of entries
+        :return: List of (key, decayed count, maximum overcount), highest first
+        """
+        if kind not in self.trackers:
+            raise ValueError(f"Unknown heavy hitter kind: {kind}")
+        return self.trackers[kind].top(n)
+
+    def estimate(self, kind: str, key: Hashable) -> float:
+        """Return the decayed estimated count of a group, sender or keyword."""
+        if kind not in self.trackers:
+            raise ValueError(f"Unknown heavy hitter kind: {kind}")
+        return self.trackers[kind].estimate(key)
@@ -0,0 +1,72 @@
+# src/monitor/ignore_filter.py
+
+import logging
+from array import array
+from bisect import bisect_left
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+COMPACT_THRESHOLD = 100000
+
+
+class IgnoreFilter:
+    def __init__(self, user_ids: Iterable[int] = (), compact_threshold: int = COMPACT_THRESHOLD):
+        """
+        Membership filter for IGNORE_USERS.
+
+        Small lists are kept in a set. Once the list grows past compact_threshold
+        it is stored as a sorted array('q') searched with bisect, which takes 8
+        bytes per ID instead of a set entry plus an int object.
+
+        :param user_ids: Initial ignored user IDs
+        :param compact_threshold: Size at which the sorted array is used
+        """
+        self.compact_threshold = compact_threshold
+        self._ids = set()
+        self._compact = None
+        for user_id in user_ids:
+            try:
+                self._ids.add(int(user_id))
+            except (TypeError, ValueError):
+                logger.warning(f"Skipping invalid ignored user ID: {user_id}")
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if self._compact is None and len(self._ids) > self.compact_threshold:
+            self._compact = array('q', sorted(self._ids))
+            self._ids = set()
+            logger.info(f"Ignore list switched to compact storage with {len(self._compact)} IDs")
+
+    def __len__(self):
+        return len(self._compact) if self._compact is not None else len(self._ids)
+
+    def __contains__(self, user_id) -> bool:
+        if user_id is None:
+            return False
+        compact = self._compact
+        if compact is None:
+            return user_id in self._ids
+        index = bisect_left(compact, user_id)
+        return index < len(compact) and compact[index] == user_id
+
+    def add(self, user_id: int) -> None:
+        """Add a user ID without rebuilding the filter."""
+        user_id = int(user_id)
+        if self._compact is None:
+            self._ids.add(user_id)
+            self._maybe_compact()
+            return
+        index = bisect_left(self._compact, user_id)
+        if index == len(self._compact) or self._compact[index] != user_id:
+            self._compact.insert(index, user_id)
+
+    def discard(self, user_id: int) -> None:
+        """Remove a user ID if present."""
+        user_id = int(user_id)
+        if self._compact is None:
+            self._ids.discard(user_id)
+            return
+        index = bisect_left(self._compact, user_id)
+        if index < len(self._compact) and self._compact[index] == user_id:
+            del self._compact[index]
@@ -0,0 +1,190 @@
+# src/monitor/keywords.py
+
+import logging
+from typing import Any, Callable, Iterable, List, Optional
+
+from src.monitor.fuzzy import FuzzyIndex, validate_fuzzy
+from src.monitor.matcher import KeywordMatch, KeywordMatcher
+from src.monitor.regex_rules import RegexCache, RegexRuleSet, fold_pattern, validate_pattern
+
+logger = logging.getLogger(__name__)
+
+REGEX_PREFIX = "re:"
+FUZZY_PREFIX = "fuzzy:"
+DEFAULT_FUZZY_DISTANCE = 1
+
+# Keyword kinds in order of per-message cost
+KINDS = ("plain", "regex", "fuzzy")
+
+
+def keyword_kind(entry: Any) -> str:
+    """Return the kind of a KEYWORDS entry ('plain', 'regex' or 'fuzzy')."""
+    if isinstance(entry, dict):
+        return entry.get("kind", "plain")
+    return "plain"
+
+
+def keyword_pattern(entry: Any) -> str:
+    """Return the text or pattern of a KEYWORDS entry."""
+    if isinstance(entry, dict):
+        return entry.get("pattern", "")
+    return entry
+
+
+def keyword_label(entry: Any) -> str:
+    """
+    Format a KEYWORDS entry for display, using the same syntax users type.
+
+    :param entry: Plain keyword string or rule dictionary
+    :return: Display label
+    """
+    kind = keyword_kind(entry)
+    if kind == "regex":
+        return f"{REGEX_PREFIX}{keyword_pattern(entry)}"
+    if kind == "fuzzy":
+        return f"{FUZZY_PREFIX}{keyword_pattern(entry)}~{entry.get('max_distance', DEFAULT_FUZZY_DISTANCE)}"
+    return str(keyword_pattern(entry))
+
+
+def parse_keyword_input(text: str, normalize: Optional[Callable[[str], str]] = None) -> Any:
+    """
+    Turn text entered in the bot into a KEYWORDS entry.
+
+    ``re:<pattern>`` creates a regex rule and ``fuzzy:<word>~<distance>`` a
+    fuzzy rule (distance defaults to 1). Rules are validated here, so broken
+    rules never reach the matcher. Anything else is a plain keyword.
+
+    :param text: Raw user input
+    :param normalize: Message normalizer; regex rules it cannot fold are rejected too
+    :return: Plain keyword string or rule dictionary
+    :raises ValueError: If a regex or fuzzy rule is invalid
+    """
+    text = text.strip()
+    if text.startswith(REGEX_PREFIX):
+        pattern = text[len(REGEX_PREFIX):].strip()
+        if normalize is None:
+            validate_pattern(pattern)
+        else:
+            validate_pattern(fold_pattern(pattern, normalize), normalize)
+        return {"kind": "regex", "pattern": pattern}
+    if text.startswith(FUZZY_PREFIX):
+        word, _, distance = text[len(FUZZY_PREFIX):].strip().partition("~")
+        try:
+            max_distance = int(distance) if distance else DEFAULT_FUZZY_DISTANCE
+        except ValueError:
+            raise ValueError(f"Invalid fuzzy distance '{distance}'")
+        validate_fuzzy(word.strip(), max_distance)
+        return {"kind": "fuzzy", "pattern": word.strip(), "max_distance": max_distance}
+    return text
+
+
+class CompiledKeywords:
+    def __init__(self, entries: Iterable[Any], normalize: Callable[[str], str] = str.lower,
+                 regex_cache: Optional[RegexCache] = None):
+        """
+        Compile every kind of KEYWORDS entry into one matcher.
+
+        Plain keywords go into the Aho-Corasick automaton, regex rules into a
+        single combined pattern and fuzzy rules into a symmetric-delete index.
+        All of them scan the same normalized text.
+
+        :param entries: KEYWORDS entries
+        :param normalize: Normalizer applied to messages and plain keywords
+        :param regex_cache: Optional cache for the combined regex source
+        """
+        entries = list(entries)
+        fuzzy_entries = [e for e in entries if keyword_kind(e) == "fuzzy"]
+        self.normalize = normalize
+        self.plain = KeywordMatcher(
+            (keyword_pattern(e) for e in entries if keyword_kind(e) == "plain"),
+            normalize=normalize
+        )
+        self.regex = RegexRuleSet(
+            (keyword_pattern(e) for e in entries if keyword_kind(e) == "regex"),
+            cache=regex_cache,
+            normalize=normalize
+        )
+        self.fuzzy = FuzzyIndex(
+            ((keyword_pattern(e), e.get("max_distance", DEFAULT_FUZZY_DISTANCE)) for e in fuzzy_entries),
+            normalize=normalize,
+            labels=(keyword_label(e) for e in fuzzy_entries)
+        )
+        self._plain_labels = {normalize(k): k for k in self.plain.keywords}
+
+    def __len__(self):
+        return len(self.plain) + len(self.regex) + len(self.fuzzy)
+
+    def count(self, kind: str) -> int:
+        """Return how many compiled entries there are of one kind."""
+        return len(getattr(self, kind))
+
+    def canonical_label(self, entry: Any) -> Optional[str]:
+        """
+        Return the label hits for entry are reported under.
+
+        Plain keywords that normalize to the same text share one label.
+
+        :param entry: KEYWORDS entry
+        :return: The label, or None if the entry was not compiled
+        """
+        kind = keyword_kind(entry)
+        if kind == "plain":
+            pattern = keyword_pattern(entry)
+            if not isinstance(pattern, str):
+                return None
+            return self._plain_labels.get(self.normalize(pattern.strip()))
+        return keyword_label(entry) if kind in KINDS else None
+
+    def search_kind(self, kind: str, text: str) -> List[KeywordMatch]:
+        """
+        Return hits of a single keyword kind for already normalized text.
+
+        :param kind: One of KINDS
+        :param text: Normalized message text
+        :return: List of KeywordMatch tuples labelled with keyword_label()
+        """
+        if kind == "plain":
+            return self.plain.search_normalized(text)
+        if kind == "regex":
+            return [
+                match._replace(keyword=f"{REGEX_PREFIX}{match.keyword}")
+                for match in self.regex.search_normalized(text)
+            ]
+        return self.fuzzy.search_normalized(text)
+
+    def search_hidden(self, text: str, labels: Iterable[str]) -> List[KeywordMatch]:
+        """
+        Search regex keywords that an overlapping regex hit may have hidden.
+
+        :param text: Normalized message text
+        :param labels: Labels of regex keywords, as returned by keyword_label()
+        :return: List of KeywordMatch tuples labelled with keyword_label()
+        """
+        patterns = [label[len(REGEX_PREFIX):] for label in labels]
+        return [
+            match._replace(keyword=f"{REGEX_PREFIX}{match.keyword}")
+            for match in self.regex.search_hidden(text, patterns)
+        ]
+
+    def search_normalized(self, text: str) -> List[KeywordMatch]:
+        """Return plain, regex and fuzzy hits for already normalized text."""
+        matches = []
+        for kind in KINDS:
+            if self.count(kind):
+                matches.extend(self.search_kind(kind, text))
+        return matches
+
+    def search(self, text: str) -> List[KeywordMatch]:
+        """
+        Normalize text once and return every plain, regex and fuzzy hit.
+
+        :param text: Raw message text
+        :return: List of KeywordMatch tuples labelled with keyword_label()
+        """
+        if not text or not len(self):
+            return []
+        return self.search_normalized(self.normalize(text))
+
+    def matched_keywords(self, text: str) -> List[str]:
+        """Return the distinct labels of matched keywords."""
+        return list(dict.fromkeys(match.keyword for match in self.search(text)))
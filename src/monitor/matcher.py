@@ -0,0 +1,124 @@
+# src/monitor/matcher.py
+
+import logging
+from collections import deque
+from typing import Callable, Iterable, List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordMatch(NamedTuple):
+    """A single keyword hit inside a normalized message."""
+    keyword: str
+    start: int
+    end: int
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str], normalize: Callable[[str], str] = str.lower):
+        """
+        Compile keywords into an Aho-Corasick automaton so a message is scanned once
+        for all keywords instead of once per keyword.
+
+        :param keywords: Keywords to match; empty and duplicate entries are skipped
+        :param normalize: Function applied once to each message and to every keyword
+        """
+        self.normalize = normalize
+        self.keywords: List[str] = []
+        self._patterns: List[str] = []
+
+        # goto[state] maps a character to the next state, fail[state] is the
+        # fallback state and output[state] holds the keyword indices ending here.
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        seen = set()
+        for keyword in keywords:
+            if not isinstance(keyword, str):
+                continue
+            pattern = normalize(keyword.strip())
+            if not pattern or pattern in seen:
+                continue
+            seen.add(pattern)
+            self.keywords.append(keyword.strip())
+            self._patterns.append(pattern)
+            self._insert(pattern, len(self._patterns) - 1)
+
+        self._build_failure_links()
+        logger.info(f"Compiled keyword matcher with {len(self._patterns)} keywords and {len(self._goto)} states")
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def _insert(self, pattern: str, index: int) -> None:
+        """Add a normalized pattern to the trie."""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state] = self._output[state] + (index,)
+
+    def _build_failure_links(self) -> None:
+        """Breadth-first pass that sets failure links and merges outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                if self._output[self._fail[next_state]]:
+                    self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def search_normalized(self, text: str) -> List[KeywordMatch]:
+        """
+        Find every keyword occurrence in text that has already been normalized.
+
+        :param text: Normalized message text
+        :return: Matches in order of their end position
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        keywords, patterns = self.keywords, self._patterns
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = position + 1
+                for index in output[state]:
+                    matches.append(KeywordMatch(keywords[index], end - len(patterns[index]), end))
+        return matches
+
+    def search(self, text: str) -> List[KeywordMatch]:
+        """
+        Normalize text once and return all keyword hits with their positions.
+
+        Positions refer to the normalized text.
+
+        :param text: Raw message text
+        :return: List of KeywordMatch tuples
+        """
+        if not text or not self._patterns:
+            return []
+        return self.search_normalized(self.normalize(text))
+
+    def matched_keywords(self, text: str) -> List[str]:
+        """
+        Return the distinct keywords found in text, in order of first appearance.
+
+        :param text: Raw message text
+        :return: List of matched keywords
+        """
+        return list(dict.fromkeys(match.keyword for match in self.search(text)))
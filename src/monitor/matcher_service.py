@@ -0,0 +1,90 @@
+# src/monitor/matcher_service.py
+
+import asyncio
+import logging
+from typing import Any, Callable, Iterable, NamedTuple, Optional, Tuple
+from src.monitor.matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+
+class MatcherGeneration(NamedTuple):
+    """An immutable snapshot of the compiled keywords."""
+    version: int
+    keywords: Tuple[Any, ...]
+    matcher: Any
+
+
+class MatcherService:
+    def __init__(self, keywords: Iterable[Any], build: Callable[[Tuple[Any, ...]], Any] = KeywordMatcher,
+                 debounce: float = 0.5):
+        """
+        Hold the current matcher generation and rebuild it when keywords change.
+
+        Rebuilds run in the default executor so compiling a large keyword list
+        never blocks the event loop. Changes arriving within the debounce window
+        are coalesced into a single rebuild of the latest keyword list.
+
+        :param keywords: Initial keywords, compiled synchronously
+        :param build: Callable turning a keyword tuple into a matcher
+        :param debounce: Seconds to wait for further changes before rebuilding
+        """
+        self._build = build
+        self.debounce = debounce
+        keywords = tuple(keywords)
+        self.generation = MatcherGeneration(1, keywords, build(keywords))
+        self._pending: Optional[Tuple[Any, ...]] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+
+    @property
+    def matcher(self):
+        """Matcher of the current generation."""
+        return self.generation.matcher
+
+    def request_rebuild(self, keywords: Iterable[Any]) -> None:
+        """
+        Schedule a rebuild for a new keyword list.
+
+        Only the most recent list is compiled once the debounce window closes.
+        Outside a running event loop the rebuild happens immediately.
+
+        :param keywords: The complete new keyword list
+        """
+        self._pending = tuple(keywords)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._swap(self._pending, self._build(self._pending))
+            self._pending = None
+            return
+
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = asyncio.create_task(self._rebuild_later())
+
+    async def wait_for_rebuild(self) -> MatcherGeneration:
+        """
+        Wait until any scheduled rebuild has been swapped in.
+
+        :return: The generation current after the rebuild
+        """
+        if self._rebuild_task is not None:
+            await asyncio.shield(self._rebuild_task)
+        return self.generation
+
+    async def _rebuild_later(self) -> None:
+        """Compile the newest pending keywords off the loop and swap them in."""
+        await asyncio.sleep(self.debounce)
+        loop = asyncio.get_running_loop()
+        while self._pending is not None:
+            keywords, self._pending = self._pending, None
+            try:
+                matcher = await loop.run_in_executor(None, self._build, keywords)
+            except Exception as e:
+                logger.error(f"Error rebuilding keyword matcher: {e}", exc_info=True)
+                continue
+            self._swap(keywords, matcher)
+
+    def _swap(self, keywords: Tuple[Any, ...], matcher: Any) -> None:
+        """Publish a new generation with a single attribute assignment."""
+        self.generation = MatcherGeneration(self.generation.version + 1, keywords, matcher)
+        logger.info(f"Keyword matcher generation {self.generation.version} active with {len(keywords)} keywords")
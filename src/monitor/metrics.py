@@ -0,0 +1,344 @@
+# src/monitor/metrics.py
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SEEN = "seen"
+MATCHED = "matched"
+FORWARDED = "forwarded"
+EVENTS = (SEEN, MATCHED, FORWARDED)
+EVENT_INDEX = {event: index for index, event in enumerate(EVENTS)}
+
+ACCOUNT = "account"
+GROUP = "group"
+KEYWORD = "keyword"
+DIMENSIONS = (ACCOUNT, GROUP, KEYWORD)
+
+# Seconds per slot and slot count: five minutes, one day and one week of history
+RESOLUTIONS = ((1, 300), (60, 1440), (3600, 168))
+
+# Posted -> matched, time spent matching, time spent sending (rate limiter included)
+LAG = "lag"
+MATCH = "match"
+SEND = "send"
+LATENCIES = (LAG, MATCH, SEND)
+
+# Upper bounds of the histogram buckets in milliseconds; a last bucket holds the rest
+LATENCY_BOUNDS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000)
+
+
+class Series:
+    def __init__(self, resolution: float, slots: int):
+        """
+        Fixed-size ring buffer of counts per time slot.
+
+        Slots are reused as time moves on; slots skipped while nothing was
+        recorded are zeroed when the buffer catches up.
+
+        :param resolution: Seconds covered by one slot
+        :param slots: Number of slots kept
+        """
+        self.resolution = resolution
+        self.slots = [0] * slots
+        self.bucket = 0
+
+    def _advance(self, bucket: int) -> None:
+        gap = bucket - self.bucket
+        if gap <= 0:
+            return
+        size = len(self.slots)
+        if gap >= size:
+            self.slots = [0] * size
+        else:
+            for skipped in range(self.bucket + 1, bucket + 1):
+                self.slots[skipped % size] = 0
+        self.bucket = bucket
+
+    def add(self, now: float, amount: int = 1) -> None:
+        """Add to the slot of `now`; times older than the buffer are ignored."""
+        bucket = int(now // self.resolution)
+        self._advance(bucket)
+        if bucket > self.bucket - len(self.slots):
+            self.slots[bucket % len(self.slots)] += amount
+
+    def values(self, now: float, count: Optional[int] = None) -> List[int]:
+        """
+        Return the newest slots, oldest first.
+
+        :param now: Current time
+        :param count: Number of slots, defaults to all of them
+        """
+        self._advance(int(now // self.resolution))
+        size = len(self.slots)
+        count = size if count is None else min(count, size)
+        return [self.slots[bucket % size] for bucket in range(self.bucket - count + 1, self.bucket + 1)]
+
+    def sum(self, now: float, span: float) -> int:
+        """Return the total of the slots covering the last `span` seconds."""
+        return sum(self.values(now, max(1, int(-(-span // self.resolution)))))
+
+
+class Histogram:
+    def __init__(self, bounds: Iterable[float] = LATENCY_BOUNDS):
+        """
+        Latency histogram with fixed bucket bounds in milliseconds.
+
+        :param bounds: Ascending upper bounds of the buckets
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one value in milliseconds."""
+        index = 0
+        for bound in self.bounds:
+            if value <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Return the bucket bound below which a fraction q of the values fall.
+
+        Values above the last bound report that bound.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[min(index, len(self.bounds) - 1)]
+        return self.bounds[-1]
+
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+
+class Metrics:
+    def __init__(self, path: Optional[str] = "metrics.json", rollup_interval: float = 60,
+                 clock: Callable[[], float] = time.time):
+        """
+        Message, match and delivery statistics of the running bot.
+
+        Counts are kept in total, as ring-buffer series at 1s, 1m and 1h
+        resolution, and per account, group and keyword. Latencies go into
+        fixed-bucket histograms. Everything is only touched from the event
+        loop, so recording is a few plain integer updates without locks.
+
+        Every rollup_interval seconds a snapshot is written to `path` off the
+        event loop; load() restores it, so totals and history survive restarts.
+
+        :param path: Rollup file, None to keep metrics in memory only
+        :param rollup_interval: Seconds between rollups
+        :param clock: Wall clock, for tests
+        """
+        self.path = path
+        self.rollup_interval = rollup_interval
+        self.clock = clock
+        self.started = clock()
+        self.totals = dict.fromkeys(EVENTS, 0)
+        self.series = {event: [Series(*resolution) for resolution in RESOLUTIONS] for event in EVENTS}
+        self.counters: Dict[str, Dict[Hashable, List[int]]] = {dimension: {} for dimension in DIMENSIONS}
+        self.latency = {name: Histogram() for name in LATENCIES}
+        self._loaded = False
+        self._task = None
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> Optional["Metrics"]:
+        """
+        Build metrics from the METRICS config key.
+
+        :param config: Bot configuration dictionary, may be None
+        :return: Metrics, or None when METRICS is set to false
+        """
+        settings = (config or {}).get("METRICS", {})
+        if settings is False:
+            return None
+        if not isinstance(settings, dict):
+            settings = {}
+        return cls(settings.get("path", "metrics.json"), settings.get("rollup_interval", 60))
+
+    def record(self, event: str, account: Optional[str] = None, group: Optional[int] = None,
+               keywords: Iterable[str] = (), count: int = 1) -> None:
+        """
+        Count messages seen, matched or forwarded.
+
+        :param event: One of seen, matched or forwarded
+        :param account: Session that received the message
+        :param group: Chat ID of the message
+        :param keywords: Keywords the message matched
+        :param count: Number of messages
+        """
+        now = self.clock()
+        index = EVENT_INDEX[event]
+        self.totals[event] += count
+        for series in self.series[event]:
+            series.add(now, count)
+        self._count(ACCOUNT, account, index, count)
+        self._count(GROUP, group, index, count)
+        for keyword in keywords:
+            self._count(KEYWORD, keyword, index, count)
+
+    def _count(self, dimension: str, key: Optional[Hashable], index: int, count: int) -> None:
+        if key is None:
+            return
+        row = self.counters[dimension].get(key)
+        if row is None:
+            row = self.counters[dimension][key] = [0] * len(EVENTS)
+        row[index] += count
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a latency of one of lag, match or send."""
+        self.latency[name].observe(seconds * 1000)
+
+    def history(self, event: str, resolution: float, count: Optional[int] = None) -> List[int]:
+        """
+        Return per-slot counts of an event, oldest first.
+
+        :param event: One of seen, matched or forwarded
+        :param resolution: Slot length in seconds, one of 1, 60 or 3600
+        :param count: Number of slots, defaults to all of them
+        """
+        for series in self.series[event]:
+            if series.resolution == resolution:
+                return series.values(self.clock(), count)
+        raise ValueError(f"No series with a resolution of {resolution}s")
+
+    def rate(self, event: str, span: float = 60) -> int:
+        """Return how often an event happened in the last `span` seconds."""
+        now = self.clock()
+        # Finest series that still covers the span
+        for series in self.series[event]:
+            if series.resolution * len(series.slots) >= span:
+                return series.sum(now, span)
+        return self.series[event][-1].sum(now, span)
+
+    def top(self, dimension: str, event: str, n: int = 5) -> List[tuple]:
+        """
+        Return the n accounts, groups or keywords with the highest count.
+
+        :param dimension: One of account, group or keyword
+        :param event: One of seen, matched or forwarded
+        :param n: Number of entries
+        :return: List of (key, count), highest first
+        """
+        index = EVENT_INDEX[event]
+        rows = self.counters[dimension].items()
+        return [(key, row[index]) for key, row in heapq.nlargest(n, rows, key=lambda item: item[1][index])
+                if row[index]]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return totals, per-minute rates and latency percentiles in milliseconds."""
+        return {
+            "totals": dict(self.totals),
+            "per_minute": {event: self.rate(event, 60) for event in EVENTS},
+            "per_hour": {event: self.rate(event, 3600) for event in EVENTS},
+            "latency": {
+                name: {"p50": histogram.quantile(0.5), "p95": histogram.quantile(0.95), "count": histogram.count}
+                for name, histogram in self.latency.items()
+            },
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the full state as a JSON-serializable dict."""
+        return {
+            "saved": self.clock(),
+            "totals": dict(self.totals),
+            "series": {
+                event: [[series.resolution, series.bucket, list(series.slots)] for series in all_series]
+                for event, all_series in self.series.items()
+            },
+            # Pairs rather than objects, so integer group IDs keep their type
+            "counters": {
+                dimension: [[key, list(row)] for key, row in rows.items()]
+                for dimension, rows in self.counters.items()
+            },
+            "latency": {
+                name: {"counts": list(histogram.counts), "total": histogram.total}
+                for name, histogram in self.latency.items()
+            },
+        }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Merge a snapshot into the current state."""
+        for event, value in data.get("totals", {}).items():
+            if event in self.totals:
+                self.totals[event] += value
+        for event, saved in data.get("series", {}).items():
+            for series in self.series.get(event, []):
+                for resolution, bucket, slots in saved:
+                    if resolution == series.resolution and len(slots) == len(series.slots):
+                        series.bucket, series.slots = bucket, list(slots)
+        for dimension, rows in data.get("counters", {}).items():
+            if dimension not in self.counters:
+                continue
+            for key, row in rows:
+                for index, count in enumerate(row[:len(EVENTS)]):
+                    self._count(dimension, key, index, count)
+        for name, saved in data.get("latency", {}).items():
+            histogram = self.latency.get(name)
+            if histogram is not None and len(saved["counts"]) == len(histogram.counts):
+                histogram.counts = [a + b for a, b in zip(histogram.counts, saved["counts"])]
+                histogram.count = sum(histogram.counts)
+                histogram.total += saved["total"]
+
+    def load(self) -> None:
+        """Restore the last rollup once, if there is one."""
+        if self.path is None or self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.restore(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError, KeyError) as e:
+            logger.error(f"Ignoring unreadable metrics rollup {self.path}: {e}")
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        try:
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(self.path + ".tmp", self.path)
+        except (OSError, TypeError) as e:
+            logger.error(f"Error writing metrics rollup {self.path}: {e}")
+
+    async def rollup(self) -> None:
+        """Write a snapshot to disk without blocking the event loop."""
+        if self.path is None:
+            return
+        data = self.snapshot()
+        await asyncio.get_running_loop().run_in_executor(None, self._write, data)
+
+    def start(self) -> None:
+        """Start periodic rollups; must be called from a running event loop."""
+        if self._task is None and self.path is not None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop periodic rollups and write a final one."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.path is not None:
+            self._write(self.snapshot())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.rollup_interval)
+            await self.rollup()
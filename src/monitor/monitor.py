@@ -1,70 +1,522 @@
 # src/monitor/monitor.py
 
+import asyncio
+import logging
+import time
+from collections import deque
+from functools import partial
+from typing import Any, NamedTuple, Optional
+from telethon import events, Button
+from src.monitor.catch_up import CatchUp
+from src.monitor.digest import DigestBatcher, digest_buttons, split_digest
+from src.monitor.dedup import DuplicateFilter, message_keys
+from src.monitor.heavy_hitters import HeavyHitterTracker
+from src.monitor.ignore_filter import IgnoreFilter
+from src.monitor.matcher_service import MatcherService
+from src.monitor.metrics import FORWARDED, LAG, MATCH, MATCHED, SEEN, SEND, Metrics
+from src.monitor.near_duplicates import NearDuplicateIndex
+from src.monitor.outbox import Outbox
+from src.monitor.pipeline import BLOCK, HIGH, LOW, SPILL, Pipeline, Stage
+from src.monitor.profiles import MatcherIndex
+from src.monitor.rate_limiter import RateLimiter
+from src.monitor.regex_rules import RegexCache
+from src.monitor.rules import RuleSet
+from src.utils.entity_cache import EntityCache
+from src.utils.normalizer import TextNormalizer
+from src.utils.config import CHANNEL_ID
+
+logger = logging.getLogger(__name__)
+
+
+class Alert(NamedTuple):
+    """Formatted alert waiting in the delivery stage."""
+    text: str
+    link: str
+    sender_id: int
+    urgent: bool = False
+    id: Optional[int] = None
+    cluster: Any = None
+    source: Any = None
+
+    def encode(self):
+        # Near-duplicate clusters and the (session, chat, keywords) source for metrics live
+        # in memory only; a spilled alert loses both
+        return [self.text, self.link, self.sender_id, self.urgent, self.id]
+
+    @classmethod
+    def decode(cls, data):
+        return cls(*data)
+
+
 class Monitor:
-    def __init__(self, keywords):
+    def __init__(self, keywords, bot=None, assignment=None):
+        """
+        Initialize Monitor with the keywords to watch for.
+
+        :param keywords: List of keywords to compile into the matcher
+        :param bot: Bot instance providing config and the alert client
+        :param assignment: AssignmentPlanner also given to ClientManager, which keeps it current
+        """
+        config = self._config(bot)
+        self.keywords = keywords
+        self.rules = list(config.get('RULES', []))
+        self.bot = bot
+        self.normalizer = TextNormalizer.from_config(config)
+        self.regex_cache = RegexCache()
+        self.ignore_filter = IgnoreFilter(config.get('IGNORE_USERS', []))
+        self.entity_cache = EntityCache()
+        self.duplicate_filter = DuplicateFilter()
+        self.near_duplicates = NearDuplicateIndex.from_config(config)
+        # Clusters whose first alert shows an outdated count, edited together by _edit_clusters_later
+        self._cluster_edits = {}
+        self._cluster_flush = None
+        self.matcher_service = MatcherService(keywords, build=self._compile)
+        self.rate_limiter = RateLimiter.from_config(config)
+        self.digest = DigestBatcher.from_config(config)
+        self._digest_flush = None
+        # Due digest batches, sent one after another by _send_digests outside the deliver worker
+        self._digest_batches = deque()
+        self._digest_sender = None
+        self.outbox = Outbox.from_config(config)
+        self.catch_up = CatchUp.from_config(config, self._submit_backfilled)
+        self.metrics = Metrics.from_config(config)
+        self.heavy_hitters = HeavyHitterTracker.from_config(config)
+        self.pipeline = Pipeline([
+            Stage.from_config('match', self._match_event, config, workers=4, policy=BLOCK),
+            Stage.from_config('deliver', self._deliver, config, workers=1, policy=SPILL,
+                              encode=Alert.encode, decode=Alert.decode, on_drop=self._ack),
+        ])
+        self._started = False
+        # Set in worker processes to forward hits instead of delivering them
+        self.hit_sink = None
+        # None lets every account see every group
+        self.assignment = assignment
+        self._tasks = set()
+
+    @staticmethod
+    def _config(bot):
+        return getattr(bot, 'config', None) or {}
+
+    def _compile(self, keywords):
+        """Compile keywords, rules and keyword profiles into a chat-indexed matcher."""
+        config = self._config(self.bot)
+        rule_set = RuleSet(
+            keywords,
+            self.rules,
+            normalize=self.normalizer,
+            regex_cache=self.regex_cache,
+            profiles=config.get('PROFILES')
+        )
+        return MatcherIndex(rule_set, config.get('TARGET_GROUPS', []), config.get('clients'))
+
+    def update_keywords(self, keywords):
+        """
+        Schedule a matcher rebuild for a new keyword list.
+
+        Messages already being processed keep the generation they started with.
+
+        :param keywords: New list of keywords
+        """
         self.keywords = keywords
+        self.matcher_service.request_rebuild(keywords)
 
-    async def process_messages_for_client(self, client):
+    def update_rules(self, rules):
+        """
+        Schedule a matcher rebuild for a new list of boolean rules.
+
+        :param rules: New RULES entries
+        """
+        self.rules = list(rules)
+        self.refresh()
+
+    def refresh(self):
+        """Schedule a matcher rebuild after PROFILES or TARGET_GROUPS changed in the config."""
+        self.matcher_service.request_rebuild(self.keywords)
+
+    def monitor_message(self, text, matcher=None):
+        """
+        Match a message against the keywords and rules.
+
+        :param text: Message text to scan
+        :param matcher: Matcher to use, defaults to the current generation
+        :return: MatchResult, falsy if nothing matched
+        """
+        matcher = matcher or self.matcher_service.matcher
+        return matcher.search(text)
+
+    def _report_near_duplicate(self, cluster):
+        """
+        Schedule an update of the first alert of a near-duplicate cluster with its new counts.
+
+        Reposts arriving within the edit interval share one edit, which is
+        paced by the rate limiter like any other message to the channel.
+        """
+        if cluster.alert is None:
+            # Not sent yet: _send_alert schedules the edit once it is, and a
+            # digest entry shows the count it has when the digest goes out
+            return
+        self._cluster_edits[id(cluster)] = cluster
+        if self._cluster_flush is None:
+            self._cluster_flush = asyncio.create_task(self._edit_clusters_later())
+
+    async def _edit_clusters_later(self):
+        """Edit the alerts of every cluster that grew since the edit interval started."""
+        try:
+            await asyncio.sleep(self.near_duplicates.edit_interval)
+            while self._cluster_edits:
+                cluster = self._cluster_edits.pop(next(iter(self._cluster_edits)))
+                if cluster.count == cluster.reported:
+                    continue
+                count = cluster.count
+                try:
+                    await self.rate_limiter.send(CHANNEL_ID, partial(
+                        cluster.alert.edit, f"{cluster.alert_text}\n{cluster.summary()}"
+                    ))
+                    cluster.reported = count
+                except Exception as e:
+                    logger.error(f"Error updating near-duplicate alert: {e}")
+        finally:
+            self._cluster_flush = None
+
+    async def start(self):
+        """Start the pipeline and replay alerts the outbox kept from the last run."""
+        if self._started:
+            return
+        self._started = True
+        pending = []
+        if self.outbox is not None:
+            pending = self.outbox.open()
+            self.outbox.start()
+        if self.catch_up is not None:
+            self.catch_up.store.start()
+        if self.metrics is not None:
+            self.metrics.load()
+            self.metrics.start()
+        self.pipeline.start()
+        for entry_id, payload in pending:
+            alert = Alert.decode(payload)._replace(id=entry_id)
+            await self.pipeline['deliver'].put(alert, HIGH if alert.urgent else LOW)
+
+    async def stop(self):
+        """Stop the pipeline; unsent alerts stay in the outbox for the next start."""
+        await self.pipeline.stop()
+        # Alerts of open or unsent digests are still in the outbox and replayed on the next start
+        for task in (self._cluster_flush, self._digest_flush, self._digest_sender):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._cluster_edits.clear()
+        self._digest_batches.clear()
+        if self.digest is not None:
+            self.digest.take()
+        if self.outbox is not None:
+            await self.outbox.close()
+        if self.catch_up is not None:
+            await self.catch_up.store.close()
+        if self.metrics is not None:
+            await self.metrics.close()
+        self._started = False
+
+    def _record_forwarded(self, *alerts):
+        """Count delivered alerts per account, group and keyword where known."""
+        if self.metrics is None:
+            return
+        for alert in alerts:
+            session_name, chat_id, keywords = alert.source or (None, None, ())
+            self.metrics.record(FORWARDED, session_name, chat_id, keywords)
+
+    def _ack(self, *alerts):
+        """Remove sent or dropped alerts from the outbox."""
+        if self.outbox is None:
+            return
+        for alert in alerts:
+            self.outbox.ack(alert.id)
+
+    async def process_messages_for_client(self, client, session_name=None):
         """
         Sets up message processing for a specific client.
-        
+
+        The update handler only queues events; matching and delivery run in
+        the pipeline's worker pools.
+
         Args:
             client: TelegramClient instance to process messages for
-            
-        # TODO: Implement message queuing system
-        # TODO: Add message deduplication
-        # TODO: Implement message filtering optimization
+            session_name: Session name used to pick the account's keyword profile
         """
-        @client.on(events.NewMessage)
+        await self.start()
+
+        def is_assigned(event):
+            # Runs in Telethon's event filter, before the handler and any queuing
+            return self.assignment is None or self.assignment.accepts(session_name, event.chat_id)
+
+        @client.on(events.NewMessage(func=is_assigned))
         async def process_message(event):
             """
-            Processes and forwards new messages based on configured filters.
-            
+            Queue a new message for matching.
+
             Args:
                 event: NewMessage event from Telegram
             """
-            try:
-                message = event.message.text
-                if not message:
-                    return
-
-                sender = await event.get_sender()
-                if not sender or sender.id in self.bot.config['IGNORE_USERS']:
-                    return
-
-                if not any(keyword.lower() in message.lower() for keyword in self.bot.config['KEYWORDS']):
-                    return
-
-                chat = await event.get_chat()
-                chat_title = getattr(chat, 'title', 'Unknown Chat')
-
-                # Format message for forwarding
-                text = (
-                    f"• User: {getattr(sender, 'first_name', '')} {getattr(sender, 'last_name', '')}\n"
-                    f"• User ID: `{sender.id}`\n"
-                    f"• Chat: {chat_title}\n\n"
-                    f"• Message:\n{message}\n"
-                )
-
-                # Generate message link
-                if hasattr(chat, 'username') and chat.username:
-                    message_link = f"https://t.me/{chat.username}/{event.id}"
-                else:
-                    chat_id = str(event.chat_id).replace('-100', '', 1)
-                    message_link = f"https://t.me/c/{chat_id}/{event.id}"
-
-                buttons = [
-                    [Button.url("View Message", url=message_link)],
-                    [Button.inline("🚫Ignore🚫", data=f"ignore_{sender.id}")]
-                ]
-
-                await self.bot.bot.send_message(
+            if not event.message.text:
+                return
+            # Under the block policy this waits, holding back this client's updates
+            await self.pipeline['match'].put((event, session_name, False))
+
+        # Messages posted while this account was offline
+        task = asyncio.create_task(self.backfill(client, session_name))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def backfill(self, client, session_name):
+        """
+        Replay messages an account missed since its last processed message.
+
+        Args:
+            client: Connected TelegramClient of the account
+            session_name: Session name the checkpoints are kept under
+
+        Returns:
+            Number of messages queued
+        """
+        if self.catch_up is None or session_name is None:
+            return 0
+        accepts = None if self.assignment is None else self.assignment.accepts
+        return await self.catch_up.run(client, session_name, accepts)
+
+    def mark_offline(self, session_name):
+        """
+        Keep an account's catch-up cursors at the start of the gap it is about to miss.
+
+        Args:
+            session_name: Session name the checkpoints are kept under
+        """
+        if self.catch_up is not None and session_name is not None:
+            self.catch_up.store.offline(session_name)
+
+    async def _submit_backfilled(self, event, session_name):
+        """Queue a fetched message for matching, marked as backfilled."""
+        if event.message.text:
+            await self.pipeline['match'].put((event, session_name, True))
+
+    async def _match_event(self, item):
+        """
+        Match stage: match a queued event, then move its chat's checkpoint.
+
+        Args:
+            item: (event, session_name, backfilled) tuple
+        """
+        event, session_name, backfilled = item
+        if self.metrics is not None:
+            self.metrics.record(SEEN, session_name, event.chat_id)
+            if event.message.date is not None and not backfilled:
+                self.metrics.observe(LAG, time.time() - event.message.date.timestamp())
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.message(event.chat_id, event.sender_id)
+        started = time.monotonic()
+        try:
+            await self._match_message(event, session_name, backfilled)
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe(MATCH, time.monotonic() - started)
+            if self.catch_up is not None and session_name is not None:
+                self.catch_up.store.record(session_name, event.chat_id, event.id)
+
+    async def _match_message(self, event, session_name, backfilled):
+        """
+        Filter and match one message and queue its alert.
+
+        Args:
+            event: NewMessage event
+            session_name: Session that received the message
+            backfilled: True if the message was fetched after a reconnect
+        """
+        # Pin the matcher generation for the lifetime of this message
+        matcher = self.matcher_service.matcher.for_chat(event.chat_id, session_name)
+        message = event.message.text
+
+        # Several accounts share groups; only the first copy of a message per profile goes on
+        keys = message_keys(event, matcher.name)
+        if self.duplicate_filter.check(keys):
+            return
+
+        # Cheap local checks first; get_sender/get_chat may hit the network
+        sender_id = event.sender_id
+        if sender_id is None or sender_id in self.ignore_filter:
+            return
+
+        result = self.monitor_message(message, matcher)
+        if not result:
+            return
+        if self.metrics is not None:
+            self.metrics.record(MATCHED, session_name, event.chat_id, result.keywords)
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.matched(result.keywords)
+
+        # Collapse reposted spam with small edits into the first alert
+        cluster = None
+        if self.near_duplicates is not None:
+            normalized = matcher.rule_set.normalize(message)
+            cluster, is_new = self.near_duplicates.check(normalized, event.chat_id)
+            if not is_new:
+                self._report_near_duplicate(cluster)
+                return
+
+        # Entities shipped with the update fill the shared cache; RPCs only on a miss
+        sender = await self.entity_cache.resolve(sender_id, event.sender, event.get_sender)
+        if not sender:
+            return
+
+        chat = await self.entity_cache.resolve(event.chat_id, event.chat, event.get_chat)
+        chat_title = chat.title if chat and chat.title else 'Unknown Chat'
+
+        # Format message for forwarding
+        text = (
+            f"• User: {sender.first_name} {sender.last_name}\n"
+            f"• User ID: `{sender.id}`\n"
+            f"• Chat: {chat_title}\n"
+            f"• Keywords: {', '.join(result.keywords) or '-'}\n"
+            + (f"• Rules: {', '.join(result.rules)}\n" if result.rules else "")
+            + ("• Backfilled: posted while offline\n" if backfilled else "")
+            + f"\n• Message:\n{message}\n"
+        )
+
+        # Generate message link
+        if chat and chat.username:
+            message_link = f"https://t.me/{chat.username}/{event.id}"
+        else:
+            chat_id = str(event.chat_id).replace('-100', '', 1)
+            message_link = f"https://t.me/c/{chat_id}/{event.id}"
+
+        urgent = self.digest is not None and self.digest.is_urgent(result.keywords)
+        alert = Alert(text, message_link, sender.id, urgent,
+                      source=(session_name, event.chat_id, tuple(result.keywords)))
+        if self.hit_sink is not None:
+            # Worker mode: another process owns delivery and deduplicates across workers
+            await self.hit_sink((alert.encode(), keys))
+            return
+        await self._queue_alert(alert._replace(cluster=cluster))
+
+    async def _queue_alert(self, alert):
+        """Record an alert in the outbox and queue it for delivery."""
+        if self.outbox is not None:
+            # Written before queuing so a restart replays it until _ack
+            alert = alert._replace(id=self.outbox.add(alert.encode()))
+        await self.pipeline['deliver'].put(alert, HIGH if alert.urgent else LOW)
+
+    async def accept_hit(self, record):
+        """
+        Queue a hit record forwarded by a worker process for delivery.
+
+        Args:
+            record: (encoded alert, dedup keys) tuple produced in worker mode
+        """
+        payload, keys = record
+        # Workers only see their own accounts; shared groups are deduplicated here
+        if self.duplicate_filter.check(keys):
+            return
+        await self._queue_alert(Alert.decode(payload))
+
+    async def _deliver(self, alert):
+        """
+        Delivery stage: send an alert now, or add it to the open digest batch.
+
+        Args:
+            alert: Alert queued by the match stage
+        """
+        if self.digest is None or alert.urgent:
+            await self._send_alert(alert)
+            return
+
+        batch = self.digest.add(alert)
+        if batch:
+            self._queue_digest(batch)
+        else:
+            self._schedule_digest_flush()
+
+    def _schedule_digest_flush(self):
+        if self._digest_flush is None:
+            self._digest_flush = asyncio.create_task(self._flush_digest_later())
+
+    async def _flush_digest_later(self):
+        """Hand the open digest batch to the sender once its window has passed."""
+        try:
+            while len(self.digest):
+                delay = self.digest.due_in()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                self._queue_digest(self.digest.take())
+        finally:
+            self._digest_flush = None
+
+    def _queue_digest(self, batch):
+        """Queue a due batch; the deliver worker goes on with the next alert meanwhile."""
+        self._digest_batches.append(batch)
+        if self._digest_sender is None:
+            self._digest_sender = asyncio.create_task(self._send_digests())
+
+    async def _send_digests(self):
+        try:
+            while self._digest_batches:
+                await self._send_digest(self._digest_batches.popleft())
+        finally:
+            self._digest_sender = None
+
+    async def _send_digest(self, batch):
+        """
+        Send a batch of alerts as one digest, split at the message length limit.
+
+        Alerts are acked as soon as the chunk holding the end of their entry
+        is sent. If a chunk fails, only the alerts not sent yet go back into
+        the open batch and are retried with it.
+        """
+        sent = 0
+        try:
+            if len(batch) == 1:
+                await self._send_alert(batch[0])
+                return
+
+            # Entries show their near-duplicate counts as of now; digests are never edited
+            chunks = split_digest(batch)
+            buttons = digest_buttons(batch)
+            for index, (chunk, complete) in enumerate(chunks):
+                await self.rate_limiter.send(CHANNEL_ID, partial(
+                    self.bot.bot.send_message,
                     CHANNEL_ID,
-                    text,
-                    buttons=buttons,
+                    chunk,
+                    buttons=buttons if index == len(chunks) - 1 else None,
                     link_preview=False
-                )
+                ), LOW)
+                self._ack(*batch[sent:complete])
+                self._record_forwarded(*batch[sent:complete])
+                sent = complete
+        except Exception as e:
+            logger.error(f"Error sending digest, retrying {len(batch) - sent} alerts: {e}", exc_info=True)
+            self.digest.requeue(batch[sent:])
+            self._schedule_digest_flush()
 
-            except Exception as e:
-                logger.error(f"Error processing message: {e}", exc_info=True)
+    async def _send_alert(self, alert):
+        """Send a single alert with its own buttons."""
+        buttons = [
+            [Button.url("View Message", url=alert.link)],
+            [Button.inline("🚫Ignore🚫", data=f"ignore_{alert.sender_id}")]
+        ]
 
+        # Paced per destination; flood waits pause the channel and retry this alert first
+        started = time.monotonic()
+        message = await self.rate_limiter.send(CHANNEL_ID, partial(
+            self.bot.bot.send_message,
+            CHANNEL_ID,
+            alert.text,
+            buttons=buttons,
+            link_preview=False
+        ), HIGH if alert.urgent else LOW)
+        if self.metrics is not None:
+            self.metrics.observe(SEND, time.monotonic() - started)
+        self._ack(alert)
+        self._record_forwarded(alert)
+        if alert.cluster is not None:
+            alert.cluster.alert, alert.cluster.alert_text = message, alert.text
+            if alert.cluster.count > alert.cluster.reported:
+                # Reposts that arrived while the first alert was queued
+                self._report_near_duplicate(alert.cluster)
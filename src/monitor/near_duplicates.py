@@ -0,0 +1,184 @@
+# src/monitor/near_duplicates.py
+
+import logging
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+MERSENNE_PRIME = (1 << 61) - 1
+HASH_MASK = (1 << 32) - 1
+WHITESPACE = re.compile(r"\s+")
+# Seconds reposts are collected before the first alert of their cluster is edited
+EDIT_INTERVAL = 10
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 32, shingle_size: int = 4, seed: int = 1):
+        """
+        MinHash signatures over character shingles.
+
+        Shingles are hashed once with the built-in hash(), which is stable
+        within a process; signatures are only compared in memory. Each
+        permutation is a universal hash (a * h + b) mod p over those values.
+
+        :param num_perm: Signature length
+        :param shingle_size: Characters per shingle
+        :param seed: Seed for the permutation coefficients
+        """
+        rng = random.Random(seed)
+        self.shingle_size = shingle_size
+        self.permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """
+        Compute the MinHash signature of normalized text.
+
+        :param text: Normalized message text
+        :return: Tuple of num_perm minimum hash values
+        """
+        text = WHITESPACE.sub(" ", text).strip()
+        size = self.shingle_size
+        if len(text) <= size:
+            shingles = {text}
+        else:
+            shingles = {text[i:i + size] for i in range(len(text) - size + 1)}
+        hashes = [hash(shingle) & HASH_MASK for shingle in shingles]
+        prime = MERSENNE_PRIME
+        return tuple(min((a * h + b) % prime for h in hashes) for a, b in self.permutations)
+
+
+class NearDuplicateCluster:
+    def __init__(self, signature: Tuple[int, ...], chat_id: Any, now: float):
+        """
+        A group of near-identical messages reported as one alert.
+
+        :param signature: MinHash signature of the first message
+        :param chat_id: Chat of the first message
+        :param now: Monotonic time of the first message
+        """
+        self.signature = signature
+        self.chats: Set[Any] = {chat_id}
+        self.count = 1
+        self.last_seen = now
+        self.alert = None
+        self.alert_text = None
+        # Message count shown on the alert by the last edit
+        self.reported = 1
+
+    def summary(self) -> str:
+        """Return the line reporting where and how often the message was seen."""
+        return f"• Seen in {len(self.chats)} chats ({self.count} messages)"
+
+
+class NearDuplicateIndex:
+    def __init__(self, window: float = 3600, threshold: float = 0.5, bands: int = 16, rows: int = 2,
+                 max_clusters: int = 10000, edit_interval: float = EDIT_INTERVAL):
+        """
+        Rolling banded-LSH index of recent MinHash signatures.
+
+        Signatures are cut into `bands` slices of `rows` values. Only clusters
+        sharing a slice with a new message are compared, and a cluster matches
+        when the estimated Jaccard similarity reaches threshold.
+
+        Clusters are kept in order of their last message, so expiry and the
+        size cap always drop the least recently seen ones.
+
+        :param window: Seconds a cluster stays matchable after its last message
+        :param threshold: Minimum estimated Jaccard similarity of shingle sets
+        :param bands: Number of LSH bands
+        :param rows: Signature values per band
+        :param max_clusters: Most clusters kept, however recent
+        :param edit_interval: Seconds reposts are collected into one edit of the cluster's alert
+        """
+        self.window = window
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.max_clusters = max_clusters
+        self.edit_interval = edit_interval
+        self.hasher = MinHasher(num_perm=bands * rows)
+        self._buckets: List[Dict[Tuple[int, ...], List[NearDuplicateCluster]]] = [{} for _ in range(bands)]
+        self._order: "OrderedDict[int, NearDuplicateCluster]" = OrderedDict()
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> Optional["NearDuplicateIndex"]:
+        """
+        Build an index from the NEAR_DUPLICATES config key.
+
+        :param config: Bot configuration dictionary, may be None
+        :return: NearDuplicateIndex, or None when the stage is disabled
+        """
+        settings = (config or {}).get("NEAR_DUPLICATES")
+        if not settings:
+            return None
+        if not isinstance(settings, dict):
+            settings = {}
+        return cls(window=settings.get("window", 3600), threshold=settings.get("threshold", 0.5),
+                   max_clusters=settings.get("max_clusters", 10000),
+                   edit_interval=settings.get("edit_interval", EDIT_INTERVAL))
+
+    def __len__(self):
+        return len(self._order)
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows] for i in range(self.bands)]
+
+    def _remove(self, cluster: NearDuplicateCluster) -> None:
+        del self._order[id(cluster)]
+        for band, key in enumerate(self._band_keys(cluster.signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.remove(cluster)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def _oldest(self) -> NearDuplicateCluster:
+        return next(iter(self._order.values()))
+
+    def _expire(self, now: float) -> None:
+        while self._order and self._oldest().last_seen + self.window < now:
+            self._remove(self._oldest())
+
+    def check(self, text: str, chat_id: Any, now: Optional[float] = None) -> Tuple[NearDuplicateCluster, bool]:
+        """
+        Attach a message to a matching recent cluster or start a new one.
+
+        :param text: Normalized message text
+        :param chat_id: Chat the message was posted in
+        :param now: Current monotonic time, for tests
+        :return: (cluster, is_new)
+        """
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        signature = self.hasher.signature(text)
+        keys = self._band_keys(signature)
+        size = len(signature)
+
+        checked = set()
+        for band, key in enumerate(keys):
+            for cluster in self._buckets[band].get(key, ()):
+                if id(cluster) in checked or cluster.last_seen + self.window < now:
+                    continue
+                checked.add(id(cluster))
+                same = sum(1 for x, y in zip(signature, cluster.signature) if x == y)
+                if same >= self.threshold * size:
+                    cluster.count += 1
+                    cluster.chats.add(chat_id)
+                    cluster.last_seen = now
+                    self._order.move_to_end(id(cluster))
+                    return cluster, False
+
+        if len(self._order) >= self.max_clusters:
+            self._remove(self._oldest())
+        cluster = NearDuplicateCluster(signature, chat_id, now)
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(cluster)
+        self._order[id(cluster)] = cluster
+        return cluster, True
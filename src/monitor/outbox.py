@@ -0,0 +1,179 @@
+# src/monitor/outbox.py
+
+import asyncio
+import json
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    def __init__(self, path: str = "outbox.db", commit_interval: float = 0.05, batch_size: int = 200):
+        """
+        SQLite store of alerts that have not been sent yet.
+
+        The database runs in WAL mode with synchronous=FULL. add() and ack()
+        only queue their statement in memory, with entry IDs handed out here.
+        Once every commit_interval seconds, or sooner after batch_size
+        changes, the queued statements are written and committed in one
+        transaction on a dedicated writer thread, so the fsync never blocks
+        the event loop and one fsync covers a whole group of alerts. An alert
+        added less than commit_interval before a crash may be lost. An alert
+        sent just before a crash may be sent again on replay.
+
+        :param path: Database file, or ":memory:" for tests
+        :param commit_interval: Seconds between group commits
+        :param batch_size: Changes that trigger a commit right away
+        """
+        self.path = path
+        self.commit_interval = commit_interval
+        self.batch_size = batch_size
+        self._conn: Optional[sqlite3.Connection] = None
+        # One thread owns the connection once open() returns, so writes never interleave
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._task = None
+        self._full = asyncio.Event()
+        self._writes: List[Tuple[str, tuple]] = []
+        self._ids: Set[int] = set()
+        self._next_id = 1
+        self.pending = 0
+        self.added = 0
+        self.acked = 0
+        self.commits = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> Optional["Outbox"]:
+        """
+        Build an outbox from the OUTBOX config key.
+
+        :param config: Bot configuration dictionary, may be None
+        :return: Outbox, or None when OUTBOX is set to false
+        """
+        settings = (config or {}).get("OUTBOX", {})
+        if settings is False:
+            return None
+        if not isinstance(settings, dict):
+            settings = {}
+        return cls(
+            path=settings.get("path", "outbox.db"),
+            commit_interval=settings.get("commit_interval", 0.05)
+        )
+
+    def open(self) -> List[Tuple[int, Any]]:
+        """
+        Open the database and return the alerts left over from the last run.
+
+        :return: (entry_id, payload) pairs in the order they were added
+        """
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS alerts (id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        rows = self._conn.execute("SELECT id, payload FROM alerts ORDER BY id").fetchall()
+        # AUTOINCREMENT never reuses IDs, even of acked rows; the sequence covers them
+        sequence = self._conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'alerts'").fetchone()
+        self._next_id = (sequence[0] if sequence else 0) + 1
+        self._ids = {entry_id for entry_id, _ in rows}
+        self.pending = len(rows)
+        if rows:
+            logger.info(f"Replaying {len(rows)} unsent alerts from {self.path}")
+        return [(entry_id, json.loads(payload)) for entry_id, payload in rows]
+
+    def start(self) -> None:
+        """Start the group commit task; must be called from a running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the commit task, commit outstanding changes, close the database and its writer thread."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._conn is not None:
+            await self.flush()
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._conn.close)
+            self._conn = None
+            # Nothing is queued any more, so this only joins the idle thread
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def add(self, payload: Any) -> int:
+        """
+        Record an alert; it becomes durable with the next group commit.
+
+        :param payload: JSON-serializable alert
+        :return: Entry ID to pass to ack()
+        """
+        entry_id = self._next_id
+        self._next_id += 1
+        self._writes.append((
+            "INSERT INTO alerts (id, payload) VALUES (?, ?)",
+            (entry_id, json.dumps(payload, ensure_ascii=False))
+        ))
+        self._ids.add(entry_id)
+        self.pending += 1
+        self.added += 1
+        self._changed()
+        return entry_id
+
+    def ack(self, entry_id: Optional[int]) -> None:
+        """Remove an alert once it was sent or deliberately dropped."""
+        if entry_id not in self._ids:
+            return
+        self._ids.discard(entry_id)
+        self._writes.append(("DELETE FROM alerts WHERE id = ?", (entry_id,)))
+        self.pending -= 1
+        self.acked += 1
+        self._changed()
+
+    def _changed(self) -> None:
+        if len(self._writes) >= self.batch_size:
+            self._full.set()
+
+    def _write(self, writes: List[Tuple[str, tuple]]) -> bool:
+        """Run queued statements in one transaction; called on the writer thread."""
+        try:
+            with self._conn:
+                for statement, parameters in writes:
+                    self._conn.execute(statement, parameters)
+        except sqlite3.Error as e:
+            logger.error(f"Error committing outbox: {e}")
+            return False
+        self.commits += 1
+        return True
+
+    async def flush(self) -> None:
+        """Commit outstanding changes now, off the event loop."""
+        if not self._writes or self._conn is None:
+            return
+        writes, self._writes = self._writes, []
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(self._executor, self._write, writes):
+            # Rolled back; retried ahead of newer changes with the next commit
+            self._writes[:0] = writes
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.commit_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """Return pending alerts and write counters."""
+        return {
+            "pending": self.pending,
+            "added": self.added,
+            "acked": self.acked,
+            "commits": self.commits,
+        }
@@ -0,0 +1,297 @@
+# src/monitor/pipeline.py
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+SPILL = "spill"
+POLICIES = (BLOCK, DROP_OLDEST, SPILL)
+
+LOW = 0
+HIGH = 1
+
+LATENCY_SMOOTHING = 0.1
+
+
+class Stage:
+    def __init__(self, name: str, handler: Callable[[Any], Awaitable[None]], workers: int = 1,
+                 maxsize: int = 1000, policy: str = BLOCK, spill_path: Optional[str] = None,
+                 encode: Optional[Callable[[Any], Any]] = None, decode: Optional[Callable[[Any], Any]] = None,
+                 on_drop: Optional[Callable[[Any], None]] = None):
+        """
+        Bounded queue served by a pool of worker tasks.
+
+        When the queue is full, put() follows the overflow policy:
+        block waits for a free slot, drop_oldest evicts the oldest item of the
+        lowest queued priority unless that is above the new item's (then the
+        new item is rejected), and spill appends items to a JSON lines file
+        until the workers catch up.
+        While anything is spilled new items go to the file too, so order is kept.
+
+        The spill file only absorbs bursts; it is truncated on start and is
+        not replayed after a restart.
+
+        :param name: Stage name used in logs and stats
+        :param handler: Coroutine function called with each item
+        :param workers: Number of worker tasks
+        :param maxsize: Maximum number of items held in memory
+        :param policy: One of block, drop_oldest or spill
+        :param spill_path: File used by the spill policy
+        :param encode: Converts an item to a JSON value for spilling
+        :param decode: Rebuilds an item from its JSON value
+        :param on_drop: Called with each item the stage drops
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        if policy == SPILL and (spill_path is None or encode is None or decode is None):
+            raise ValueError(f"Stage {name} cannot spill without a spill path and item codec")
+        if workers < 1 or maxsize < 1:
+            raise ValueError("workers and maxsize must be positive")
+
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.maxsize = maxsize
+        self.policy = policy
+        self.spill_path = spill_path
+        self.encode = encode
+        self.decode = decode
+        self.on_drop = on_drop
+
+        self._items: "deque[tuple]" = deque()
+        self._lock = asyncio.Lock()
+        self._not_empty = asyncio.Condition(self._lock)
+        self._not_full = asyncio.Condition(self._lock)
+        self._idle = asyncio.Condition(self._lock)
+        self._tasks = []
+        self._writer = None
+        self._reader = None
+        self._spilled = 0
+        self._unfinished = 0
+
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.spilled_total = 0
+        self.wait_time = 0.0
+        self.service_time = 0.0
+        self.max_wait = 0.0
+
+    @classmethod
+    def from_config(cls, name: str, handler: Callable[[Any], Awaitable[None]], config: Optional[dict],
+                    **defaults) -> "Stage":
+        """
+        Build a stage from its entry under the PIPELINE config key.
+
+        Invalid settings are logged and replaced by the defaults.
+
+        :param name: Stage name, also the key under PIPELINE
+        :param handler: Coroutine function called with each item
+        :param config: Bot configuration dictionary, may be None
+        :param defaults: Keyword arguments used for missing settings
+        """
+        settings = ((config or {}).get("PIPELINE") or {}).get(name) or {}
+        options = dict(defaults)
+        options.setdefault("spill_path", f"spill_{name}.jsonl")
+        for key in ("workers", "maxsize", "policy", "spill_path"):
+            if key in settings:
+                options[key] = settings[key]
+        try:
+            return cls(name, handler, **options)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Invalid PIPELINE settings for {name}, using defaults: {e}")
+            defaults.setdefault("spill_path", f"spill_{name}.jsonl")
+            return cls(name, handler, **defaults)
+
+    def __len__(self):
+        return len(self._items) + self._spilled
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Start the worker tasks; must be called from a running event loop."""
+        if self._tasks:
+            return
+        if self.policy == SPILL:
+            self._writer = open(self.spill_path, "w", encoding="utf-8")
+            self._reader = open(self.spill_path, "r", encoding="utf-8")
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-{i}") for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the workers and close the spill file. Queued items are discarded."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for handle in (self._writer, self._reader):
+            if handle is not None:
+                handle.close()
+        self._writer = self._reader = None
+
+    async def put(self, item: Any, priority: int = LOW) -> bool:
+        """
+        Queue an item, applying the overflow policy when the stage is full.
+
+        :param item: Item passed to the handler
+        :param priority: LOW or HIGH; only drop_oldest looks at it
+        :return: False if the item was dropped
+        """
+        async with self._lock:
+            if self.policy == SPILL and (self._spilled or len(self._items) >= self.maxsize):
+                self._spill(item, priority)
+            else:
+                while len(self._items) >= self.maxsize:
+                    if self.policy == DROP_OLDEST:
+                        if not self._drop_oldest(priority):
+                            self._dropped(item)
+                            return False
+                        break
+                    await self._not_full.wait()
+                self._items.append((priority, time.monotonic(), item))
+            self._unfinished += 1
+            self._not_empty.notify()
+            return True
+
+    async def join(self) -> None:
+        """Wait until every queued item has been handled."""
+        async with self._lock:
+            while self._unfinished:
+                await self._idle.wait()
+
+    def _drop_oldest(self, priority: int) -> bool:
+        lowest = min(entry[0] for entry in self._items)
+        if lowest > priority:
+            return False
+        for index, entry in enumerate(self._items):
+            if entry[0] == lowest:
+                del self._items[index]
+                self._unfinished -= 1
+                self._dropped(entry[2])
+                return True
+        return False
+
+    def _dropped(self, item: Any) -> None:
+        self.dropped += 1
+        if self.on_drop is not None:
+            self.on_drop(item)
+
+    def _spill(self, item: Any, priority: int) -> None:
+        record = {"priority": priority, "queued": time.monotonic(), "item": self.encode(item)}
+        self._writer.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._writer.flush()
+        self._spilled += 1
+        self.spilled_total += 1
+
+    def _refill(self) -> None:
+        while self._spilled and len(self._items) < self.maxsize:
+            record = json.loads(self._reader.readline())
+            self._spilled -= 1
+            try:
+                item = self.decode(record["item"])
+            except Exception as e:
+                logger.error(f"Dropping undecodable spilled item in {self.name} stage: {e}")
+                self.dropped += 1
+                self._unfinished -= 1
+                continue
+            self._items.append((record["priority"], record["queued"], item))
+        if not self._spilled:
+            self._writer.seek(0)
+            self._writer.truncate()
+            self._reader.seek(0)
+
+    async def _get(self) -> tuple:
+        async with self._lock:
+            while not self._items:
+                if self._spilled:
+                    self._refill()
+                    continue
+                await self._not_empty.wait()
+            entry = self._items.popleft()
+            if self._spilled and len(self._items) < self.maxsize // 2:
+                self._refill()
+            self._not_full.notify()
+            return entry
+
+    async def _task_done(self) -> None:
+        async with self._lock:
+            self._unfinished -= 1
+            if not self._unfinished:
+                self._idle.notify_all()
+
+    async def _worker(self) -> None:
+        while True:
+            _, queued, item = await self._get()
+            started = time.monotonic()
+            try:
+                await self.handler(item)
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Error in {self.name} stage: {e}", exc_info=True)
+            finally:
+                finished = time.monotonic()
+                wait = started - queued
+                self.max_wait = max(self.max_wait, wait)
+                self.wait_time += (wait - self.wait_time) * LATENCY_SMOOTHING
+                self.service_time += (finished - started - self.service_time) * LATENCY_SMOOTHING
+                await self._task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, counters and smoothed wait/service latency in milliseconds."""
+        return {
+            "depth": len(self._items),
+            "spilled": self._spilled,
+            "workers": self.workers,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "spilled_total": self.spilled_total,
+            "wait_ms": round(self.wait_time * 1000, 2),
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "service_ms": round(self.service_time * 1000, 2),
+        }
+
+
+class Pipeline:
+    def __init__(self, stages: Iterable[Stage]):
+        """
+        Ordered set of stages; each stage's handler feeds the next one by name.
+
+        :param stages: Stages in processing order
+        """
+        self.stages: Dict[str, Stage] = {stage.name: stage for stage in stages}
+
+    def __getitem__(self, name: str) -> Stage:
+        return self.stages[name]
+
+    def start(self) -> None:
+        """Start every stage that is not running yet."""
+        for stage in self.stages.values():
+            stage.start()
+
+    async def stop(self) -> None:
+        """Stop all stages."""
+        for stage in self.stages.values():
+            await stage.stop()
+
+    async def join(self) -> None:
+        """Wait until all stages are drained, in order."""
+        for stage in self.stages.values():
+            await stage.join()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return stats() of each stage keyed by name."""
+        return {name: stage.stats() for name, stage in self.stages.items()}
@@ -0,0 +1,96 @@
+# src/monitor/profiles.py
+
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from telethon.utils import resolve_id
+
+from src.monitor.rules import MatchResult, ProfileMatcher, RuleSet
+
+logger = logging.getLogger(__name__)
+
+
+def chat_key(chat_id: Any) -> int:
+    """
+    Strip Telethon's peer marking so marked and bare chat IDs share one key.
+
+    ``-1001234567890`` (channel), ``-1234567890`` (basic group) and
+    ``1234567890`` all map to 1234567890.
+
+    :param chat_id: Chat ID as found in events or in the config
+    :return: Bare chat ID
+    """
+    return resolve_id(int(chat_id))[0]
+
+
+def iter_client_entries(clients: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (session, entry) pairs for every client that has a settings dictionary.
+
+    The clients key is stored as a list of names, a list of dicts or a mapping of
+    session to groups depending on which part of the bot last wrote it.
+    """
+    if isinstance(clients, dict):
+        for session, entry in clients.items():
+            if isinstance(entry, dict):
+                yield session, entry
+    elif isinstance(clients, list):
+        for entry in clients:
+            if isinstance(entry, dict) and entry.get("session"):
+                yield entry["session"], entry
+
+
+class MatcherIndex:
+    def __init__(self, rule_set: RuleSet, target_groups: Iterable[Any] = (), clients: Any = None):
+        """
+        Map chats and accounts to the matcher of their keyword profile.
+
+        ``TARGET_GROUPS`` entries may be bare chat IDs or ``{"chat_id", "profile"}``
+        dicts, and client entries may carry a ``profile`` used for all of that
+        account's chats. Chat profiles win over account profiles, which win over
+        the global KEYWORDS.
+
+        :param rule_set: RuleSet compiled with every profile
+        :param target_groups: TARGET_GROUPS config entries
+        :param clients: clients config entry
+        """
+        self.rule_set = rule_set
+        self.default = rule_set.default
+        self._by_chat: Dict[int, ProfileMatcher] = {}
+        self._by_session: Dict[str, ProfileMatcher] = {}
+
+        for group in target_groups:
+            if isinstance(group, dict) and group.get("profile") and group.get("chat_id") is not None:
+                self._by_chat[chat_key(group["chat_id"])] = self._lookup(group["profile"])
+
+        for session, entry in iter_client_entries(clients):
+            if entry.get("profile"):
+                self._by_session[session] = self._lookup(entry["profile"])
+
+    def _lookup(self, name: str) -> ProfileMatcher:
+        if name not in self.rule_set.profiles:
+            logger.warning(f"Unknown keyword profile '{name}', using global keywords")
+        return self.rule_set.profile(name)
+
+    def __len__(self):
+        return len(self.rule_set)
+
+    def for_chat(self, chat_id: Any, session: Optional[str] = None) -> ProfileMatcher:
+        """
+        Return the matcher for a chat with two dictionary lookups at most.
+
+        :param chat_id: Chat ID from the event
+        :param session: Session name of the receiving account
+        :return: ProfileMatcher to run on the message
+        """
+        matcher = self._by_chat.get(chat_key(chat_id)) if chat_id is not None else None
+        if matcher is None and session is not None:
+            matcher = self._by_session.get(session)
+        return matcher if matcher is not None else self.default
+
+    def search(self, text: str) -> MatchResult:
+        """Match a message against the global KEYWORDS and RULES."""
+        return self.default.search(text)
+
+    def matched_keywords(self, text: str) -> List[str]:
+        """Return the distinct labels of matched KEYWORDS entries."""
+        return self.default.matched_keywords(text)
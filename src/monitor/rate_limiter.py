@@ -0,0 +1,266 @@
+# src/monitor/rate_limiter.py
+
+import asyncio
+import heapq
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from telethon.errors import FloodWaitError
+
+logger = logging.getLogger(__name__)
+
+THROUGHPUT_WINDOW = 60
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, now: float):
+        """
+        Token bucket refilled continuously at `rate` tokens per second.
+
+        :param rate: Tokens added per second
+        :param capacity: Maximum number of stored tokens (burst size)
+        :param now: Current monotonic time
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Return seconds until a token is available, 0 if one is available now."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        """Consume one token; call only after delay() returned 0."""
+        self._refill(now)
+        self.tokens -= 1
+
+    def pause(self, seconds: float, now: float) -> None:
+        """Hand out no tokens for `seconds`, then allow one send right away."""
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 1
+        self.updated = self.paused_until
+
+
+class PriorityLock:
+    def __init__(self):
+        """
+        asyncio lock handed to the waiter with the highest priority first,
+        in arrival order among equal priorities.
+        """
+        self._locked = False
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = 0
+
+    def locked(self) -> bool:
+        return self._locked
+
+    async def acquire(self, priority: int = 0) -> None:
+        """Wait for the lock; higher priorities are served first."""
+        if not self._locked and not self._waiters:
+            self._locked = True
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._sequence += 1
+        heapq.heappush(self._waiters, (-priority, self._sequence, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Handed over just as the waiter was cancelled: pass it on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Hand the lock to the next waiter, or unlock it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._locked = False
+
+
+class RateLimiter:
+    def __init__(self, rate: float = 30, burst: float = 30, chat_rate: float = 20 / 60, chat_burst: float = 5,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep):
+        """
+        Outbound send scheduler with a global and a per-destination token bucket.
+
+        Sends to one destination are serialized by priority, then in FIFO
+        order, so an urgent alert overtakes queued digest traffic and an
+        alert retried after a FloodWaitError still goes out before later ones.
+        Telethon sleeps through short flood waits itself (flood_sleep_threshold);
+        longer ones reach send() and pause that destination for e.seconds.
+
+        :param rate: Global sends per second
+        :param burst: Global bucket capacity
+        :param chat_rate: Sends per second to a single destination
+        :param chat_burst: Per-destination bucket capacity
+        :param clock: Monotonic clock, for tests
+        :param sleep: Sleep coroutine function, for tests
+        """
+        if min(rate, burst, chat_rate, chat_burst) <= 0:
+            raise ValueError("Rates and bursts must be positive")
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.clock = clock
+        self.sleep = sleep
+        self._global = TokenBucket(rate, burst, clock())
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._locks: Dict[Hashable, PriorityLock] = {}
+        self._sent_at: "deque[float]" = deque()
+
+        self.sent = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.flood_waits = 0
+        self.flood_wait_seconds = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "RateLimiter":
+        """
+        Build a limiter from the RATE_LIMIT config key, falling back to defaults.
+
+        :param config: Bot configuration dictionary, may be None
+        """
+        settings = (config or {}).get("RATE_LIMIT") or {}
+        try:
+            return cls(**{key: settings[key] for key in ("rate", "burst", "chat_rate", "chat_burst") if key in settings})
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Invalid RATE_LIMIT settings, using defaults: {e}")
+            return cls()
+
+    def _bucket(self, destination: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(destination)
+        if bucket is None:
+            bucket = self._buckets[destination] = TokenBucket(self.chat_rate, self.chat_burst, self.clock())
+        return bucket
+
+    def pause(self, destination: Hashable, seconds: float) -> None:
+        """Stop sending to a destination for the given number of seconds."""
+        self._bucket(destination).pause(seconds, self.clock())
+
+    async def acquire(self, destination: Hashable) -> float:
+        """
+        Wait for a token from both the destination and the global bucket.
+
+        :param destination: Chat the message goes to
+        :return: Seconds spent waiting
+        """
+        bucket = self._bucket(destination)
+        started = self.clock()
+        while True:
+            now = self.clock()
+            delay = max(bucket.delay(now), self._global.delay(now))
+            if delay <= 0:
+                bucket.take(now)
+                self._global.take(now)
+                return now - started
+            await self.sleep(delay)
+
+    async def send(self, destination: Hashable, send: Callable[[], Awaitable[Any]], priority: int = 0) -> Any:
+        """
+        Run a send call when the buckets allow it, retrying it after flood waits.
+
+        :param destination: Chat the message goes to
+        :param send: Coroutine function performing the request
+        :param priority: Sends with a higher priority go first
+        :return: Result of send()
+        """
+        lock = self._locks.get(destination)
+        if lock is None:
+            lock = self._locks[destination] = PriorityLock()
+        await lock.acquire(priority)
+        try:
+            waited = 0.0
+            while True:
+                waited += await self.acquire(destination)
+                try:
+                    result = await send()
+                except FloodWaitError as e:
+                    self.flood_waits += 1
+                    self.flood_wait_seconds += e.seconds
+                    logger.warning(f"Flood wait of {e.seconds}s sending to {destination}, retrying afterwards")
+                    self.pause(destination, e.seconds)
+                    continue
+                self._record(waited)
+                return result
+        finally:
+            lock.release()
+
+    def _record(self, waited: float) -> None:
+        now = self.clock()
+        self.sent += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self._sent_at.append(now)
+        while self._sent_at and self._sent_at[0] < now - THROUGHPUT_WINDOW:
+            self._sent_at.popleft()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return send counts, throughput over the last minute and wait times."""
+        now = self.clock()
+        while self._sent_at and self._sent_at[0] < now - THROUGHPUT_WINDOW:
+            self._sent_at.popleft()
+        return {
+            "sent": self.sent,
+            "per_minute": round(len(self._sent_at) * 60 / THROUGHPUT_WINDOW, 1),
+            "avg_wait_ms": round(self.total_wait / self.sent * 1000, 2) if self.sent else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "flood_waits": self.flood_waits,
+            "flood_wait_seconds": self.flood_wait_seconds,
+            "paused": sum(1 for bucket in self._buckets.values() if bucket.paused_until > now),
+        }
+
+
+class AdaptiveDelay:
+    def __init__(self, initial: float = 1.0, minimum: float = 0.2, maximum: float = 30.0,
+                 increase: float = 2.0, decrease: float = 0.8,
+                 sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep):
+        """
+        Pause between paged requests that adapts to flood waits.
+
+        Each successful page shrinks the pause by `decrease`; a flood wait
+        multiplies it by `increase`, so a client that gets throttled slows
+        down while the others keep their pace.
+
+        :param initial: First pause in seconds
+        :param minimum: Shortest pause
+        :param maximum: Longest pause
+        :param increase: Factor applied after a flood wait
+        :param decrease: Factor applied after a successful page
+        :param sleep: Sleep coroutine function, for tests
+        """
+        self.delay = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.sleep = sleep
+
+    async def wait(self) -> None:
+        """Sleep for the current pause."""
+        await self.sleep(self.delay)
+
+    def success(self) -> None:
+        """Shorten the pause after a page went through."""
+        self.delay = max(self.minimum, self.delay * self.decrease)
+
+    def flood(self) -> None:
+        """Lengthen the pause after a flood wait."""
+        self.delay = min(self.maximum, self.delay * self.increase)
@@ -0,0 +1,340 @@
+# src/monitor/regex_rules.py
+
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Callable, Collection, Dict, Iterable, List, Optional
+
+from src.monitor.matcher import KeywordMatch
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+REGEX_FLAGS = re.IGNORECASE
+
+# Group references shift once the pattern is wrapped into the combined alternation
+_GROUP_REFERENCES = {sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS}
+_LITERALS = {sre_parse.LITERAL, sre_parse.NOT_LITERAL}
+
+QUANTIFIERS = "*+?{"
+
+
+def _walk(items):
+    """Yield every (op, av) node of a parsed pattern, nested ones included."""
+    for op, av in items:
+        yield op, av
+        if op is sre_parse.IN:
+            # Class members: (LITERAL, code), (RANGE, (low, high)), ...
+            yield from av
+            continue
+        for value in av if isinstance(av, (list, tuple)) else (av,):
+            if isinstance(value, sre_parse.SubPattern):
+                yield from _walk(value)
+            elif isinstance(value, (list, tuple)):
+                for branch in value:
+                    if isinstance(branch, sre_parse.SubPattern):
+                        yield from _walk(branch)
+
+
+def _uses_group_references(items) -> bool:
+    return any(op in _GROUP_REFERENCES for op, _ in _walk(items))
+
+
+def _folds(char: str, normalize: Callable[[str], str]) -> bool:
+    """Return True if normalize changes a character by more than its case."""
+    return normalize(char).lower() != char.lower()
+
+
+def fold_pattern(pattern: str, normalize: Callable[[str], str]) -> str:
+    """
+    Fold the literal characters of a regex keyword like message text.
+
+    Messages are normalized before matching, so a pattern spelled with
+    Arabic ي would never match text where it became Persian ی. Regex syntax
+    is all ASCII, so only non-ASCII characters outside escapes are passed
+    through normalize; characters it removes are dropped.
+
+    :param pattern: Regular expression entered by the user
+    :param normalize: Normalizer applied to messages
+    :return: The folded pattern
+    :raises ValueError: If folding would change what the pattern means: a
+        removed character carries a quantifier, a folded character is a range
+        end or a character class would be left empty
+    """
+    if pattern.isascii():
+        return pattern
+    folded = []
+    in_class = False
+    # Characters of the current class in the pattern and after folding
+    members = kept = 0
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            folded.append(pattern[index:index + 2])
+            index += 2
+            members += in_class
+            kept += in_class
+            continue
+        if in_class:
+            if char == "]" and members:
+                if not kept:
+                    raise ValueError(f"Regex '{pattern}' has a character class emptied by normalization")
+                in_class = False
+            elif char == "^" and folded[-1] == "[":
+                pass
+            elif not char.isascii():
+                replacement = normalize(char)
+                if _folds(char, normalize) and "-" in (pattern[index - 1], pattern[index + 1:index + 2]):
+                    raise ValueError(f"Regex '{pattern}' uses '{char}' in a range, which normalization changes")
+                folded.append(replacement)
+                members += 1
+                kept += len(replacement)
+                index += 1
+                continue
+            else:
+                members += 1
+                kept += 1
+        elif char == "[":
+            in_class = True
+            members = kept = 0
+        elif not char.isascii():
+            replacement = normalize(char)
+            if len(replacement) != 1 and replacement != char and pattern[index + 1:index + 2] in tuple(QUANTIFIERS):
+                raise ValueError(f"Regex '{pattern}' repeats '{char}', which normalization removes")
+            char = replacement
+        folded.append(char)
+        index += 1
+    return "".join(folded)
+
+
+def _check_escaped_literals(pattern: str, parsed, normalize: Callable[[str], str]) -> None:
+    """Reject escapes like \\u064a for characters that normalization folds away."""
+    for op, av in _walk(parsed):
+        if op in _LITERALS and av > 0x7F and _folds(chr(av), normalize):
+            raise ValueError(f"Regex '{pattern}' escapes '{chr(av)}'; write the normalized form instead")
+        if op is sre_parse.RANGE and any(
+            code > 0x7F and _folds(chr(code), normalize) for code in av
+        ):
+            raise ValueError(f"Regex '{pattern}' uses '{chr(av[0])}-{chr(av[1])}', which normalization changes")
+
+
+def validate_pattern(pattern: str, normalize: Optional[Callable[[str], str]] = None) -> re.Pattern:
+    """
+    Check that a regex keyword can be used in the combined pattern.
+
+    :param pattern: Regular expression entered by the user, already folded by fold_pattern()
+    :param normalize: Normalizer applied to messages, to reject escaped characters it would fold
+    :return: The compiled pattern
+    :raises ValueError: If the pattern is invalid or unsafe to combine
+    """
+    try:
+        compiled = re.compile(pattern, REGEX_FLAGS)
+    except re.error as e:
+        raise ValueError(f"Invalid regex '{pattern}': {e}") from e
+    if compiled.groupindex:
+        raise ValueError(f"Regex '{pattern}' must not use named groups")
+    parsed = sre_parse.parse(pattern, REGEX_FLAGS)
+    if _uses_group_references(parsed):
+        raise ValueError(f"Regex '{pattern}' must not use group references such as \\1")
+    if normalize is not None:
+        _check_escaped_literals(pattern, parsed, normalize)
+    try:
+        # Wrapped as in RegexRuleSet; global flags like (?i) only compile at the very start
+        re.compile(f"(?:\\A\\B)|(?P<r0>{pattern})", REGEX_FLAGS)
+    except re.error as e:
+        raise ValueError(f"Regex '{pattern}' cannot be combined with other rules: {e}") from e
+    if compiled.fullmatch(""):
+        raise ValueError(f"Regex '{pattern}' matches empty text")
+    return compiled
+
+
+class RegexCache:
+    def __init__(self, filename: str = "regex_cache.json"):
+        """
+        Persist validated, combined regex sources keyed by a hash of the rule set.
+
+        Python cannot serialize compiled patterns, so the cache stores the
+        assembled alternation and the list of rejected rules. A restart with
+        the same rules then compiles one pattern instead of validating every
+        rule separately first.
+
+        :param filename: JSON file holding cached entries
+        """
+        self.filename = filename
+        self._entries: Optional[Dict[str, dict]] = None
+
+    @staticmethod
+    def key(patterns: Iterable[str], folded: Iterable[Optional[str]] = ()) -> str:
+        """
+        Return the cache key for an ordered list of patterns.
+
+        :param patterns: Patterns as entered
+        :param folded: Their fold_pattern() results, None where folding failed
+        """
+        digest = hashlib.sha256()
+        digest.update(str(REGEX_FLAGS).encode())
+        for pattern in patterns:
+            digest.update(pattern.encode("utf-8"))
+            digest.update(b"\0")
+        for pattern in folded:
+            digest.update(b"\1" if pattern is None else pattern.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.filename):
+                try:
+                    with open(self.filename, "r", encoding="utf-8") as f:
+                        self._entries = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.error(f"Error loading regex cache {self.filename}: {e}")
+        return self._entries
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._load().get(key)
+
+    def put(self, key: str, entry: dict) -> None:
+        # Only the latest rule set is useful after a restart
+        self._entries = {key: entry}
+        # Shard workers write the same file at startup; each writes its own
+        # temporary file and swaps it in, so readers never see a partial one
+        temporary = f"{self.filename}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(temporary, self.filename)
+        except (OSError, TypeError) as e:
+            logger.error(f"Error saving regex cache {self.filename}: {e}")
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+
+class RegexRuleSet:
+    def __init__(self, patterns: Iterable[str], cache: Optional[RegexCache] = None,
+                 normalize: Optional[Callable[[str], str]] = None):
+        """
+        Compile all regex keywords into one alternation so a message is scanned once.
+
+        Each rule becomes a named group ``r<index>``. Like any alternation, the
+        scan reports leftmost non-overlapping hits, so a rule whose only match
+        overlaps a hit of another rule is hidden. Callers that need such a
+        rule's outcome exactly search it with search_hidden(). Text without a
+        combined hit matches no rule. Rules that fail validation are logged
+        and skipped.
+
+        Patterns are folded with normalize before compiling, as the text they
+        run on is; hits are still labelled with the pattern as entered.
+
+        :param patterns: Regular expressions, applied to normalized text
+        :param cache: Optional RegexCache to reuse the combined source
+        :param normalize: Normalizer applied to messages, None to compile patterns as they are
+        """
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+        self.rejected: List[str] = []
+        self.normalize = normalize
+        self._labels: Dict[str, str] = {}
+        self._compiled: Optional[re.Pattern] = None
+        self._rules: Dict[str, re.Pattern] = {}
+        self._folded: Dict[str, Optional[str]] = {}
+
+        if not self.patterns:
+            return
+
+        if normalize is not None:
+            for pattern in self.patterns:
+                try:
+                    self._folded[pattern] = fold_pattern(pattern, normalize)
+                except ValueError as e:
+                    logger.error(f"Skipping regex keyword: {e}")
+                    self._folded[pattern] = None
+        key = RegexCache.key(self.patterns, (self._folded[pattern] for pattern in self._folded))
+        cached = cache.get(key) if cache else None
+        if cached:
+            source, self.rejected = cached["source"], cached["rejected"]
+        else:
+            source = self._combine()
+            if cache:
+                cache.put(key, {"source": source, "rejected": self.rejected})
+
+        self._labels = {
+            f"r{index}": pattern for index, pattern in enumerate(self.patterns)
+        }
+        if source:
+            try:
+                self._compiled = re.compile(source, REGEX_FLAGS)
+            except re.error as e:
+                # A cache entry written before a validation rule existed
+                logger.error(f"Cached regex source no longer compiles, rebuilding: {e}")
+                self.rejected = []
+                source = self._combine()
+                if cache:
+                    cache.put(key, {"source": source, "rejected": self.rejected})
+                self._compiled = re.compile(source, REGEX_FLAGS) if source else None
+        rejected = set(self.rejected)
+        self._rules = {
+            pattern: re.compile(self._folded.get(pattern, pattern), REGEX_FLAGS)
+            for pattern in self.patterns if pattern not in rejected
+        }
+        logger.info(f"Compiled {len(self.patterns) - len(self.rejected)} regex keywords into one pattern")
+
+    def _combine(self) -> str:
+        """Validate each rule and join the valid ones into one source string."""
+        parts = []
+        for index, pattern in enumerate(self.patterns):
+            source = self._folded.get(pattern, pattern)
+            if source is None:
+                # Already logged by fold_pattern
+                self.rejected.append(pattern)
+                continue
+            try:
+                validate_pattern(source, self.normalize)
+            except ValueError as e:
+                logger.error(f"Skipping regex keyword: {e}")
+                self.rejected.append(pattern)
+                continue
+            parts.append(f"(?P<r{index}>{source})")
+        return "|".join(parts)
+
+    def __len__(self):
+        return len(self.patterns) - len(self.rejected)
+
+    def search_normalized(self, text: str) -> List[KeywordMatch]:
+        """
+        Scan normalized text once with the combined pattern.
+
+        :param text: Normalized message text
+        :return: KeywordMatch per hit, labelled with the rule's pattern
+        """
+        if self._compiled is None:
+            return []
+        labels = self._labels
+        hits = self._compiled.finditer(text)
+        return [KeywordMatch(labels[match.lastgroup], match.start(), match.end()) for match in hits]
+
+    def search_hidden(self, text: str, patterns: Collection[str]) -> List[KeywordMatch]:
+        """
+        Search single rules the combined scan did not report.
+
+        Only worth it after the combined scan hit something, as that is the
+        only way a rule can be hidden.
+
+        :param text: Normalized message text
+        :param patterns: Patterns of the rules, typically few
+        :return: KeywordMatch of the first hit per rule
+        """
+        matches = []
+        for pattern in patterns:
+            rule = self._rules.get(pattern)
+            match = rule.search(text) if rule is not None else None
+            if match:
+                matches.append(KeywordMatch(pattern, match.start(), match.end()))
+        return matches
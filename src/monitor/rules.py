@@ -0,0 +1,375 @@
+# src/monitor/rules.py
+
+import logging
+import re
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.monitor.keywords import KINDS, CompiledKeywords, keyword_kind, keyword_label, parse_keyword_input
+from src.monitor.matcher import KeywordMatch
+from src.monitor.regex_rules import RegexCache
+
+logger = logging.getLogger(__name__)
+
+OPERATORS = {"AND", "OR", "NOT"}
+TOKEN_PATTERN = re.compile(r'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|([^\s()"]+))')
+
+
+class MatchResult(NamedTuple):
+    """Outcome of matching one message."""
+    keywords: List[str]
+    rules: List[str]
+    matches: List[KeywordMatch]
+
+    def __bool__(self):
+        return bool(self.keywords or self.rules)
+
+
+def tokenize(expression: str) -> List[Tuple[str, str]]:
+    """
+    Split a rule expression into ('(' | ')' | 'op' | 'term', value) tokens.
+
+    Terms containing spaces or parentheses must be double-quoted; use \\" for
+    a literal quote inside them. Other backslashes are kept for regex terms.
+    """
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = TOKEN_PATTERN.match(expression, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Unexpected character at position {position} in rule '{expression}'")
+        position = match.end()
+        opening, closing, quoted, word = match.groups()
+        if opening:
+            tokens.append(("(", opening))
+        elif closing:
+            tokens.append((")", closing))
+        elif quoted is not None:
+            tokens.append(("term", quoted.replace('\\"', '"')))
+        elif word in OPERATORS:
+            tokens.append(("op", word))
+        else:
+            tokens.append(("term", word))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing ('term' | 'not' | 'and' | 'or', ...) nodes."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = tokenize(expression)
+        self.position = 0
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self) -> Tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise ValueError(f"Unexpected end of rule '{self.expression}'")
+        self.position += 1
+        return token
+
+    def parse(self):
+        node = self._or()
+        if self._peek() is not None:
+            raise ValueError(f"Unexpected '{self._peek()[1]}' in rule '{self.expression}'")
+        return node
+
+    def _or(self):
+        nodes = [self._and()]
+        while self._peek() == ("op", "OR"):
+            self._take()
+            nodes.append(self._and())
+        return nodes[0] if len(nodes) == 1 else ("or", tuple(nodes))
+
+    def _and(self):
+        nodes = [self._not()]
+        while True:
+            token = self._peek()
+            if token == ("op", "AND"):
+                self._take()
+            elif token is None or token[0] == ")" or token == ("op", "OR"):
+                break
+            # Adjacent terms without an operator are joined with AND
+            nodes.append(self._not())
+        return nodes[0] if len(nodes) == 1 else ("and", tuple(nodes))
+
+    def _not(self):
+        if self._peek() == ("op", "NOT"):
+            self._take()
+            return ("not", self._not())
+        return self._atom()
+
+    def _atom(self):
+        kind, value = self._take()
+        if kind == "(":
+            node = self._or()
+            if self._take()[0] != ")":
+                raise ValueError(f"Missing ')' in rule '{self.expression}'")
+            return node
+        if kind == "term":
+            entry = parse_keyword_input(value)
+            if not entry:
+                raise ValueError(f"Empty term in rule '{self.expression}'")
+            return ("term", entry)
+        raise ValueError(f"Unexpected '{value}' in rule '{self.expression}'")
+
+
+def parse_rule(expression: str):
+    """
+    Parse a boolean rule such as ``(buy OR sell) AND usdt AND NOT scam``.
+
+    Terms use the KEYWORDS input syntax, so ``re:`` and ``fuzzy:`` terms work.
+
+    :param expression: Rule expression
+    :return: Parsed expression tree
+    :raises ValueError: If the expression or one of its terms is invalid
+    """
+    if not expression or not expression.strip():
+        raise ValueError("Rule expression is empty")
+    return _Parser(expression).parse()
+
+
+def rule_terms(node) -> List[Any]:
+    """Return the KEYWORDS entries referenced by a parsed rule."""
+    if node[0] == "term":
+        return [node[1]]
+    if node[0] == "not":
+        return rule_terms(node[1])
+    return [entry for child in node[1] for entry in rule_terms(child)]
+
+
+class _MatchState:
+    """Per-message hit bitset, filled one keyword kind at a time on demand."""
+
+    def __init__(self, compiled: "RuleSet", text: str, profile: Optional["ProfileMatcher"] = None):
+        self.compiled = compiled
+        self.text = text
+        self.profile = profile
+        self.bits = 0
+        self.matches: List[KeywordMatch] = []
+        self.done = -1
+
+    def run_through(self, rank: int) -> None:
+        keywords = self.compiled.keywords
+        while self.done < rank:
+            self.done += 1
+            kind = KINDS[self.done]
+            if not keywords.count(kind):
+                continue
+            found = keywords.search_kind(kind, self.text)
+            self._add(found)
+            if kind == "regex" and found and self.profile is not None:
+                undecided = self._undecided_regex(found)
+                if undecided:
+                    self._add(keywords.search_hidden(self.text, undecided))
+
+    def _add(self, matches: List[KeywordMatch]) -> None:
+        bit_of = self.compiled.bit_of
+        for match in matches:
+            self.bits |= 1 << bit_of[match.keyword]
+            self.matches.append(match)
+
+    def _undecided_regex(self, found: List[KeywordMatch]) -> List[str]:
+        """
+        Return the profile's regex terms whose outcome still matters but that
+        an overlapping hit may have hidden.
+
+        Terms of rules always matter. Keywords only do while none of the
+        profile's keywords has hit, as any hit already reports the message.
+        """
+        profile = self.profile
+        labels = profile.rule_regex
+        if not self.bits & profile.mask:
+            labels = labels | profile.keyword_regex
+        reported = {match.keyword for match in found}
+        return sorted(labels - reported)
+
+    def test(self, bit: int, rank: int) -> bool:
+        if rank > self.done:
+            self.run_through(rank)
+        return (self.bits >> bit) & 1 == 1
+
+
+def _parse_rules(rules: Iterable[Any], rejected: List[str]) -> List[Tuple[str, Any]]:
+    """Parse RULES entries into (name, node) pairs, collecting invalid ones."""
+    parsed = []
+    for rule in rules:
+        if isinstance(rule, dict):
+            expression = rule.get("expression", "")
+            name = rule.get("name") or expression
+        else:
+            expression = name = rule
+        try:
+            parsed.append((name, parse_rule(expression)))
+        except ValueError as e:
+            logger.error(f"Skipping rule '{name}': {e}")
+            rejected.append(name)
+    return parsed
+
+
+class ProfileMatcher:
+    def __init__(self, rule_set: "RuleSet", name: Optional[str], mask: int, rank: int, rules,
+                 keyword_regex: FrozenSet[str] = frozenset(), rule_regex: FrozenSet[str] = frozenset()):
+        """
+        View of a RuleSet restricted to one keyword profile.
+
+        :param rule_set: RuleSet holding the shared compiled keywords
+        :param name: Profile name, None for the global KEYWORDS/RULES
+        :param mask: Bits of the keywords reported for this profile
+        :param rank: Highest keyword kind this profile's keywords need scanned
+        :param rules: (name, predicate) pairs evaluated for this profile
+        :param keyword_regex: Labels of this profile's regex keywords
+        :param rule_regex: Labels of the regex terms of this profile's rules
+        """
+        self.rule_set = rule_set
+        self.name = name
+        self.mask = mask
+        self.rank = rank
+        self.rules = rules
+        self.keyword_regex = keyword_regex
+        self.rule_regex = rule_regex
+
+    def __len__(self):
+        return bin(self.mask).count("1") + len(self.rules)
+
+    def search(self, text: str) -> MatchResult:
+        """
+        Match a message against this profile's keywords and rules.
+
+        :param text: Raw message text
+        :return: MatchResult with matched keyword labels, rule names and hits
+        """
+        if not text or (not self.mask and not self.rules):
+            return MatchResult([], [], [])
+
+        rule_set = self.rule_set
+        state = _MatchState(rule_set, rule_set.normalize(text), self)
+        state.run_through(self.rank)
+        rules = [name for name, predicate in self.rules if predicate(state)]
+
+        mask, bit_of = self.mask, rule_set.bit_of
+        matches = [m for m in state.matches if (mask >> bit_of[m.keyword]) & 1]
+        keywords = list(dict.fromkeys(match.keyword for match in matches))
+        return MatchResult(keywords, rules, matches)
+
+    def matched_keywords(self, text: str) -> List[str]:
+        """Return the distinct labels of matched keywords."""
+        return self.search(text).keywords
+
+
+class RuleSet:
+    def __init__(self, keywords: Iterable[Any], rules: Iterable[Any] = (),
+                 normalize: Callable[[str], str] = str.lower, regex_cache: Optional[RegexCache] = None,
+                 profiles: Optional[Dict[str, Any]] = None):
+        """
+        Compile KEYWORDS and boolean RULES into a single evaluation plan.
+
+        Every keyword and rule term is compiled once into CompiledKeywords, so a
+        message is scanned once per keyword kind and each hit sets a bit. Rules
+        are then evaluated against that bitset and never rescan the text.
+        Regex and fuzzy scans only run when a keyword or rule still needs them,
+        and rule operands are ordered so plain terms are tested first.
+
+        Keyword profiles are compiled into the same automaton. Each profile is a
+        bitmask over the shared keywords plus its own rules, so keywords used by
+        several profiles are only compiled once.
+
+        :param keywords: KEYWORDS entries, any hit is reported
+        :param rules: RULES entries, either expressions or {"name", "expression"} dicts
+        :param normalize: Normalizer applied to messages and keywords
+        :param regex_cache: Optional cache for the combined regex source
+        :param profiles: PROFILES mapping of name to {"keywords", "rules"} or a keyword list
+        """
+        self.normalize = normalize
+        self.rejected: List[str] = []
+
+        specs = {None: (list(keywords), _parse_rules(rules, self.rejected))}
+        for name, profile in (profiles or {}).items():
+            if isinstance(profile, dict):
+                profile_keywords, profile_rules = profile.get("keywords", []), profile.get("rules", [])
+            else:
+                profile_keywords, profile_rules = profile, []
+            specs[name] = (list(profile_keywords), _parse_rules(profile_rules, self.rejected))
+
+        # Deduplicate by label while keeping order, then compile once
+        entries = {}
+        for profile_keywords, parsed in specs.values():
+            for entry in profile_keywords:
+                entries.setdefault(keyword_label(entry), entry)
+            for _, node in parsed:
+                for entry in rule_terms(node):
+                    entries.setdefault(keyword_label(entry), entry)
+        self.keywords = CompiledKeywords(entries.values(), normalize=normalize, regex_cache=regex_cache)
+
+        self.bit_of: Dict[str, int] = {}
+        for entry in entries.values():
+            label = self.keywords.canonical_label(entry)
+            if label is not None:
+                self.bit_of.setdefault(label, len(self.bit_of))
+
+        self.profiles: Dict[Optional[str], ProfileMatcher] = {
+            name: self._profile(name, profile_keywords, parsed)
+            for name, (profile_keywords, parsed) in specs.items()
+        }
+        self.default = self.profiles[None]
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def _profile(self, name, keywords, parsed) -> ProfileMatcher:
+        """Build the keyword mask and rule plans of one profile."""
+        mask, rank = 0, -1
+        for entry in keywords:
+            label = self.keywords.canonical_label(entry)
+            if label is not None:
+                mask |= 1 << self.bit_of[label]
+                rank = max(rank, KINDS.index(keyword_kind(entry)))
+        rules = [(rule_name, self._plan(node)[0]) for rule_name, node in parsed]
+        return ProfileMatcher(self, name, mask, rank, rules,
+                              self._regex_labels(keywords),
+                              self._regex_labels(entry for _, node in parsed for entry in rule_terms(node)))
+
+    def _regex_labels(self, entries: Iterable[Any]) -> FrozenSet[str]:
+        """Return the labels of the compiled regex entries among entries."""
+        return frozenset(
+            label for label in (self.keywords.canonical_label(entry) for entry in entries
+                                if keyword_kind(entry) == "regex")
+            if label is not None
+        )
+
+    def _plan(self, node) -> Tuple[Callable[[_MatchState], bool], int]:
+        """Compile a parsed node into (predicate, cost rank)."""
+        kind = node[0]
+        if kind == "term":
+            entry = node[1]
+            rank = KINDS.index(keyword_kind(entry))
+            label = self.keywords.canonical_label(entry)
+            if label is None:
+                return (lambda state: False), 0
+            bit = self.bit_of[label]
+            return (lambda state: state.test(bit, rank)), rank
+        if kind == "not":
+            predicate, rank = self._plan(node[1])
+            return (lambda state: not predicate(state)), rank
+
+        children = sorted((self._plan(child) for child in node[1]), key=lambda plan: plan[1])
+        predicates = tuple(predicate for predicate, _ in children)
+        rank = children[-1][1]
+        if kind == "and":
+            return (lambda state: all(predicate(state) for predicate in predicates)), rank
+        return (lambda state: any(predicate(state) for predicate in predicates)), rank
+
+    def profile(self, name: Optional[str]) -> ProfileMatcher:
+        """Return the matcher of a profile, falling back to the global one."""
+        return self.profiles.get(name, self.default)
+
+    def search(self, text: str) -> MatchResult:
+        """Match a message against the global KEYWORDS and RULES."""
+        return self.default.search(text)
+
+    def matched_keywords(self, text: str) -> List[str]:
+        """Return the distinct labels of matched KEYWORDS entries."""
+        return self.default.search(text).keywords
@@ -0,0 +1,118 @@
+# src/utils/entity_cache.py
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EntityInfo(NamedTuple):
+    """Display fields of a user or chat needed to format an alert."""
+    id: int
+    first_name: str
+    last_name: str
+    title: str
+    username: Optional[str]
+
+    @classmethod
+    def from_entity(cls, entity_id: int, entity: Any) -> "EntityInfo":
+        return cls(
+            entity_id,
+            getattr(entity, 'first_name', '') or '',
+            getattr(entity, 'last_name', '') or '',
+            getattr(entity, 'title', '') or '',
+            getattr(entity, 'username', None)
+        )
+
+
+class EntityCache:
+    def __init__(self, maxsize: int = 50000, ttl: float = 3600):
+        """
+        Size-bounded LRU cache with TTL for sender and chat display info.
+
+        One instance is shared by all clients, so an entity seen by one account
+        is reused by the others.
+
+        :param maxsize: Maximum number of cached entities
+        :param ttl: Seconds before an entry is considered stale
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.fills = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, entity_id: int) -> Optional[EntityInfo]:
+        """
+        Return cached info for an ID, or None if missing or expired.
+
+        :param entity_id: Peer ID
+        """
+        entry = self._entries.get(entity_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires, info = entry
+        if expires < time.monotonic():
+            del self._entries[entity_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(entity_id)
+        self.hits += 1
+        return info
+
+    def put(self, entity_id: int, entity: Any) -> EntityInfo:
+        """
+        Store display info extracted from an entity.
+
+        :param entity_id: Peer ID
+        :param entity: Telethon User, Chat or Channel
+        :return: The cached EntityInfo
+        """
+        info = EntityInfo.from_entity(entity_id, entity)
+        self._entries[entity_id] = (time.monotonic() + self.ttl, info)
+        self._entries.move_to_end(entity_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return info
+
+    async def resolve(self, entity_id: Optional[int], entity: Any = None,
+                      fetch: Optional[Callable[[], Awaitable[Any]]] = None) -> Optional[EntityInfo]:
+        """
+        Return info for an ID, preferring the entity shipped with the update.
+
+        :param entity_id: Peer ID
+        :param entity: Entity already present in the update payload, if any
+        :param fetch: Coroutine function used only on a cache miss
+        :return: EntityInfo, or None if it could not be resolved
+        """
+        if entity_id is None:
+            return None
+        if entity is not None:
+            self.fills += 1
+            return self.put(entity_id, entity)
+
+        info = self.get(entity_id)
+        if info is None and fetch is not None:
+            entity = await fetch()
+            if entity is not None:
+                info = self.put(entity_id, entity)
+        return info
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "fills": self.fills,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
@@ -0,0 +1,120 @@
+# src/utils/normalizer.py
+
+import logging
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Each fold rule maps code points to their replacement (None deletes the character).
+FOLD_RULES: Dict[str, Dict[int, Optional[str]]] = {
+    # Arabic yeh and kaf to their Persian forms
+    "arabic_letters": {
+        0x064A: "ی",  # ي -> ی
+        0x0649: "ی",  # ى -> ی
+        0x0643: "ک",  # ك -> ک
+    },
+    # Hamza-carrying alefs to bare alef
+    "alef_variants": {
+        0x0623: "ا",  # أ
+        0x0625: "ا",  # إ
+        0x0622: "ا",  # آ
+        0x0671: "ا",  # ٱ
+    },
+    "teh_marbuta": {
+        0x0629: "ه",  # ة -> ه
+    },
+    # ZWNJ and other invisible joiners and direction marks
+    "zero_width": {
+        0x200B: None,
+        0x200C: None,
+        0x200D: None,
+        0x200E: None,
+        0x200F: None,
+        0xFEFF: None,
+    },
+    "tatweel": {
+        0x0640: None,
+    },
+    # Harakat, superscript alef and combining hamza
+    "diacritics": {code: None for code in [*range(0x064B, 0x0656), 0x0670]},
+    # Persian and Arabic-Indic digits to ASCII
+    "digits": {
+        **{0x06F0 + i: str(i) for i in range(10)},
+        **{0x0660 + i: str(i) for i in range(10)},
+    },
+}
+
+DEFAULT_RULES = ("arabic_letters", "alef_variants", "zero_width", "tatweel", "diacritics", "digits")
+
+
+@lru_cache(maxsize=None)
+def build_fold_table(rules: FrozenSet[str]) -> Dict[int, Optional[str]]:
+    """
+    Merge the selected fold rules into one table for str.translate.
+
+    Tables are cached per rule set, so every normalizer with the same rules
+    shares a single table.
+
+    :param rules: Names of the fold rules to include
+    :return: Translation table mapping code points to replacements
+    """
+    unknown = rules - FOLD_RULES.keys()
+    if unknown:
+        raise ValueError(f"Unknown normalization rules: {', '.join(sorted(unknown))}")
+
+    table = {}
+    for name in sorted(rules):
+        table.update(FOLD_RULES[name])
+    return table
+
+
+class TextNormalizer:
+    def __init__(self, rules: Optional[Iterable[str]] = None, lowercase: bool = True):
+        """
+        Fold Persian/Arabic spelling variants so keywords match regardless of
+        how a message was typed.
+
+        The same instance must be used for keywords and messages so both sides
+        are folded identically.
+
+        :param rules: Names from FOLD_RULES to apply, defaults to DEFAULT_RULES
+        :param lowercase: Whether to lowercase text after folding
+        """
+        self.rules = frozenset(DEFAULT_RULES if rules is None else rules)
+        self.lowercase = lowercase
+        self._table = build_fold_table(self.rules)
+
+    def __call__(self, text: str) -> str:
+        """
+        Normalize a piece of text.
+
+        :param text: Raw text
+        :return: Folded text
+        """
+        # None of the fold rules touch ASCII, so skip the table lookup entirely
+        if not text.isascii():
+            text = text.translate(self._table)
+        return text.lower() if self.lowercase else text
+
+    def __eq__(self, other):
+        return (isinstance(other, TextNormalizer)
+                and self.rules == other.rules and self.lowercase == other.lowercase)
+
+    def __hash__(self):
+        return hash((self.rules, self.lowercase))
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "TextNormalizer":
+        """
+        Build a normalizer from the NORMALIZATION config key.
+
+        :param config: Bot configuration dictionary, may be None
+        :return: TextNormalizer with the configured rules
+        """
+        rules = (config or {}).get("NORMALIZATION")
+        try:
+            return cls(rules)
+        except ValueError as e:
+            logger.error(f"Invalid NORMALIZATION config, using defaults: {e}")
+            return cls()
@@ -0,0 +1,88 @@
+# tests/test_assignment.py
+
+import asyncio
+import unittest
+from src.client_manager.assignment import AssignmentPlanner
+from src.client_manager.client_manager import ClientManager
+from src.client_manager.health import BACKOFF, LIVE
+from src.monitor.monitor import Monitor
+
+class FakeClient:
+    async def disconnect(self):
+        pass
+
+class FakeEvent:
+    async def respond(self, text):
+        self.text = text
+
+class TestAssignmentPlanner(unittest.TestCase):
+    def setUp(self):
+        self.clients = {
+            "a.session": [1, 2, 3, 4],
+            "b.session": [1, 2, 3, 4],
+            "c.session": [4, 5],
+        }
+
+    def test_primaries_are_balanced(self):
+        planner = AssignmentPlanner()
+        planner.recompute(self.clients)
+        self.assertEqual(planner.primary[5], "c.session")
+        self.assertEqual(sorted(planner.stats()["load"].values()), [1, 2, 2])
+        for group in (1, 2, 3, 4):
+            self.assertNotEqual(planner.primary[group], planner.standby[group])
+        self.assertNotIn(5, planner.standby)
+
+    def test_accepts_marked_chat_ids(self):
+        planner = AssignmentPlanner()
+        planner.recompute({"a.session": [1234567890], "b.session": [1234567890]})
+        owner = planner.primary[1234567890]
+        other = "b.session" if owner == "a.session" else "a.session"
+        self.assertTrue(planner.accepts(owner, -1001234567890))
+        self.assertFalse(planner.accepts(other, -1001234567890))
+        self.assertTrue(planner.accepts(other, -1009999))
+
+    def test_fail_over_promotes_standby(self):
+        planner = AssignmentPlanner()
+        planner.recompute(self.clients)
+        owner = planner.primary[1]
+        standby = planner.standby[1]
+        planner.fail_over(owner)
+        self.assertEqual(planner.primary[1], standby)
+        self.assertNotIn(owner, planner.primary.values())
+
+    def test_toggle_and_delete_recompute(self):
+        active = {"a.session": FakeClient(), "b.session": FakeClient()}
+        manager = ClientManager({"clients": dict(self.clients)}, active, 1, "hash")
+        manager.config_manager.save_config = lambda *args: True
+        manager.refresh_assignment()
+        self.assertEqual(set(manager.assignment.primary), {1, 2, 3, 4})
+
+        asyncio.run(manager.toggle_client("a.session", FakeEvent()))
+        self.assertEqual(set(manager.assignment.primary.values()), {"b.session"})
+
+        asyncio.run(manager.delete_client("b.session", FakeEvent()))
+        self.assertEqual(manager.assignment.primary, {})
+        self.assertNotIn("b.session", manager.config["clients"])
+
+    def test_monitor_sees_fail_over_of_shared_planner(self):
+        planner = AssignmentPlanner()
+        active = {"a.session": FakeClient(), "b.session": FakeClient()}
+        manager = ClientManager({"clients": dict(self.clients)}, active, 1, "hash", assignment=planner)
+        monitor = Monitor(["urgent"], assignment=planner)
+        manager.refresh_assignment()
+        owner = monitor.assignment.primary[1]
+        standby = monitor.assignment.standby[1]
+        self.assertFalse(monitor.assignment.accepts(standby, 1))
+
+        manager._on_health_change(owner, LIVE, BACKOFF)
+        self.assertTrue(monitor.assignment.accepts(standby, 1))
+        self.assertFalse(monitor.assignment.accepts(owner, 1))
+
+    def test_worker_reports_health_instead_of_recomputing(self):
+        active = {"a.session": FakeClient(), "b.session": FakeClient()}
+        manager = ClientManager({"clients": dict(self.clients)}, active, 1, "hash")
+        reports = []
+        manager.assignment_sink = reports.append
+        manager.refresh_assignment()
+        self.assertEqual(manager.assignment.primary, {})
+        self.assertEqual(sorted(reports[-1]), ["a.session", "b.session"])
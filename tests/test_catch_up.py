@@ -0,0 +1,202 @@
+# tests/test_catch_up.py
+
+import asyncio
+import datetime
+import tempfile
+import unittest
+from types import SimpleNamespace
+from telethon import TelegramClient
+from telethon.errors import FloodWaitError
+from telethon.sessions import StringSession
+from telethon.tl.patched import Message
+from telethon.tl.types import Channel, ChatPhotoEmpty, PeerChannel, PeerUser, User
+from src.client_manager.assignment import AssignmentPlanner
+from src.monitor.catch_up import PAGE_SIZE, CatchUp, CheckpointStore
+from src.monitor.monitor import Monitor
+
+CHAT_ID = -1001234567890
+
+class FakeClient(TelegramClient):
+    """Offline client whose iter_messages serves a fixed chat history."""
+
+    def __init__(self, history):
+        super().__init__(StringSession(), 1, "hash")
+        self.history = history
+        self.flood_at = set()
+        self.calls = []
+        self.running = 0
+        self.peak = 0
+
+    async def iter_messages(self, chat_id, min_id=0, reverse=False, limit=None):
+        self.calls.append((chat_id, min_id))
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        try:
+            messages = [message for message in self.history.get(chat_id, []) if message.id > min_id]
+            for message in messages[:limit]:
+                if message.id in self.flood_at:
+                    self.flood_at.discard(message.id)
+                    raise FloodWaitError(None, capture=0)
+                yield message
+        finally:
+            self.running -= 1
+
+def make_message(client, message_id, text):
+    user = User(id=42, first_name="Ann", last_name="Lee", access_hash=1)
+    chat = Channel(id=1234567890, title="Market", photo=ChatPhotoEmpty(), date=datetime.datetime.now(),
+                   username="market", megagroup=True, access_hash=2)
+    message = Message(id=message_id, peer_id=PeerChannel(1234567890), date=datetime.datetime.now(),
+                      message=text, from_id=PeerUser(42))
+    message._finish_init(client, {42: user, CHAT_ID: chat}, None)
+    return message
+
+class TestCatchUp(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_checkpoints_persist(self):
+        store = CheckpointStore(self.directory.name)
+        store.record("a.session", CHAT_ID, 10)
+        store.record("a.session", CHAT_ID, 8)
+        store.flush()
+        self.assertEqual(CheckpointStore(self.directory.name).get("a.session"), {CHAT_ID: [10, 10]})
+
+    def test_checkpoints_from_single_ids_load(self):
+        with open(f"{self.directory.name}/a.session.json", "w", encoding="utf-8") as f:
+            f.write('{"%d": 10}' % CHAT_ID)
+        self.assertEqual(CheckpointStore(self.directory.name).get("a.session"), {CHAT_ID: [10, 10]})
+
+    def test_gap_survives_live_traffic_and_flood_waits(self):
+        store = CheckpointStore(self.directory.name)
+        store.record("a.session", CHAT_ID, 5)
+        store.offline("a.session")
+        submitted = []
+
+        async def submit(event, session_name):
+            submitted.append(event.id)
+            # Live traffic keeps arriving while the gap is read
+            store.record(session_name, CHAT_ID, 1000)
+
+        async def scenario():
+            client = FakeClient({})
+            client.history[CHAT_ID] = [make_message(client, i, "text") for i in range(6, 6 + PAGE_SIZE * 2 + 10)]
+            client.flood_at.add(150)
+            catch_up = CatchUp(store, submit)
+            await catch_up.run(client, "a.session")
+            return client
+
+        client = asyncio.run(scenario())
+        self.assertEqual(submitted, list(range(6, 6 + PAGE_SIZE * 2 + 10)))
+        self.assertIn((CHAT_ID, 149), client.calls)
+        self.assertEqual(store.get("a.session")[CHAT_ID], [1000, 1000])
+        # Once the gap is closed, live traffic moves the cursor again
+        store.record("a.session", CHAT_ID, 1001)
+        self.assertEqual(store.cursor("a.session", CHAT_ID), 1001)
+
+    def test_limit_leaves_rest_for_next_catch_up(self):
+        store = CheckpointStore(self.directory.name)
+        store.record("a.session", CHAT_ID, 5)
+        store.offline("a.session")
+
+        async def submit(event, session_name):
+            pass
+
+        async def scenario():
+            client = FakeClient({})
+            client.history[CHAT_ID] = [make_message(client, i, "text") for i in range(6, 16)]
+            catch_up = CatchUp(store, submit, limit=4)
+            with self.assertLogs("src.monitor.catch_up", "WARNING"):
+                first = await catch_up.run(client, "a.session")
+            store.record("a.session", CHAT_ID, 20)
+            self.assertEqual(store.cursor("a.session", CHAT_ID), 9)
+            second = await catch_up.run(client, "a.session")
+            return first, second, catch_up.stats()
+
+        first, second, stats = asyncio.run(scenario())
+        self.assertEqual((first, second), (4, 4))
+        self.assertEqual(stats["truncated"], 2)
+        self.assertEqual(store.cursor("a.session", CHAT_ID), 13)
+
+    def test_concurrent_chats_are_bounded(self):
+        store = CheckpointStore(self.directory.name)
+        for chat_id in range(1, 7):
+            store.record("a.session", chat_id, 100)
+        submitted = []
+
+        async def submit(event, session_name):
+            submitted.append(event)
+
+        async def scenario():
+            client = FakeClient({})
+            catch_up = CatchUp(store, submit, concurrency=2)
+            await catch_up.run(client, "a.session")
+            return client
+
+        client = asyncio.run(scenario())
+        self.assertEqual(client.peak, 2)
+        self.assertEqual(sorted(client.calls), [(chat_id, 100) for chat_id in range(1, 7)])
+
+    def test_monitor_backfills_missed_messages(self):
+        sent = []
+
+        class FakeAlertClient:
+            async def send_message(self, chat_id, text, **kwargs):
+                sent.append(text)
+
+        config = {'OUTBOX': False, 'METRICS': False, 'PIPELINE': {'deliver': {'policy': 'block'}},
+                  'CATCH_UP': {'directory': self.directory.name}}
+        bot = SimpleNamespace(config=config, bot=FakeAlertClient())
+
+        async def scenario():
+            monitor = Monitor(keywords=["urgent"], bot=bot)
+            client = FakeClient({})
+            client.history[CHAT_ID] = [
+                make_message(client, 5, "old urgent message"),
+                make_message(client, 6, "urgent while offline"),
+                make_message(client, 7, "nothing here"),
+            ]
+            monitor.catch_up.store.record("a.session", CHAT_ID, 5)
+            await monitor.start()
+            replayed = await monitor.backfill(client, "a.session")
+            await monitor.pipeline.join()
+            checkpoint = monitor.catch_up.store.cursor("a.session", CHAT_ID)
+            await monitor.stop()
+            return replayed, checkpoint
+
+        replayed, checkpoint = asyncio.run(scenario())
+        self.assertEqual(replayed, 2)
+        self.assertEqual(checkpoint, 7)
+        self.assertEqual(len(sent), 1)
+        self.assertIn("• Backfilled: posted while offline", sent[0])
+        self.assertIn("urgent while offline", sent[0])
+
+    def test_monitor_skips_chats_of_other_accounts(self):
+        config = {'OUTBOX': False, 'METRICS': False, 'CATCH_UP': {'directory': self.directory.name}}
+        bot = SimpleNamespace(config=config, bot=None)
+        assignment = AssignmentPlanner()
+        assignment.load(({1234567890: "b.session"}, {}))
+
+        async def scenario():
+            monitor = Monitor(keywords=["urgent"], bot=bot, assignment=assignment)
+            submitted = []
+
+            async def submit(event, session_name):
+                submitted.append(event.message.id)
+
+            monitor.catch_up.submit = submit
+            client = FakeClient({CHAT_ID: []})
+            client.history[CHAT_ID] = [make_message(client, message_id, "urgent") for message_id in range(6, 11)]
+            store = monitor.catch_up.store
+            store.record("a.session", CHAT_ID, 5)
+            store.offline("a.session")
+            store.record("a.session", CHAT_ID, 10)
+            replayed = await monitor.backfill(client, "a.session")
+            return replayed, submitted, client.calls, store.cursor("a.session", CHAT_ID)
+
+        replayed, submitted, calls, cursor = asyncio.run(scenario())
+        self.assertEqual((replayed, submitted, calls), (0, [], []))
+        self.assertEqual(cursor, 10)
@@ -1,17 +1,102 @@
 # tests/test_client_manager.py
 
+import asyncio
+import os
+import tempfile
 import unittest
+from unittest.mock import patch
 from src.client_manager.client_manager import ClientManager
 
+class FakeEvent:
+    def __init__(self):
+        self.responses = []
+
+    async def respond(self, text, **kwargs):
+        self.responses.append(text)
+
 class TestClientManager(unittest.TestCase):
     def setUp(self):
-        self.manager = ClientManager()
+        self.directory = tempfile.TemporaryDirectory()
+        config = {'clients': ["client1.session"], 'STARTUP': {'jitter': 0}, 'HEALTH': False}
+        self.manager = ClientManager(config, {}, 1, "hash")
+        self.manager.config_manager.filename = os.path.join(self.directory.name, "clients.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def add_client(self, session_name):
+        with patch('src.client_manager.client_manager.TelegramClient', FakeTelegramClient):
+            asyncio.run(self.manager.start_clients([session_name]))
 
     def test_add_client(self):
-        self.manager.add_client("client1")
-        self.assertEqual(len(self.manager.clients), 1)
+        self.add_client("client1.session")
+        self.assertEqual(len(self.manager.active_clients), 1)
 
     def test_remove_client(self):
-        self.manager.add_client("client1")
-        self.manager.remove_client("client1")
-        self.assertEqual(len(self.manager.clients), 0)
+        self.add_client("client1.session")
+        event = FakeEvent()
+        asyncio.run(self.manager.delete_client("client1.session", event))
+        self.assertEqual(len(self.manager.active_clients), 0)
+        self.assertEqual(self.manager.config['clients'], [])
+        self.assertEqual(event.responses, ["Account deleted successfully"])
+
+    def test_disconnect_stops_health_checks(self):
+        async def scenario():
+            with patch('src.client_manager.client_manager.TelegramClient', FakeTelegramClient):
+                await self.manager.start_clients(["client1.session"])
+            running = self.manager.health._task is not None
+            await self.manager.disconnect_all_clients()
+            return running
+
+        self.assertTrue(asyncio.run(scenario()))
+        self.assertIsNone(self.manager.health._task)
+        self.assertEqual(self.manager.active_clients, {})
+
+class FakeTelegramClient:
+    running = 0
+    peak = 0
+
+    def __init__(self, session, api_id, api_hash):
+        self.session = session
+
+    async def connect(self):
+        FakeTelegramClient.running += 1
+        FakeTelegramClient.peak = max(FakeTelegramClient.peak, FakeTelegramClient.running)
+        await asyncio.sleep(0.01)
+        FakeTelegramClient.running -= 1
+
+    async def is_user_authorized(self):
+        return not self.session.startswith("expired")
+
+    async def disconnect(self):
+        pass
+
+    def add_event_handler(self, callback, event=None):
+        pass
+
+    def remove_event_handler(self, callback, event=None):
+        pass
+
+class TestStartSavedClients(unittest.TestCase):
+    def test_concurrent_startup(self):
+        sessions = [f"user{i}.session" for i in range(12)] + ["expired.session"]
+        config = {'clients': sessions, 'STARTUP': {'concurrency': 4, 'jitter': 0}}
+        active = {}
+        ready = []
+
+        async def on_ready(client, session_name):
+            ready.append(session_name)
+
+        async def scenario():
+            manager = ClientManager(config, active, 1, "hash")
+            manager.detect_sessions = lambda: asyncio.sleep(0)
+            with patch('src.client_manager.client_manager.TelegramClient', FakeTelegramClient):
+                await manager.start_saved_clients(on_ready=on_ready)
+            return manager
+
+        manager = asyncio.run(scenario())
+        self.assertEqual(FakeTelegramClient.peak, 4)
+        self.assertEqual(sorted(ready), sorted(sessions[:-1]))
+        self.assertNotIn("expired.session", active)
+        self.assertEqual(len(manager.startup_timings), 13)
+        self.assertLess(manager.startup_time, 0.5)
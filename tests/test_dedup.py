@@ -0,0 +1,34 @@
+# tests/test_dedup.py
+
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from telethon.tl.types import MessageFwdHeader, PeerChannel
+from src.monitor.dedup import DuplicateFilter, message_keys
+
+def make_event(chat_id, message_id, fwd_from=None):
+    return SimpleNamespace(chat_id=chat_id, id=message_id, message=SimpleNamespace(fwd_from=fwd_from))
+
+class TestDuplicateFilter(unittest.TestCase):
+    def test_same_message_from_two_accounts(self):
+        dedup = DuplicateFilter(window=10)
+        self.assertFalse(dedup.check(message_keys(make_event(-1001234567890, 5)), now=0))
+        self.assertTrue(dedup.check(message_keys(make_event(-1001234567890, 5)), now=1))
+        self.assertFalse(dedup.check(message_keys(make_event(-1001234567890, 5), "jobs"), now=1))
+        self.assertFalse(dedup.check(message_keys(make_event(-1001234567890, 6)), now=2))
+        self.assertEqual(dedup.duplicates, 1)
+
+    def test_forwarded_post_in_other_chat(self):
+        fwd = MessageFwdHeader(date=datetime(2024, 1, 1, tzinfo=timezone.utc), from_id=PeerChannel(42), channel_post=7)
+        dedup = DuplicateFilter()
+        self.assertFalse(dedup.check(message_keys(make_event(-1001, 1, fwd)), now=0))
+        self.assertTrue(dedup.check(message_keys(make_event(-1002, 9, fwd)), now=0))
+
+    def test_window_and_size_bound(self):
+        dedup = DuplicateFilter(window=10, maxsize=3)
+        dedup.check([("a",)], now=0)
+        self.assertFalse(dedup.check([("a",)], now=11))
+        for key in "bcde":
+            dedup.check([(key,)], now=12)
+        self.assertLessEqual(len(dedup), 4)
+        self.assertFalse(dedup.check([("a",)], now=12))
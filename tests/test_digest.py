@@ -0,0 +1,124 @@
+# tests/test_digest.py
+
+import asyncio
+import os
+import tempfile
+import unittest
+from src.monitor.digest import DigestBatcher, digest_buttons, format_digest, pack_entries, split_entries
+from src.monitor.monitor import Alert, Monitor
+from src.monitor.near_duplicates import NearDuplicateIndex
+
+class TestDigest(unittest.TestCase):
+    def test_split_respects_limit(self):
+        entries = ["a" * 40, "b" * 40, "c" * 40, "d" * 150]
+        chunks = split_entries(entries, "head", limit=100)
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+        self.assertEqual(chunks[0], "head\n\n" + "a" * 40 + "\n\n" + "b" * 40)
+        self.assertEqual("".join(chunks[2:]), "d" * 150)
+
+    def test_chunks_know_which_entries_they_complete(self):
+        chunks = pack_entries(["a" * 40, "b" * 40, "c" * 40, "d" * 150], "head", limit=100)
+        self.assertEqual([complete for _, complete in chunks], [2, 3, 3, 4])
+
+    def test_requeued_alerts_go_first(self):
+        batcher = DigestBatcher(window=30, max_hits=5)
+        batcher.add("c", now=100)
+        batcher.requeue(["a", "b"], now=110)
+        self.assertEqual(batcher.due_in(now=110), 20)
+        self.assertEqual(batcher.take(), ["a", "b", "c"])
+        batcher.requeue(["x"], now=200)
+        self.assertEqual(batcher.due_in(now=200), 30)
+
+    def test_batch_closes_at_size_or_window(self):
+        batcher = DigestBatcher(window=30, max_hits=3)
+        self.assertIsNone(batcher.add("x", now=100))
+        self.assertEqual(batcher.due_in(now=110), 20)
+        self.assertIsNone(batcher.add("y", now=110))
+        self.assertEqual(batcher.add("z", now=111), ["x", "y", "z"])
+        self.assertEqual(len(batcher), 0)
+        batcher.add("w", now=200)
+        self.assertEqual(batcher.due_in(now=240), 0)
+
+    def test_digest_has_links_and_one_button_set(self):
+        alerts = [Alert(f"• Message:\nhit {i}\n", f"https://t.me/c/1/{i}", 42 + i % 2) for i in range(300)]
+        chunks = format_digest(alerts)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 4096 for chunk in chunks))
+        self.assertTrue(chunks[0].startswith("📋 Digest: 300 alerts"))
+        self.assertIn("[View Message](https://t.me/c/1/299)", chunks[-1])
+        self.assertEqual(len(digest_buttons(alerts)), 2)
+
+    def test_digest_entries_show_collapsed_reposts(self):
+        index = NearDuplicateIndex(window=60)
+        ad = "buy cheap usdt today best price in the market, contact me now for fast delivery"
+        cluster, _ = index.check(ad, -1001, now=0)
+        index.check(ad + "!!", -1002, now=1)
+        index.check(ad, -1002, now=2)
+        alerts = [Alert(f"• Message:\n{ad}\n", "https://t.me/c/1/1", 42, cluster=cluster),
+                  Alert("• Message:\nhit\n", "https://t.me/c/1/2", 43)]
+        text = format_digest(alerts)[0]
+        self.assertIn("• Seen in 2 chats (3 messages)\n[View Message](https://t.me/c/1/1)", text)
+        self.assertEqual(text.count("• Seen in"), 1)
+
+    def test_urgent_keywords(self):
+        batcher = DigestBatcher.from_config({"DIGEST": {"urgent": ["Fire", "re:sos\\d"]}})
+        self.assertTrue(batcher.is_urgent(["price", "fire"]))
+        self.assertTrue(batcher.is_urgent(["re:sos\\d"]))
+        self.assertFalse(batcher.is_urgent(["price"]))
+        self.assertIsNone(DigestBatcher.from_config({}))
+
+    def test_failed_chunk_retries_only_unsent_alerts(self):
+        sent = []
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        class FlakyAlertClient:
+            calls = 0
+
+            async def send_message(self, chat_id, text, **kwargs):
+                self.calls += 1
+                if self.calls == 2:
+                    raise ConnectionError("channel unavailable")
+                sent.append(text)
+
+        class FakeBot:
+            config = {'DIGEST': {'window': 0.05}, 'OUTBOX': {'path': os.path.join(directory.name, 'outbox.db')},
+                      'PIPELINE': {'deliver': {'policy': 'block'}}, 'CATCH_UP': False, 'METRICS': False}
+            bot = FlakyAlertClient()
+
+        async def scenario():
+            monitor = Monitor(keywords=["urgent"], bot=FakeBot())
+            await monitor.start()
+            for i in range(3):
+                alert = Alert(f"• Message:\nhit {i} " + "x" * 3000 + "\n", f"https://t.me/c/1/{i}", 42)
+                await monitor._queue_alert(alert)
+            await monitor.pipeline.join()
+            await asyncio.sleep(0.3)
+            pending = monitor.outbox.pending
+            await monitor.stop()
+            return pending
+
+        self.assertEqual(asyncio.run(scenario()), 0)
+        self.assertEqual(len(sent), 3)
+        for i in range(3):
+            self.assertEqual(sum(f"hit {i} " in text for text in sent), 1)
+
+    def test_stop_cancels_the_digest_flush(self):
+        class FakeBot:
+            config = {'DIGEST': {'window': 60}, 'OUTBOX': False, 'PIPELINE': {'deliver': {'policy': 'block'}},
+                      'CATCH_UP': False, 'METRICS': False}
+            bot = None
+
+        async def scenario():
+            monitor = Monitor(keywords=["urgent"], bot=FakeBot())
+            await monitor.start()
+            await monitor._queue_alert(Alert("• Message:\nhit\n", "https://t.me/c/1/1", 42))
+            await monitor.pipeline.join()
+            flush = monitor._digest_flush
+            await monitor.stop()
+            return flush, monitor
+
+        flush, monitor = asyncio.run(scenario())
+        self.assertTrue(flush.cancelled())
+        self.assertIsNone(monitor._digest_flush)
+        self.assertEqual(len(monitor.digest), 0)
@@ -0,0 +1,41 @@
+# tests/test_entity_cache.py
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from src.utils.entity_cache import EntityCache
+
+class TestEntityCache(unittest.TestCase):
+    def test_payload_fill_then_hit_without_fetch(self):
+        cache = EntityCache()
+        fetches = []
+
+        async def fetch():
+            fetches.append(1)
+            return SimpleNamespace(first_name="Ali", username="ali")
+
+        async def scenario():
+            await cache.resolve(1, SimpleNamespace(first_name="Ali", last_name=None))
+            info = await cache.resolve(1, None, fetch)
+            missing = await cache.resolve(2, None, fetch)
+            return info, missing
+
+        info, missing = asyncio.run(scenario())
+        self.assertEqual((info.first_name, info.last_name), ("Ali", ""))
+        self.assertEqual(missing.username, "ali")
+        self.assertEqual(len(fetches), 1)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "fills": 1, "evictions": 0, "size": 2})
+
+    def test_lru_eviction_and_ttl(self):
+        cache = EntityCache(maxsize=2)
+        for entity_id in (1, 2):
+            cache.put(entity_id, SimpleNamespace(title=str(entity_id)))
+        cache.get(1)
+        cache.put(3, SimpleNamespace(title="3"))
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(1).title, "1")
+        self.assertEqual(cache.evictions, 1)
+
+        expired = EntityCache(ttl=-1)
+        expired.put(1, SimpleNamespace())
+        self.assertIsNone(expired.get(1))
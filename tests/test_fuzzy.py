@@ -0,0 +1,89 @@
+# tests/test_fuzzy.py
+
+import gc
+import random
+import string
+import time
+import unittest
+from src.monitor.fuzzy import FuzzyIndex, bounded_distance, deletes
+from src.monitor.keywords import CompiledKeywords, parse_keyword_input
+from src.monitor.matcher import KeywordMatcher
+from src.monitor.rules import RuleSet
+
+class TestFuzzyIndex(unittest.TestCase):
+    def test_bounded_distance(self):
+        self.assertEqual(bounded_distance("kitten", "sitting", 3), 3)
+        self.assertEqual(bounded_distance("kitten", "sitting", 1), 2)
+        self.assertEqual(bounded_distance("usdt", "usdt", 1), 0)
+        self.assertEqual(bounded_distance("tether", "tehter", 2), 2)
+        self.assertEqual(bounded_distance("bitcoin", "bitcoins", 1), 1)
+        self.assertEqual(bounded_distance("abcdef", "uvwxyz", 2), 3)
+
+    def test_deletes(self):
+        self.assertEqual(deletes("abc", 1), {"abc", "bc", "ac", "ab"})
+
+    def test_matches_misspellings_within_distance(self):
+        index = FuzzyIndex([("tether", 1), ("bitcoin", 2)])
+        hits = [m.keyword for m in index.search_normalized("cheap tehter and bitcion, not teeter")]
+        self.assertEqual(hits, ["bitcoin"])
+        hits = [m.keyword for m in index.search_normalized("cheap tethr and btcoin")]
+        self.assertEqual(hits, ["tether", "bitcoin"])
+
+    def test_fuzzy_entries_in_compiled_keywords(self):
+        entry = parse_keyword_input("fuzzy:bitcoin~2")
+        self.assertEqual(entry, {"kind": "fuzzy", "pattern": "bitcoin", "max_distance": 2})
+        keywords = CompiledKeywords([entry, "usdt"])
+        self.assertEqual(keywords.matched_keywords("USDT for BTCOIN"), ["usdt", "fuzzy:bitcoin~2"])
+        for text in ("fuzzy:abc~2", "fuzzy:two words", "fuzzy:word~9", "fuzzy:word~x"):
+            with self.assertRaises(ValueError):
+                parse_keyword_input(text)
+
+    def test_same_word_with_two_distances(self):
+        rules = RuleSet([], ["fuzzy:bitcoin~1", "fuzzy:bitcoin~2"])
+        self.assertEqual(rules.search("btcoin").rules, ["fuzzy:bitcoin~1", "fuzzy:bitcoin~2"])
+        self.assertEqual(rules.search("btcon").rules, ["fuzzy:bitcoin~2"])
+
+
+class TestFuzzyIndexBenchmark(unittest.TestCase):
+    def test_long_tokens_are_skipped(self):
+        index = FuzzyIndex([("bitcoins", 3)])
+        start = time.perf_counter()
+        self.assertEqual(index.search_normalized("b" * 120), [])
+        self.assertEqual([m.keyword for m in index.search_normalized("btcoin")], ["bitcoins"])
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+    def test_per_message_cost_with_10k_keywords(self):
+        rng = random.Random(7)
+
+        def word(length):
+            return "".join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+        keywords = [word(rng.randint(6, 10)) for _ in range(10000)]
+        # Messages are generated, not repeated from the keyword list, and matched cold
+        messages = [
+            " ".join(rng.choice(keywords) if rng.random() < 0.05 else word(rng.randint(2, 9)) for _ in range(40))
+            for _ in range(300)
+        ]
+        exact = KeywordMatcher(keywords)
+        fuzzy = FuzzyIndex((k, 1) for k in keywords)
+
+        def per_message(search):
+            fuzzy._token_cache.clear()
+            start = time.process_time()
+            for message in messages:
+                search(message)
+            return (time.process_time() - start) / len(messages)
+
+        # Best of five interleaved passes in CPU time, each starting with an
+        # empty token cache, so other processes on the machine skew neither side.
+        # Like timeit, keep the garbage of earlier tests from being collected mid-pass
+        exact_cost = fuzzy_cost = float("inf")
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(5):
+                exact_cost = min(exact_cost, per_message(exact.search_normalized))
+                fuzzy_cost = min(fuzzy_cost, per_message(fuzzy.search_normalized))
+        finally:
+            gc.enable()
+        self.assertLess(fuzzy_cost, 3 * exact_cost)
@@ -0,0 +1,122 @@
+# tests/test_health.py
+
+import asyncio
+import unittest
+from src.client_manager.health import BACKOFF, DEGRADED, LIVE, UNAUTHORIZED, HealthSupervisor
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class FakeClient:
+    def __init__(self):
+        self.connected = True
+        self.authorized = True
+        self.connect_failures = 0
+        self.catch_ups = 0
+        self.running = 0
+        self.peak = 0
+
+    def is_connected(self):
+        return self.connected
+
+    async def get_me(self):
+        if not self.connected:
+            raise ConnectionError("offline")
+
+    async def disconnect(self):
+        self.connected = False
+
+    async def connect(self):
+        if self.connect_failures:
+            self.connect_failures -= 1
+            raise ConnectionError("refused")
+        self.connected = True
+
+    async def is_user_authorized(self):
+        return self.authorized
+
+    async def catch_up(self):
+        FakeClient.running += 1
+        FakeClient.peak = max(FakeClient.peak, FakeClient.running)
+        await asyncio.sleep(0.01)
+        FakeClient.running -= 1
+        self.catch_ups += 1
+
+    def add_event_handler(self, callback, event=None):
+        pass
+
+    def remove_event_handler(self, callback, event=None):
+        pass
+
+class TestHealthSupervisor(unittest.TestCase):
+    def setUp(self):
+        FakeClient.running = FakeClient.peak = 0
+        self.clock = FakeClock()
+        self.changes = []
+        self.supervisor = HealthSupervisor(
+            stall_after=300, base_delay=10, max_delay=60, catch_up_concurrency=2,
+            on_state=lambda *change: self.changes.append(change), clock=self.clock
+        )
+
+    def test_reconnect_with_backoff(self):
+        client = FakeClient()
+        client.connect_failures = 2
+        self.supervisor.watch("a", client)
+        client.connected = False
+
+        asyncio.run(self.supervisor.check())
+        self.assertEqual(self.supervisor.state("a"), BACKOFF)
+        first = self.supervisor.sessions["a"].next_attempt
+        self.assertTrue(5 <= first <= 10)
+
+        self.clock.now = first
+        asyncio.run(self.supervisor.check())
+        self.assertEqual(self.supervisor.state("a"), BACKOFF)
+        second = self.supervisor.sessions["a"].next_attempt - self.clock.now
+        self.assertTrue(10 <= second <= 20)
+
+        self.clock.now += second
+        asyncio.run(self.supervisor.check())
+        self.assertEqual(self.supervisor.state("a"), BACKOFF)
+        self.clock.now = self.supervisor.sessions["a"].next_attempt
+        asyncio.run(self.supervisor.check())
+        self.assertEqual(self.supervisor.state("a"), LIVE)
+        self.assertEqual(client.catch_ups, 1)
+        self.assertEqual(self.changes[0], ("a", LIVE, BACKOFF))
+
+    def test_stalled_session_is_degraded_until_update(self):
+        client = FakeClient()
+        self.supervisor.watch("a", client)
+        self.clock.now = 301
+        asyncio.run(self.supervisor.check())
+        self.assertEqual(self.supervisor.state("a"), DEGRADED)
+        self.assertEqual(client.catch_ups, 1)
+        self.supervisor.touch("a")
+        self.assertEqual(self.supervisor.state("a"), LIVE)
+
+    def test_unauthorized_is_not_retried(self):
+        client = FakeClient()
+        client.authorized = False
+        self.supervisor.watch("a", client)
+        client.connected = False
+        asyncio.run(self.supervisor.check())
+        self.clock.now = 1000
+        asyncio.run(self.supervisor.check())
+        self.assertEqual(self.supervisor.state("a"), UNAUTHORIZED)
+        self.clock.now = 5000
+        asyncio.run(self.supervisor.check())
+        self.assertEqual(self.supervisor.stats()["reconnects"], 1)
+
+    def test_catch_up_concurrency_is_bounded(self):
+        clients = [FakeClient() for _ in range(6)]
+        for index, client in enumerate(clients):
+            self.supervisor.watch(str(index), client)
+        self.clock.now = 301
+
+        asyncio.run(self.supervisor.check())
+        self.assertEqual(FakeClient.peak, 2)
+        self.assertTrue(all(client.catch_ups == 1 for client in clients))
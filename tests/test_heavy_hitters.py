@@ -0,0 +1,81 @@
+# tests/test_heavy_hitters.py
+
+import random
+import unittest
+from src.monitor.heavy_hitters import GROUPS, KEYWORDS, SENDERS, CountMinSketch, HeavyHitters, HeavyHitterTracker
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestCountMinSketch(unittest.TestCase):
+    def test_estimates_never_undercount(self):
+        sketch = CountMinSketch(width=64, depth=4)
+        counts = {key: key % 7 + 1 for key in range(500)}
+        for key, count in counts.items():
+            sketch.add(key, count)
+        for key, count in counts.items():
+            self.assertGreaterEqual(sketch.estimate(key), count)
+        self.assertEqual(CountMinSketch(width=4096, depth=4).estimate("missing"), 0)
+
+
+class TestHeavyHitters(unittest.TestCase):
+    def test_finds_heavy_keys_among_many_light_ones(self):
+        hitters = HeavyHitters(k=10, width=512, half_life=None)
+        stream = [f"light{i}" for i in range(5000)] + ["hot"] * 300 + ["warm"] * 150
+        random.Random(7).shuffle(stream)
+        for key in stream:
+            hitters.add(key)
+
+        top = hitters.top(2)
+        self.assertEqual([key for key, _, _ in top], ["hot", "warm"])
+        self.assertGreaterEqual(top[0][1], 300)
+        self.assertLessEqual(top[0][1] - top[0][2], 300)
+        self.assertEqual(len(hitters.counts), 10)
+
+    def test_counts_decay_with_half_life(self):
+        clock = FakeClock()
+        hitters = HeavyHitters(k=5, half_life=3600, clock=clock)
+        for _ in range(8):
+            hitters.add("old")
+        clock.now += 7200
+        for _ in range(3):
+            hitters.add("new")
+
+        self.assertAlmostEqual(hitters.estimate("old"), 2)
+        self.assertEqual([key for key, _, _ in hitters.top()], ["new", "old"])
+
+    def test_rescales_long_running_weights(self):
+        clock = FakeClock()
+        hitters = HeavyHitters(k=5, half_life=1, clock=clock)
+        hitters.add("a")
+        clock.now += 100
+        hitters.add("a")
+        self.assertAlmostEqual(hitters.estimate("a"), 1)
+        self.assertEqual(hitters._base, clock.now)
+
+
+class TestHeavyHitterTracker(unittest.TestCase):
+    def test_tracks_groups_senders_and_keywords(self):
+        tracker = HeavyHitterTracker(k=5, half_life=None)
+        tracker.message(-100, 42)
+        tracker.message(-100, 43)
+        tracker.message(None, 42)
+        tracker.matched(["urgent", "help"])
+        tracker.matched(["urgent"])
+
+        self.assertEqual(tracker.query(GROUPS, 1), [(-100, 2.0, 0.0)])
+        self.assertEqual(tracker.query(SENDERS, 1)[0][0], 42)
+        self.assertEqual(tracker.estimate(KEYWORDS, "urgent"), 2)
+        with self.assertRaises(ValueError):
+            tracker.query("users")
+
+    def test_config(self):
+        self.assertIsNone(HeavyHitterTracker.from_config({"HEAVY_HITTERS": False}))
+        tracker = HeavyHitterTracker.from_config({"HEAVY_HITTERS": {"k": 0}})
+        self.assertEqual(tracker.trackers[GROUPS].k, 20)
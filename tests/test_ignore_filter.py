@@ -0,0 +1,28 @@
+# tests/test_ignore_filter.py
+
+import unittest
+from src.monitor.ignore_filter import IgnoreFilter
+
+class TestIgnoreFilter(unittest.TestCase):
+    def test_set_mode(self):
+        ignore = IgnoreFilter([1, "2", "bad"])
+        self.assertIn(2, ignore)
+        self.assertNotIn(3, ignore)
+        self.assertNotIn(None, ignore)
+        ignore.add(3)
+        ignore.discard(1)
+        self.assertEqual(len(ignore), 2)
+        self.assertNotIn(1, ignore)
+
+    def test_switches_to_compact_array(self):
+        ignore = IgnoreFilter(range(0, 20, 2), compact_threshold=5)
+        self.assertIsNotNone(ignore._compact)
+        self.assertIn(18, ignore)
+        self.assertNotIn(7, ignore)
+        ignore.add(7)
+        ignore.add(7)
+        ignore.discard(18)
+        ignore.discard(19)
+        self.assertIn(7, ignore)
+        self.assertNotIn(18, ignore)
+        self.assertEqual(list(ignore._compact), [0, 2, 4, 6, 7, 8, 10, 12, 14, 16])
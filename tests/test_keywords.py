@@ -0,0 +1,89 @@
+# tests/test_keywords.py
+
+import os
+import tempfile
+import unittest
+from src.monitor.keywords import CompiledKeywords, keyword_label, parse_keyword_input
+from src.monitor.regex_rules import RegexCache, RegexRuleSet, fold_pattern
+from src.utils.normalizer import TextNormalizer
+
+class TestCompiledKeywords(unittest.TestCase):
+    def setUp(self):
+        self.entries = [
+            "usdt",
+            {"kind": "regex", "pattern": r"09\d{9}"},
+            {"kind": "regex", "pattern": r"\bsell\b"},
+        ]
+
+    def test_plain_and_regex_hits(self):
+        keywords = CompiledKeywords(self.entries)
+        self.assertEqual(
+            keywords.matched_keywords("Sell USDT, call 09121234567"),
+            ["usdt", r"re:\bsell\b", r"re:09\d{9}"]
+        )
+        self.assertEqual(keywords.matched_keywords("reselling"), [])
+
+    def test_invalid_regex_rejected_at_input(self):
+        self.assertEqual(parse_keyword_input(r" re:\d+ "), {"kind": "regex", "pattern": r"\d+"})
+        self.assertEqual(parse_keyword_input("help"), "help")
+        for text in ("re:(", "re:a*", "re:(?P<x>a)", "re:(?i)abc", r"re:(a)\1", "re:(a)?(?(1)b|c)"):
+            with self.assertRaises(ValueError):
+                parse_keyword_input(text)
+
+    def test_label_round_trip(self):
+        for entry in self.entries:
+            self.assertEqual(parse_keyword_input(keyword_label(entry)), entry)
+
+    def test_cache_reuses_combined_source(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RegexCache(os.path.join(directory, "regex_cache.json"))
+            first = RegexRuleSet([r"\d+", "("], cache=cache)
+            self.assertEqual(first.rejected, ["("])
+
+            reloaded = RegexRuleSet([r"\d+", "("], cache=RegexCache(cache.filename))
+            self.assertEqual(reloaded.rejected, ["("])
+            self.assertEqual([m.keyword for m in reloaded.search_normalized("a 12")], [r"\d+"])
+
+    def test_failed_cache_write_keeps_the_previous_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RegexCache(os.path.join(directory, "regex_cache.json"))
+            cache.put("old", {"source": r"(?P<r0>\d+)", "rejected": []})
+            cache.put("new", {"source": object(), "rejected": []})
+            self.assertEqual(list(RegexCache(cache.filename)._load()), ["old"])
+            self.assertEqual(os.listdir(directory), ["regex_cache.json"])
+
+    def test_rules_that_break_the_combined_pattern_are_skipped(self):
+        rules = RegexRuleSet([r"\d+", "(?i)abc", r"(a)\1"])
+        self.assertEqual(rules.rejected, ["(?i)abc", r"(a)\1"])
+        self.assertEqual([m.keyword for m in rules.search_normalized("abc 12")], [r"\d+"])
+
+    def test_stale_cache_entry_is_rebuilt(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RegexCache(os.path.join(directory, "regex_cache.json"))
+            patterns = [r"\d+", "(?i)abc"]
+            cache.put(RegexCache.key(patterns), {"source": r"(?P<r0>\d+)|(?P<r1>(?i)abc)", "rejected": []})
+            rules = RegexRuleSet(patterns, cache=cache)
+            self.assertEqual(rules.rejected, ["(?i)abc"])
+            self.assertEqual(RegexCache(cache.filename).get(RegexCache.key(patterns))["rejected"], ["(?i)abc"])
+
+
+class TestRegexFolding(unittest.TestCase):
+    def setUp(self):
+        self.normalizer = TextNormalizer()
+
+    def test_regex_literals_are_folded_like_messages(self):
+        keywords = CompiledKeywords([{"kind": "regex", "pattern": "قيمت [يى]+"}], normalize=self.normalizer)
+        self.assertEqual(keywords.matched_keywords("قیمت ی"), ["re:قيمت [يى]+"])
+        self.assertEqual(keywords.matched_keywords("قيمت ي"), ["re:قيمت [يى]+"])
+        self.assertEqual(fold_pattern("سَلام", self.normalizer), "سلام")
+
+    def test_patterns_folding_would_change_are_rejected(self):
+        for pattern in ("بـ+ه", "[ـ]", "[ا-ي]", r"\u064a", r"[\u0627-\u064a]"):
+            with self.assertRaises(ValueError):
+                parse_keyword_input("re:" + pattern, self.normalizer)
+        self.assertEqual(
+            parse_keyword_input(r"re:[\u0627-\u06cc]", self.normalizer),
+            {"kind": "regex", "pattern": r"[\u0627-\u06cc]"}
+        )
+        keywords = CompiledKeywords([{"kind": "regex", "pattern": "بـ+ه"}], normalize=self.normalizer)
+        self.assertEqual(keywords.regex.rejected, ["بـ+ه"])
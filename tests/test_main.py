@@ -0,0 +1,23 @@
+# tests/test_main.py
+
+import unittest
+from main import build_services
+
+class TestBuildServices(unittest.TestCase):
+    def test_services_share_config_and_assignment(self):
+        config = {'clients': {"a.session": [1]}, 'OUTBOX': False, 'METRICS': False, 'CATCH_UP': False}
+        client_manager, monitor, supervisor = build_services(config, 1, "hash", ["urgent"])
+        self.assertIs(client_manager.config, config)
+        self.assertEqual(client_manager.active_clients, {})
+        self.assertEqual((client_manager.api_id, client_manager.api_hash), (1, "hash"))
+        self.assertIs(client_manager.assignment, monitor.assignment)
+        self.assertEqual(client_manager.on_reconnect, monitor.backfill)
+        self.assertEqual(client_manager.on_disconnect, monitor.mark_offline)
+        self.assertIsNone(supervisor)
+
+    def test_sharding_builds_a_supervisor(self):
+        config = {'clients': [], 'OUTBOX': False, 'METRICS': False, 'CATCH_UP': False,
+                  'SHARDING': {'enabled': True, 'workers': 2}}
+        _, monitor, supervisor = build_services(config, 1, "hash", ["urgent"])
+        self.assertIs(supervisor.monitor, monitor)
+        self.assertEqual(supervisor.worker_count, 2)
@@ -0,0 +1,25 @@
+# tests/test_matcher.py
+
+import unittest
+from src.monitor.matcher import KeywordMatcher, KeywordMatch
+
+class TestKeywordMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = KeywordMatcher(["he", "she", "his", "hers", "Urgent", "", "she"])
+
+    def test_finds_overlapping_keywords_in_one_pass(self):
+        matches = self.matcher.search("ushers")
+        self.assertEqual(
+            matches,
+            [KeywordMatch("she", 1, 4), KeywordMatch("he", 2, 4), KeywordMatch("hers", 2, 6)]
+        )
+
+    def test_matching_is_case_insensitive(self):
+        self.assertEqual(self.matcher.matched_keywords("An URGENT request"), ["Urgent"])
+
+    def test_skips_empty_and_duplicate_keywords(self):
+        self.assertEqual(len(self.matcher), 5)
+
+    def test_no_match(self):
+        self.assertEqual(self.matcher.search("nothing to report"), [])
+        self.assertEqual(KeywordMatcher([]).search("anything"), [])
@@ -0,0 +1,33 @@
+# tests/test_matcher_service.py
+
+import asyncio
+import unittest
+from src.monitor.matcher_service import MatcherService
+
+class TestMatcherService(unittest.TestCase):
+    def test_bulk_changes_are_coalesced(self):
+        builds = []
+
+        def build(keywords):
+            builds.append(keywords)
+            return keywords
+
+        async def scenario():
+            service = MatcherService(["a"], build=build, debounce=0.01)
+            pinned = service.generation
+            for count in range(2, 50):
+                service.request_rebuild([str(i) for i in range(count)])
+            generation = await service.wait_for_rebuild()
+            return pinned, generation
+
+        pinned, generation = asyncio.run(scenario())
+        self.assertEqual(len(builds), 2)
+        self.assertEqual(generation.version, 2)
+        self.assertEqual(len(generation.keywords), 49)
+        self.assertEqual(pinned.keywords, ("a",))
+
+    def test_rebuild_without_loop_is_immediate(self):
+        service = MatcherService(["urgent"])
+        service.request_rebuild(["help"])
+        self.assertEqual(service.generation.version, 2)
+        self.assertEqual(service.matcher.matched_keywords("please help"), ["help"])
@@ -0,0 +1,88 @@
+# tests/test_metrics.py
+
+import os
+import tempfile
+import unittest
+from src.monitor.metrics import FORWARDED, MATCHED, SEEN, Histogram, Metrics, Series
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestSeries(unittest.TestCase):
+    def test_ring_buffer_reuses_slots(self):
+        series = Series(1, 3)
+        series.add(10)
+        series.add(10)
+        series.add(11)
+        self.assertEqual(series.values(12), [2, 1, 0])
+        series.add(14)
+        self.assertEqual(series.values(14), [0, 0, 1])
+        self.assertEqual(series.values(100), [0, 0, 0])
+
+    def test_sum_covers_span(self):
+        series = Series(60, 10)
+        for minute in range(5):
+            series.add(minute * 60, minute + 1)
+        self.assertEqual(series.sum(4 * 60, 120), 9)
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles_report_bucket_bounds(self):
+        histogram = Histogram((10, 100, 1000))
+        for value in (1, 2, 3, 50, 5000):
+            histogram.observe(value)
+        self.assertEqual(histogram.quantile(0.5), 10)
+        self.assertEqual(histogram.quantile(0.8), 100)
+        self.assertEqual(histogram.quantile(1.0), 1000)
+        self.assertIsNone(Histogram().quantile(0.5))
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.metrics = Metrics(None, clock=self.clock)
+
+    def test_counts_per_dimension_and_rates(self):
+        for _ in range(3):
+            self.metrics.record(SEEN, "a.session", -100)
+        self.metrics.record(SEEN, "b.session", -200)
+        self.metrics.record(MATCHED, "a.session", -100, ["urgent", "help"])
+        self.clock.now += 120
+        self.metrics.record(FORWARDED, "a.session", -100, ["urgent"])
+
+        self.assertEqual(self.metrics.totals, {SEEN: 4, MATCHED: 1, FORWARDED: 1})
+        self.assertEqual(self.metrics.top("account", SEEN), [("a.session", 3), ("b.session", 1)])
+        self.assertEqual(self.metrics.top("keyword", FORWARDED), [("urgent", 1)])
+        self.assertEqual(self.metrics.rate(SEEN, 60), 0)
+        self.assertEqual(self.metrics.rate(SEEN, 3600), 4)
+        self.assertEqual(self.metrics.history(FORWARDED, 1, 3), [0, 0, 1])
+
+    def test_rollup_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.json")
+            metrics = Metrics(path, clock=self.clock)
+            metrics.record(SEEN, "a.session", -100)
+            metrics.record(MATCHED, "a.session", -100, ["urgent"])
+            metrics.observe("match", 0.003)
+            metrics._write(metrics.snapshot())
+
+            self.clock.now += 30
+            restored = Metrics(path, clock=self.clock)
+            restored.load()
+            restored.load()
+            restored.record(SEEN, "a.session", -100)
+
+        self.assertEqual(restored.totals[SEEN], 2)
+        self.assertEqual(restored.counters["group"][-100], [2, 1, 0])
+        self.assertEqual(restored.rate(SEEN, 3600), 2)
+        self.assertEqual(restored.latency["match"].count, 1)
+
+    def test_disabled_by_config(self):
+        self.assertIsNone(Metrics.from_config({"METRICS": False}))
+        self.assertEqual(Metrics.from_config({"METRICS": {"path": "m.json"}}).path, "m.json")
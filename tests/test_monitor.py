@@ -1,6 +1,8 @@
 # tests/test_monitor.py
 
+import asyncio
 import unittest
+from types import SimpleNamespace
 from src.monitor.monitor import Monitor
 
 class TestMonitor(unittest.TestCase):
@@ -10,3 +12,108 @@ class TestMonitor(unittest.TestCase):
     def test_monitor_message(self):
         self.monitor.monitor_message("This is an urgent request")
         self.monitor.monitor_message("Just a normal message")
+
+    def test_alert_goes_through_pipeline(self):
+        sent = []
+
+        class FakeAlertClient:
+            async def send_message(self, chat_id, text, **kwargs):
+                sent.append(text)
+
+        class FakeBot:
+            config = {'KEYWORDS': ["urgent"], 'IGNORE_USERS': [], 'PIPELINE': {'deliver': {'policy': 'block'}},
+                      'OUTBOX': False, 'CATCH_UP': False, 'METRICS': {'path': None}}
+            bot = FakeAlertClient()
+
+        class FakeClient:
+            def on(self, event_filter):
+                def register(handler):
+                    self.handler = handler
+                    return handler
+                return register
+
+        sender = SimpleNamespace(first_name="Ann", last_name="Lee", username=None)
+        chat = SimpleNamespace(title="Market", username="market")
+
+        def event(message_id, text):
+            return SimpleNamespace(
+                id=message_id, chat_id=-1001234567890, sender_id=42, sender=sender, chat=chat,
+                get_sender=None, get_chat=None,
+                message=SimpleNamespace(text=text, fwd_from=None, date=None)
+            )
+
+        async def scenario():
+            monitor = Monitor(keywords=["urgent"], bot=FakeBot())
+            client = FakeClient()
+            await monitor.process_messages_for_client(client, "session")
+            await client.handler(event(1, "an urgent request"))
+            await client.handler(event(2, "nothing to see"))
+            await monitor.pipeline.join()
+            await monitor.stop()
+            return monitor
+
+        monitor = asyncio.run(scenario())
+        stats = monitor.pipeline.stats()
+        self.assertEqual(len(sent), 1)
+        self.assertIn("• Chat: Market", sent[0])
+        self.assertEqual(stats['match']['processed'], 2)
+        self.assertEqual(stats['deliver']['processed'], 1)
+        self.assertEqual(monitor.metrics.totals, {'seen': 2, 'matched': 1, 'forwarded': 1})
+        self.assertEqual(monitor.metrics.top('keyword', 'forwarded'), [("urgent", 1)])
+        self.assertEqual(monitor.metrics.counters['account']["session"], [2, 1, 1])
+        self.assertEqual(monitor.metrics.latency['send'].count, 1)
+        group, count, _ = monitor.heavy_hitters.query('groups', 1)[0]
+        self.assertEqual((group, round(count)), (-1001234567890, 2))
+        self.assertEqual(monitor.heavy_hitters.query('keywords')[0][0], "urgent")
+
+    def test_near_duplicate_edits_are_coalesced(self):
+        edits = []
+
+        class FakeMessage:
+            async def edit(self, text):
+                edits.append(text)
+
+        class FakeAlertClient:
+            async def send_message(self, chat_id, text, **kwargs):
+                return FakeMessage()
+
+        class FakeBot:
+            config = {'KEYWORDS': ["usdt"], 'IGNORE_USERS': [], 'PIPELINE': {'deliver': {'policy': 'block'}},
+                      'OUTBOX': False, 'CATCH_UP': False, 'METRICS': False,
+                      'NEAR_DUPLICATES': {'edit_interval': 0.05}}
+            bot = FakeAlertClient()
+
+        class FakeClient:
+            def on(self, event_filter):
+                def register(handler):
+                    self.handler = handler
+                    return handler
+                return register
+
+        sender = SimpleNamespace(first_name="Ann", last_name="Lee", username=None)
+        chat = SimpleNamespace(title="Market", username="market")
+        ad = "buy cheap usdt today best price in the market, contact me now for fast delivery"
+
+        def event(chat_id, text):
+            return SimpleNamespace(
+                id=7, chat_id=chat_id, sender_id=42, sender=sender, chat=chat,
+                get_sender=None, get_chat=None,
+                message=SimpleNamespace(text=text, fwd_from=None, date=None)
+            )
+
+        async def scenario():
+            monitor = Monitor(keywords=["usdt"], bot=FakeBot())
+            client = FakeClient()
+            await monitor.process_messages_for_client(client, "session")
+            await client.handler(event(-1001, ad))
+            await monitor.pipeline.join()
+            for chat_id in (-1002, -1003, -1004):
+                await client.handler(event(chat_id, ad + "!"))
+            await monitor.pipeline.join()
+            self.assertEqual(edits, [])
+            await asyncio.sleep(0.2)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+        self.assertEqual(len(edits), 1)
+        self.assertIn("• Seen in 4 chats (4 messages)", edits[0])
@@ -0,0 +1,50 @@
+# tests/test_near_duplicates.py
+
+import unittest
+from src.monitor.near_duplicates import NearDuplicateIndex
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NearDuplicateIndex(window=60)
+        self.ad = "buy cheap usdt today best price in the market, contact me now for fast delivery"
+        self.edited = "buy cheap usdt today! best price in market, contact me now for fast delivery!!"
+
+    def test_edited_repost_joins_cluster(self):
+        cluster, is_new = self.index.check(self.ad, -1001, now=0)
+        self.assertTrue(is_new)
+        same, is_new = self.index.check(self.edited, -1002, now=1)
+        self.assertFalse(is_new)
+        self.assertIs(same, cluster)
+        self.assertEqual((cluster.count, len(cluster.chats)), (2, 2))
+
+    def test_unrelated_text_and_expiry(self):
+        self.index.check(self.ad, -1001, now=0)
+        _, is_new = self.index.check("is anyone coming to the meeting at five today?", -1001, now=1)
+        self.assertTrue(is_new)
+        _, is_new = self.index.check(self.edited, -1003, now=120)
+        self.assertTrue(is_new)
+        self.assertEqual(len(self.index), 1)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(NearDuplicateIndex.from_config({}))
+        self.assertEqual(NearDuplicateIndex.from_config({"NEAR_DUPLICATES": {"window": 10}}).window, 10)
+
+    def test_refreshed_cluster_does_not_hold_back_expiry(self):
+        first, _ = self.index.check(self.ad, -1001, now=0)
+        self.index.check("is anyone coming to the meeting at five today?", -1001, now=1)
+        # The first cluster stays active while the second goes quiet
+        self.index.check(self.edited, -1002, now=50)
+        self.index.check(self.ad, -1003, now=100)
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(first.count, 3)
+
+    def test_size_cap_drops_least_recently_seen(self):
+        index = NearDuplicateIndex(window=60, max_clusters=2)
+        first, _ = index.check(self.ad, -1001, now=0)
+        index.check("is anyone coming to the meeting at five today?", -1001, now=1)
+        index.check(self.edited, -1002, now=2)
+        index.check("the weather report says rain all over the north tomorrow", -1001, now=3)
+        self.assertEqual(len(index), 2)
+        same, is_new = index.check(self.ad, -1004, now=4)
+        self.assertFalse(is_new)
+        self.assertIs(same, first)
@@ -0,0 +1,43 @@
+# tests/test_normalizer.py
+
+import time
+import unittest
+from src.monitor.matcher import KeywordMatcher
+from src.utils.normalizer import TextNormalizer
+
+class TestTextNormalizer(unittest.TestCase):
+    def setUp(self):
+        self.normalizer = TextNormalizer()
+
+    def test_folds_arabic_letters_and_digits(self):
+        self.assertEqual(self.normalizer("كيف ٣٤ ۵۶"), self.normalizer("کیف 34 56"))
+        self.assertEqual(self.normalizer("کیف 34 56"), "کیف 34 56")
+
+    def test_strips_zwnj_tatweel_and_diacritics(self):
+        self.assertEqual(self.normalizer("می‌خواهم"), "میخواهم")
+        self.assertEqual(self.normalizer("خــوب"), "خوب")
+        self.assertEqual(self.normalizer("کَتِب"), "کتب")
+
+    def test_rules_are_configurable(self):
+        normalizer = TextNormalizer.from_config({"NORMALIZATION": ["digits"]})
+        self.assertEqual(normalizer("ي۱"), "ي1")
+        with self.assertRaises(ValueError):
+            TextNormalizer(["no_such_rule"])
+
+    def test_keywords_match_across_spellings(self):
+        matcher = KeywordMatcher(["فروش تتر", "USDT"], normalize=self.normalizer)
+        self.assertEqual(matcher.matched_keywords("فروش تـتر با قيمت خوب usdt"), ["فروش تتر", "USDT"])
+
+
+class TestTextNormalizerBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.normalizer = TextNormalizer()
+
+    def test_per_message_cost(self):
+        message = ("سلام، فروش تـتر با قيمت ۵۶٬۰۰۰ تومان. لطفاً پيام بدين‌ها كه " * 8)[:400]
+        rounds = 20000
+        start = time.perf_counter()
+        for _ in range(rounds):
+            self.normalizer(message)
+        per_message = (time.perf_counter() - start) / rounds
+        self.assertLess(per_message, 0.001)
@@ -0,0 +1,116 @@
+# tests/test_outbox.py
+
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from src.monitor.monitor import Alert, Monitor
+from src.monitor.outbox import Outbox
+
+class TestOutbox(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'outbox.db')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_unacked_entries_are_replayed(self):
+        async def first_run():
+            outbox = Outbox(self.path, batch_size=1000)
+            self.assertEqual(outbox.open(), [])
+            ids = [outbox.add(["alert", i]) for i in range(5)]
+            outbox.ack(ids[1])
+            outbox.ack(ids[1])
+            commits = outbox.commits
+            await outbox.close()
+            return commits, outbox.stats()
+
+        commits, stats = asyncio.run(first_run())
+        self.assertEqual(commits, 0)
+        self.assertEqual(stats['pending'], 4)
+
+        outbox = Outbox(self.path)
+        pending = outbox.open()
+        self.assertEqual([payload for _, payload in pending], [["alert", i] for i in (0, 2, 3, 4)])
+        asyncio.run(outbox.close())
+
+    def test_changes_are_group_committed(self):
+        async def scenario():
+            outbox = Outbox(self.path, commit_interval=60, batch_size=10)
+            outbox.open()
+            outbox.start()
+            for i in range(10):
+                outbox.add(i)
+            # A full batch wakes the commit task; the commit runs on the writer thread
+            await asyncio.sleep(0.1)
+            commits = [outbox.commits]
+            for i in range(10, 25):
+                outbox.add(i)
+            await asyncio.sleep(0.1)
+            commits.append(outbox.commits)
+            await outbox.close()
+            return commits, outbox.commits
+
+        self.assertEqual(asyncio.run(scenario()), ([1, 2], 2))
+        outbox = Outbox(self.path)
+        self.assertEqual([payload for _, payload in outbox.open()], list(range(25)))
+        self.assertEqual(outbox.add("next"), 26)
+        asyncio.run(outbox.close())
+
+    def test_commit_runs_off_the_event_loop(self):
+        async def scenario():
+            outbox = Outbox(self.path)
+            outbox.open()
+            loop_thread = threading.get_ident()
+            threads = []
+            execute = outbox._write
+
+            def write(writes):
+                threads.append(threading.get_ident())
+                return execute(writes)
+
+            outbox._write = write
+            outbox.add("alert")
+            await outbox.close()
+            return loop_thread, threads
+
+        loop_thread, threads = asyncio.run(scenario())
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+        # close() shut the writer thread down
+        self.assertNotIn(threads[0], {thread.ident for thread in threading.enumerate()})
+
+    def test_monitor_replays_unsent_alert(self):
+        sent = []
+
+        class FlakyAlertClient:
+            fail = True
+
+            async def send_message(self, chat_id, text, **kwargs):
+                if self.fail:
+                    raise ConnectionError("channel unavailable")
+                sent.append(text)
+
+        class FakeBot:
+            config = {'OUTBOX': {'path': self.path}, 'PIPELINE': {'deliver': {'policy': 'block'}}, 'CATCH_UP': False,
+                      'METRICS': False}
+            bot = FlakyAlertClient()
+
+        async def run(fail):
+            FakeBot.bot.fail = fail
+            monitor = Monitor(keywords=["urgent"], bot=FakeBot())
+            await monitor.start()
+            if fail:
+                alert = Alert("• Message:\nurgent\n", "https://t.me/c/1/1", 42)
+                alert = alert._replace(id=monitor.outbox.add(alert.encode()))
+                await monitor.pipeline['deliver'].put(alert)
+            await monitor.pipeline.join()
+            pending = monitor.outbox.pending
+            await monitor.stop()
+            return pending
+
+        self.assertEqual(asyncio.run(run(fail=True)), 1)
+        self.assertEqual(asyncio.run(run(fail=False)), 0)
+        self.assertEqual(sent, ["• Message:\nurgent\n"])
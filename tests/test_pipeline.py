@@ -0,0 +1,93 @@
+# tests/test_pipeline.py
+
+import asyncio
+import os
+import tempfile
+import unittest
+from src.monitor.pipeline import DROP_OLDEST, HIGH, LOW, SPILL, Pipeline, Stage
+
+class TestPipeline(unittest.TestCase):
+    def test_items_flow_through_stages(self):
+        delivered = []
+
+        async def scenario():
+            async def match(item):
+                if item % 2:
+                    await pipeline['deliver'].put(item * 10)
+
+            async def deliver(item):
+                delivered.append(item)
+
+            pipeline = Pipeline([
+                Stage('match', match, workers=3, maxsize=4),
+                Stage('deliver', deliver, maxsize=2),
+            ])
+            pipeline.start()
+            for i in range(20):
+                await pipeline['match'].put(i)
+            await pipeline.join()
+            stats = pipeline.stats()
+            await pipeline.stop()
+            return stats
+
+        stats = asyncio.run(scenario())
+        self.assertEqual(sorted(delivered), [i * 10 for i in range(1, 20, 2)])
+        self.assertEqual(stats['match']['processed'], 20)
+        self.assertEqual(stats['deliver']['depth'], 0)
+
+    def test_drop_oldest_keeps_high_priority(self):
+        async def scenario():
+            async def handler(item):
+                pass
+
+            stage = Stage('deliver', handler, maxsize=2, policy=DROP_OLDEST)
+            await stage.put('urgent', HIGH)
+            await stage.put('first', LOW)
+            await stage.put('second', LOW)
+            accepted = await stage.put('late', LOW)
+            await stage.put('urgent2', HIGH)
+            rejected = await stage.put('last', LOW)
+            return [entry[2] for entry in stage._items], stage.dropped, accepted, rejected
+
+        items, dropped, accepted, rejected = asyncio.run(scenario())
+        self.assertEqual(items, ['urgent', 'urgent2'])
+        self.assertEqual(dropped, 4)
+        self.assertTrue(accepted)
+        self.assertFalse(rejected)
+
+    def test_spill_preserves_order(self):
+        handled = []
+
+        async def scenario(path):
+            release = asyncio.Event()
+
+            async def handler(item):
+                await release.wait()
+                handled.append(item)
+
+            stage = Stage('deliver', handler, maxsize=3, policy=SPILL, spill_path=path,
+                          encode=lambda item: item, decode=lambda data: data)
+            stage.start()
+            for i in range(10):
+                await stage.put(i)
+            spilled = stage.stats()['spilled']
+            release.set()
+            await stage.join()
+            await stage.stop()
+            return spilled, os.path.getsize(path)
+
+        with tempfile.TemporaryDirectory() as directory:
+            spilled, size = asyncio.run(scenario(os.path.join(directory, 'spill.jsonl')))
+        self.assertGreater(spilled, 0)
+        self.assertEqual(handled, list(range(10)))
+        self.assertEqual(size, 0)
+
+    def test_spill_requires_codec(self):
+        async def handler(item):
+            pass
+
+        with self.assertRaises(ValueError):
+            Stage('match', handler, policy=SPILL, spill_path='spill.jsonl')
+        stage = Stage.from_config('match', handler, {'PIPELINE': {'match': {'policy': 'spill', 'workers': 2}}})
+        self.assertEqual(stage.policy, 'block')
+        self.assertEqual(stage.workers, 1)
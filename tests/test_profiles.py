@@ -0,0 +1,40 @@
+# tests/test_profiles.py
+
+import unittest
+from src.monitor.profiles import MatcherIndex, chat_key
+from src.monitor.rules import RuleSet
+
+class TestMatcherIndex(unittest.TestCase):
+    def setUp(self):
+        rule_set = RuleSet(
+            ["urgent"],
+            profiles={
+                "crypto": {"keywords": ["usdt", "urgent"], "rules": ["buy AND btc"]},
+                "jobs": ["hiring", "usdt"],
+            }
+        )
+        self.index = MatcherIndex(
+            rule_set,
+            target_groups=[111, {"chat_id": -1001234567890, "profile": "crypto"}, {"chat_id": -55, "profile": "missing"}],
+            clients=[{"session": "acc1", "profile": "jobs"}, "acc2"]
+        )
+
+    def test_chat_key(self):
+        self.assertEqual(chat_key(-1001234567890), 1234567890)
+        self.assertEqual(chat_key(-1234), 1234)
+        self.assertEqual(chat_key(1234), 1234)
+
+    def test_chat_profile_wins_over_account_profile(self):
+        matcher = self.index.for_chat(1234567890, "acc1")
+        self.assertEqual(matcher.name, "crypto")
+        result = matcher.search("urgent: buy BTC, pay in usdt, hiring")
+        self.assertEqual(result.keywords, ["urgent", "usdt"])
+        self.assertEqual(result.rules, ["buy AND btc"])
+
+    def test_account_profile_and_default(self):
+        self.assertEqual(self.index.for_chat(-100999, "acc1").matched_keywords("urgent hiring usdt"), ["hiring", "usdt"])
+        self.assertEqual(self.index.for_chat(-100999, "acc2").matched_keywords("urgent hiring usdt"), ["urgent"])
+        self.assertIs(self.index.for_chat(-55), self.index.default)
+
+    def test_profiles_share_one_automaton(self):
+        self.assertEqual(len(self.index.rule_set.keywords), 5)
@@ -0,0 +1,94 @@
+# tests/test_rate_limiter.py
+
+import asyncio
+import unittest
+from telethon.errors import FloodWaitError
+from src.monitor.rate_limiter import AdaptiveDelay, RateLimiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+class TestRateLimiter(unittest.TestCase):
+    def test_destination_rate_is_enforced(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=100, burst=100, chat_rate=1, chat_burst=2, clock=clock, sleep=clock.sleep)
+
+        async def scenario():
+            times = []
+            for _ in range(5):
+                await limiter.send("channel", lambda: asyncio.sleep(0))
+                times.append(clock.now)
+            return times
+
+        times = asyncio.run(scenario())
+        self.assertEqual(times, [0.0, 0.0, 1.0, 2.0, 3.0])
+        self.assertEqual(limiter.stats()["sent"], 5)
+
+    def test_flood_wait_pauses_and_retries_in_order(self):
+        clock = FakeClock()
+        limiter = RateLimiter(chat_rate=10, chat_burst=10, clock=clock, sleep=clock.sleep)
+        delivered = []
+        failures = {"b": 1}
+
+        def sender(name):
+            async def send():
+                if failures.get(name):
+                    failures[name] -= 1
+                    raise FloodWaitError(request=None, capture=30)
+                delivered.append((name, clock.now))
+            return send
+
+        async def scenario():
+            await asyncio.gather(*(limiter.send("channel", sender(name)) for name in "abc"))
+
+        asyncio.run(scenario())
+        self.assertEqual([name for name, _ in delivered], ["a", "b", "c"])
+        self.assertEqual(delivered[1][1], 30.0)
+        stats = limiter.stats()
+        self.assertEqual(stats["flood_waits"], 1)
+        self.assertEqual(stats["flood_wait_seconds"], 30)
+        self.assertEqual(stats["max_wait_ms"], 30000.0)
+
+    def test_urgent_sends_overtake_queued_ones(self):
+        limiter = RateLimiter()
+        delivered = []
+        gate = asyncio.Event()
+
+        async def scenario():
+            async def send(name):
+                if name == "first":
+                    await gate.wait()
+                delivered.append(name)
+
+            tasks = [asyncio.create_task(limiter.send("channel", lambda: send("first")))]
+            await asyncio.sleep(0)
+            for name, priority in (("digest 1", 0), ("digest 2", 0), ("urgent", 1)):
+                tasks.append(asyncio.create_task(limiter.send("channel", lambda name=name: send(name), priority)))
+            await asyncio.sleep(0)
+            gate.set()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(scenario())
+        self.assertEqual(delivered, ["first", "urgent", "digest 1", "digest 2"])
+
+    def test_invalid_config_falls_back(self):
+        limiter = RateLimiter.from_config({"RATE_LIMIT": {"chat_rate": 0}})
+        self.assertAlmostEqual(limiter.chat_rate, 20 / 60)
+
+
+class TestAdaptiveDelay(unittest.TestCase):
+    def test_flood_slows_down_and_success_recovers(self):
+        pacing = AdaptiveDelay(initial=1.0, minimum=0.5, maximum=3.0, increase=2.0, decrease=0.5)
+        pacing.flood()
+        pacing.flood()
+        self.assertEqual(pacing.delay, 3.0)
+        for _ in range(5):
+            pacing.success()
+        self.assertEqual(pacing.delay, 0.5)
@@ -0,0 +1,81 @@
+# tests/test_rules.py
+
+import unittest
+from src.monitor.rules import RuleSet, parse_rule
+
+class TestRuleParser(unittest.TestCase):
+    def test_precedence_and_grouping(self):
+        node = parse_rule("(buy OR sell) AND usdt AND NOT scam")
+        self.assertEqual(node, ("and", (
+            ("or", (("term", "buy"), ("term", "sell"))),
+            ("term", "usdt"),
+            ("not", ("term", "scam")),
+        )))
+        self.assertEqual(parse_rule("buy usdt"), ("and", (("term", "buy"), ("term", "usdt"))))
+        self.assertEqual(parse_rule('"re:\\d+ toman"'), ("term", {"kind": "regex", "pattern": r"\d+ toman"}))
+
+    def test_invalid_rules(self):
+        for expression in ("", "(buy", "buy OR", "AND buy", "re:(", "buy )"):
+            with self.assertRaises(ValueError):
+                parse_rule(expression)
+
+
+class TestRuleSet(unittest.TestCase):
+    def setUp(self):
+        self.rules = RuleSet(
+            ["urgent"],
+            [
+                {"name": "trade", "expression": "(buy OR sell) AND usdt AND NOT scam"},
+                'price AND "re:\\d+ ?toman"',
+                "broken (",
+            ]
+        )
+
+    def test_rules_evaluated_against_hits(self):
+        result = self.rules.search("Sell USDT now")
+        self.assertEqual(result.rules, ["trade"])
+        self.assertEqual(result.keywords, [])
+        self.assertTrue(result)
+        self.assertFalse(self.rules.search("sell usdt, not a scam"))
+        self.assertEqual(self.rules.search("urgent: price 500 toman").rules, ['price AND "re:\\d+ ?toman"'])
+        self.assertEqual(self.rules.search("urgent: price 500 toman").keywords, ["urgent"])
+        self.assertEqual(self.rules.rejected, ["broken ("])
+
+    def test_regex_scan_skipped_when_plain_terms_decide(self):
+        calls = []
+        search_kind = self.rules.keywords.search_kind
+
+        def tracking(kind, text):
+            calls.append(kind)
+            return search_kind(kind, text)
+
+        self.rules.keywords.search_kind = tracking
+        self.rules.search("nothing to see")
+        self.assertEqual(calls, ["plain"])
+
+    def test_overlapping_regex_terms_are_all_reported(self):
+        rules = RuleSet([{"kind": "regex", "pattern": r"\d+"}], [r"re:09\d{9}", r'"re:\d+" AND "re:09\d{9}"'])
+        result = rules.search("call 09121234567")
+        self.assertEqual(result.keywords, [r"re:\d+"])
+        self.assertEqual(result.rules, [r"re:09\d{9}", r'"re:\d+" AND "re:09\d{9}"'])
+        self.assertFalse(rules.search("call me"))
+
+    def test_only_undecided_regex_terms_are_searched_again(self):
+        keywords = [{"kind": "regex", "pattern": r"\d+"}] + [
+            {"kind": "regex", "pattern": f"word{index}"} for index in range(50)
+        ]
+        rules = RuleSet(keywords, [r"re:09\d{9}"],
+                        profiles={"phones": [{"kind": "regex", "pattern": r"98\d{10}"}]})
+        searched = []
+        search_hidden = rules.keywords.regex.search_hidden
+
+        def tracking(text, patterns):
+            searched.append(sorted(patterns))
+            return search_hidden(text, patterns)
+
+        rules.keywords.regex.search_hidden = tracking
+        self.assertEqual(rules.search("call 09121234567").rules, [r"re:09\d{9}"])
+        self.assertEqual(searched, [[r"09\d{9}"]])
+        searched.clear()
+        self.assertEqual(rules.profile("phones").search("call 989121234567").keywords, [r"re:98\d{10}"])
+        self.assertEqual(searched, [[r"98\d{10}"]])
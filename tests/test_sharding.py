@@ -0,0 +1,84 @@
+# tests/test_sharding.py
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from src.client_manager.sharding import ShardSupervisor, WorkerHandle, assign_sessions
+from src.monitor.monitor import Alert, Monitor
+
+class FakeProcess:
+    def __init__(self):
+        self.alive = True
+        self.pid = 1
+        self.exitcode = None
+
+    def is_alive(self):
+        return self.alive
+
+class FakeQueue(list):
+    def put(self, item):
+        self.append(item)
+
+class FakeSupervisor(ShardSupervisor):
+    def _spawn(self, index, sessions):
+        return WorkerHandle(index, FakeProcess(), FakeQueue(), sessions)
+
+class TestSharding(unittest.TestCase):
+    def test_assign_sessions(self):
+        shards = assign_sessions([f"s{i}" for i in range(7)], 3)
+        self.assertEqual([len(shard) for shard in shards], [3, 2, 2])
+        self.assertEqual(sorted(sum(shards, [])), [f"s{i}" for i in range(7)])
+
+    def test_crashed_worker_sessions_move(self):
+        config = {'clients': [f"s{i}" for i in range(6)], 'OUTBOX': False}
+        supervisor = FakeSupervisor(config, 1, "hash", monitor=None, workers=3)
+        supervisor.start()
+        crashed = supervisor.workers[0]
+        crashed.process.alive = False
+        supervisor._handle_crash(crashed)
+
+        replacement = supervisor.workers[0]
+        self.assertIsNot(replacement, crashed)
+        self.assertEqual(replacement.sessions, [])
+        self.assertEqual(replacement.restarts, 1)
+        moved = [item for handle in (supervisor.workers[1], supervisor.workers[2]) for item in handle.control]
+        self.assertEqual(sorted(s for _, sessions in moved for s in sessions), sorted(crashed.sessions))
+        self.assertEqual(sum(len(handle.sessions) for handle in supervisor.workers.values()), 6)
+
+    def test_delivery_deduplicates_hits_from_workers(self):
+        monitor = Monitor(keywords=["urgent"], bot=SimpleNamespace(config={'OUTBOX': False}))
+        record = (Alert("text", "https://t.me/c/1/5", 42).encode(), [(None, 1, 5)])
+
+        async def scenario():
+            await monitor.accept_hit(record)
+            await monitor.accept_hit(record)
+            return len(monitor.pipeline['deliver'])
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+
+    def test_reported_health_is_planned_across_workers(self):
+        config = {'clients': {"a.session": [1, 2], "b.session": [1, 2]}, 'OUTBOX': False}
+        supervisor = FakeSupervisor(config, 1, "hash", monitor=None, workers=2)
+        supervisor.start()
+        first, second = supervisor.workers[0], supervisor.workers[1]
+        first.process.pid, second.process.pid = 10, 20
+
+        supervisor._update_health(0, 10, ["a.session"])
+        supervisor._update_health(1, 20, ["b.session"])
+        command, plan = second.control[-1]
+        self.assertEqual(command, 'plan')
+        self.assertEqual(first.control[-1], second.control[-1])
+        self.assertEqual(set(plan[0].values()), {"a.session", "b.session"})
+
+        # b.session is unauthorized or backing off: its groups go to a.session in the other worker
+        supervisor._update_health(1, 20, [])
+        self.assertEqual(set(first.control[-1][1][0].values()), {"a.session"})
+
+        # A report from a replaced worker process is ignored
+        supervisor._update_health(1, 99, ["b.session"])
+        self.assertEqual(set(supervisor.assignment.primary.values()), {"a.session"})
+
+    def test_from_config_needs_enabled_flag(self):
+        self.assertIsNone(ShardSupervisor.from_config({'SHARDING': {'workers': 2}}, 1, "hash", None))
+        supervisor = ShardSupervisor.from_config({'SHARDING': {'enabled': True, 'workers': 2}}, 1, "hash", None)
+        self.assertEqual(supervisor.worker_count, 2)
@@ -0,0 +1,235 @@
+# tests/test_stats_handler.py
+
+import asyncio
+import datetime
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from telethon.errors import FloodWaitError
+from telethon.tl.types import Channel, Chat, ChatPhotoEmpty, User
+from src.data.database import ConfigManager
+from src.handlers.stats_handler import StatsHandler
+from src.monitor.metrics import MATCHED, SEEN
+from src.monitor.monitor import Monitor
+
+DATE = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def group(chat_id):
+    return Chat(id=chat_id, title="group", photo=ChatPhotoEmpty(), participants_count=3, date=DATE, version=1)
+
+
+def channel(chat_id, broadcast):
+    return Channel(id=chat_id, title="channel", photo=ChatPhotoEmpty(), date=DATE, broadcast=broadcast)
+
+
+def dialog(entity, message_id, timestamp=0, pinned=False):
+    date = DATE + datetime.timedelta(seconds=timestamp)
+    return SimpleNamespace(
+        entity=entity, id=entity.id, date=date, pinned=pinned,
+        message=SimpleNamespace(id=message_id), input_entity=entity.id
+    )
+
+
+class FakeClient:
+    """Serves dialogs newest first, optionally raising one FloodWaitError part way."""
+
+    def __init__(self, dialogs, flood_after=None, flood_seconds=0):
+        self.dialogs = dialogs
+        self.flood_after = flood_after
+        self.flood_seconds = flood_seconds
+        self.calls = []
+        self.fetched = 0
+
+    async def get_input_entity(self, peer):
+        return peer
+
+    async def iter_dialogs(self, limit=None, offset_date=None, offset_id=0, offset_peer=None):
+        self.calls.append(offset_peer)
+        start = 0
+        if offset_peer is not None:
+            start = [d.input_entity for d in self.dialogs].index(offset_peer) + 1
+        for index, item in enumerate(self.dialogs[start:], start):
+            if index == self.flood_after:
+                self.flood_after = None
+                raise FloodWaitError(request=None, capture=self.flood_seconds)
+            await asyncio.sleep(0)
+            self.fetched += 1
+            yield item
+
+
+class FakeMessage:
+    def __init__(self):
+        self.edits = []
+
+    async def edit(self, text):
+        self.edits.append(text)
+
+
+class FakeEvent:
+    def __init__(self):
+        self.status = FakeMessage()
+        self.responses = []
+        self.edits = []
+
+    async def respond(self, text, **kwargs):
+        self.responses.append((text, kwargs.get("buttons")))
+        return self.status
+
+    async def edit(self, text, buttons=None):
+        self.edits.append((text, buttons))
+
+    async def answer(self, *args):
+        pass
+
+
+def button_data(buttons):
+    return [button.data.decode() for row in buttons for button in row]
+
+
+class TestUpdateGroups(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def make_handler(self, clients, groups=None):
+        config = {"clients": groups or {session: [] for session in clients}}
+        bot = SimpleNamespace(active_clients=clients, config=config,
+                              config_manager=ConfigManager("clients.json", config))
+        return StatsHandler(bot)
+
+    def run_update(self, handler):
+        event = FakeEvent()
+        asyncio.run(handler.update_groups(event))
+        with open("clients.json", encoding="utf-8") as f:
+            return event, json.load(f)
+
+    def test_scans_every_client_and_skips_broadcast_channels(self):
+        user = User(id=7, first_name="Ann")
+        clients = {
+            "a.session": FakeClient([dialog(group(1), 10), dialog(channel(2, True), 11), dialog(user, 12)]),
+            "b.session": FakeClient([dialog(channel(3, False), 13)]),
+        }
+        event, data = self.run_update(self.make_handler(clients))
+        self.assertEqual(data["clients"], {"a.session": [1], "b.session": [3]})
+        self.assertIn("Groups synced for 2/2 clients, 2 changed", event.status.edits[-1])
+
+    def test_flood_wait_resumes_after_last_dialog(self):
+        dialogs = [dialog(group(i), i) for i in range(1, 6)]
+        flooded = FakeClient(dialogs, flood_after=3)
+        other = FakeClient([dialog(group(9), 9)])
+        _, data = self.run_update(self.make_handler({"a.session": flooded, "b.session": other}))
+        self.assertEqual(sorted(data["clients"]["a.session"]), [1, 2, 3, 4, 5])
+        self.assertEqual(data["clients"]["b.session"], [9])
+        self.assertEqual(flooded.calls, [None, 3])
+
+    def test_long_flood_wait_skips_only_that_client(self):
+        flooded = FakeClient([dialog(group(1), 1)], flood_after=0, flood_seconds=3600)
+        other = FakeClient([dialog(group(9), 9)])
+        event, data = self.run_update(self.make_handler({"a.session": flooded, "b.session": other}))
+        self.assertEqual(data["clients"], {"a.session": [], "b.session": [9]})
+        self.assertIn("skipped, flood wait 3600s", event.status.edits[-1])
+
+    def test_incremental_sync_fetches_only_changed_dialogs(self):
+        client = FakeClient([dialog(group(i), i, timestamp=-i) for i in range(1, 6)])
+        handler = self.make_handler({"a.session": client})
+        self.run_update(handler)
+        self.assertEqual(client.fetched, 5)
+
+        entry = handler.dialog_cache.get("a.session")
+        synced = datetime.datetime.fromtimestamp(entry["synced"], datetime.timezone.utc)
+        left = Chat(id=2, title="group", photo=ChatPhotoEmpty(), participants_count=3, date=DATE,
+                    version=1, left=True)
+        client.dialogs = [
+            dialog(group(6), 6, pinned=True),
+            dialog(group(7), 7, timestamp=(synced - DATE).total_seconds() + 10),
+            dialog(left, 2, timestamp=(synced - DATE).total_seconds() + 5),
+        ] + client.dialogs
+        client.fetched = 0
+        _, data = self.run_update(handler)
+        # The pinned dialog, both newer ones and the first unchanged one that ends the scan
+        self.assertEqual(client.fetched, 4)
+        self.assertEqual(sorted(data["clients"]["a.session"]), [1, 3, 4, 5, 6, 7])
+
+    def test_full_scan_drops_quietly_left_groups(self):
+        client = FakeClient([dialog(group(1), 1)])
+        handler = self.make_handler({"a.session": client}, groups={"a.session": [1, 2]})
+        _, data = self.run_update(handler)
+        self.assertEqual(data["clients"]["a.session"], [1])
+
+    def test_unchanged_groups_do_not_rewrite_the_index(self):
+        client = FakeClient([dialog(group(1), 1, timestamp=-10)])
+        handler = self.make_handler({"a.session": client})
+        self.run_update(handler)
+        os.remove("clients.json")
+        asyncio.run(handler.update_groups(FakeEvent()))
+        self.assertFalse(os.path.exists("clients.json"))
+
+
+class TestShowAccounts(unittest.TestCase):
+    def setUp(self):
+        clients = {f"+{number:03d}.session": list(range(number)) for number in range(25)}
+        active = {session: object() for session in list(clients)[::2]}
+        self.bot = SimpleNamespace(config={"clients": clients}, active_clients=active)
+        self.handler = StatsHandler(self.bot)
+
+    def test_sends_a_single_page(self):
+        event = FakeEvent()
+        asyncio.run(self.handler.show_accounts(event))
+        self.assertEqual(len(event.responses), 1)
+        text, buttons = event.responses[0]
+        self.assertIn("Accounts (all): 25, page 1/3", text)
+        self.assertIn("1. +000 • 0 groups • 🟢 Active", text)
+        self.assertIn("2. +001 • 1 groups • 🔴 Inactive", text)
+        data = button_data(buttons)
+        self.assertIn("toggle_+009.session", data)
+        self.assertNotIn("toggle_+010.session", data)
+        self.assertIn("accounts_all_1", data)
+        self.assertIn("accounts_inactive_0", data)
+
+    def test_pages_and_filters_edit_in_place(self):
+        asyncio.run(self.handler.show_accounts(FakeEvent()))
+        event = FakeEvent()
+        asyncio.run(self.handler.show_accounts_page("accounts_all_2", event))
+        asyncio.run(self.handler.show_accounts_page("accounts_inactive_0", event))
+        asyncio.run(self.handler.show_accounts_page("accounts_active_99", event))
+        self.assertEqual(event.responses, [])
+        last_page, inactive, active = [text for text, _ in event.edits]
+        self.assertIn("page 3/3", last_page)
+        self.assertIn("21. +020", last_page)
+        self.assertIn("Accounts (inactive): 12, page 1/2", inactive)
+        self.assertNotIn("🟢", inactive)
+        self.assertIn("Accounts (active): 13, page 2/2", active)
+
+    def test_paging_uses_the_index_built_by_show_accounts(self):
+        asyncio.run(self.handler.show_accounts(FakeEvent()))
+        self.bot.config["clients"]["+000.session"] = list(range(50))
+        event = FakeEvent()
+        asyncio.run(StatsHandler(self.bot).show_accounts_page("accounts_all_0", event))
+        self.assertIn("+000 • 0 groups", event.edits[0][0])
+
+
+class TestShowStats(unittest.TestCase):
+    def test_shows_traffic_metrics(self):
+        config = {'clients': {}, 'KEYWORDS': ["urgent"], 'IGNORE_USERS': [], 'OUTBOX': False,
+                  'CATCH_UP': False, 'METRICS': {'path': None}}
+        monitor = Monitor(keywords=["urgent"], bot=SimpleNamespace(config=config))
+        monitor.metrics.record(SEEN, "a.session", -100)
+        monitor.metrics.record(MATCHED, "a.session", -100, ["urgent"])
+        monitor.heavy_hitters.message(-100, None)
+        bot = SimpleNamespace(config=config, active_clients={}, monitor=monitor)
+        event = FakeEvent()
+        asyncio.run(StatsHandler(bot).show_stats(event))
+        text = event.responses[0][0]
+        self.assertIn("• Messages: 1 seen, 1 matched, 0 forwarded", text)
+        self.assertIn("• Last Minute: 1 seen, 1 matched, 0 forwarded", text)
+        self.assertIn("• Top Keywords: urgent (1)", text)
+        self.assertIn("• Hot Groups: -100 (~1)", text)
+        self.assertIn("• Active Senders: -", text)